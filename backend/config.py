@@ -4,11 +4,72 @@ Centralized configuration for all three phases (Outliner, Populator, Hands-on)
 """
 
 import os
-from dotenv import load_dotenv
+import sys
+from functools import lru_cache
+from dotenv import dotenv_values, find_dotenv
 from dataclasses import dataclass
 
+
+# Keys whose os.environ value came from the .env file (not the real environment),
+# so a re-parse after the file changes may replace them
+_ENV_FILE_KEYS = set()
+
+
+@lru_cache(maxsize=1)
+def _read_env_file(path: str, mtime: float) -> dict:
+    """Parse a .env file once per (path, mtime) and seed os.environ from it."""
+    values = dotenv_values(path)
+    
+    # Drop what an earlier version of the file seeded but this one no longer sets
+    for key in _ENV_FILE_KEYS - {k for k, v in values.items() if v is not None}:
+        os.environ.pop(key, None)
+        _ENV_FILE_KEYS.discard(key)
+    
+    for key, value in values.items():
+        if value is None:
+            continue
+        if key in _ENV_FILE_KEYS or key not in os.environ:  # real env vars always win
+            os.environ[key] = value
+            _ENV_FILE_KEYS.add(key)
+    return values
+
+
+def load_env() -> dict:
+    """
+    Load the backend .env file into os.environ (without overriding real env vars).
+
+    Safe to call from anywhere — the file is only re-parsed if its mtime changed,
+    so repeated imports/calls in the same interpreter are a single os.stat(). On a
+    re-parse, values that came from the file are replaced (or dropped) to match it.
+    """
+    path = find_dotenv()
+    if not path:
+        return {}
+    return _read_env_file(path, os.stat(path).st_mtime)
+
+
 # Load environment variables
-load_dotenv()
+load_env()
+
+
+class _EnvVar:
+    """
+    Class-level descriptor that resolves an environment variable on access
+    instead of at class-body evaluation, so `APIConfig.OPENAI_API_KEY` reflects
+    the environment at the time it's first used (and can be overridden in tests).
+    Pass `cast` (e.g. int) for non-string settings.
+    """
+
+    def __init__(self, name: str, default: str = None, cast=None):
+        self.name = name
+        self.default = default
+        self.cast = cast
+
+    def __get__(self, instance, owner):
+        value = os.environ.get(self.name, self.default)
+        if self.cast is not None and value is not None:
+            return self.cast(value)
+        return value
 
 
 # ============================================================================
@@ -17,14 +78,14 @@ load_dotenv()
 
 class APIConfig:
     """API keys and credentials"""
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
+    OPENAI_API_KEY = _EnvVar("OPENAI_API_KEY")
+    YOUTUBE_API_KEY = _EnvVar("YOUTUBE_API_KEY")
+    GOOGLE_API_KEY = _EnvVar("GOOGLE_API_KEY")
+    GOOGLE_CSE_ID = _EnvVar("GOOGLE_CSE_ID")
 
     # Root "Synopsis" Drive folder camp docs get saved into, one subfolder per week.
     # Must be shared as Editor with this service's Cloud Run runtime service account.
-    SYNOPSIS_DRIVE_FOLDER_ID = os.getenv("SYNOPSIS_DRIVE_FOLDER_ID")
+    SYNOPSIS_DRIVE_FOLDER_ID = _EnvVar("SYNOPSIS_DRIVE_FOLDER_ID")
 
     # OpenAI settings
     OPENAI_MODEL = "gpt-4o"
@@ -73,6 +134,26 @@ Every course should integrate all 4 pillars across its sections and activities.
     
     # Output settings
     OUTPUT_DIR = "../outputs"
+    
+    # Concurrency
+    MAX_CONCURRENCY = _EnvVar("OUTLINER_MAX_CONCURRENCY", "8", int)  # Max block-generation LLM calls in flight per request
+    
+    # Outline response cache (identical prompt + images -> stored LLM outline)
+    OUTLINE_CACHE_ENABLED = _EnvVar(
+        "OUTLINE_CACHE_ENABLED", "1", lambda v: v.lower() in ("1", "true", "yes")
+    )  # Set to 0 to always call the LLM, e.g. when regenerating for variety
+    OUTLINE_SEMANTIC_CACHE_THRESHOLD = 0.92                 # Min cosine similarity to reuse a rephrased course's outline
+    OUTLINE_EMBEDDING_MODEL = "text-embedding-3-small"      # Embeds course name + requirements for that lookup
+    
+    # Reference outlines (related earlier courses -> few-shot context for a cheaper model)
+    OUTLINE_REFERENCE_MODEL = "gpt-4o-mini"                 # Builds the outline when related ones are found
+    OUTLINE_REFERENCE_MIN_SIMILARITY = 0.80                 # Min cosine similarity for an earlier outline to be a reference
+    OUTLINE_REFERENCE_TOP_K = 3                             # Max reference outlines put in the prompt
+
+
+# Long literals aren't interned automatically; every prompt module embeds this
+# one, so keep a single shared copy for the life of the process
+OutlinerConfig.PLA_FRAMEWORK = sys.intern(OutlinerConfig.PLA_FRAMEWORK)
 
 
 # ============================================================================
@@ -122,6 +203,9 @@ class PopulatorConfig:
     MAX_REDUNDANCY_PERCENTAGE = 80        # Reject videos with >60% overlap
     MAX_SEARCH_ITERATIONS = 3             # Max search iterations per section
     CONVERGENCE_THRESHOLD = 10            # Stop if coverage improvement < 10%
+    SECTION_WORKERS = 4                   # Sections populated at once (CurriculumOrchestrator.populate_sections)
+    SEARCH_WORKERS = 8                    # YouTube searches in flight at once (shared by all sections)
+    ANALYSIS_WORKERS = 8                  # Videos analyzed (LLM calls) at once (shared by all sections)
     
     # File paths
     OUTPUTS_DIR = "../outputs"
@@ -130,6 +214,16 @@ class PopulatorConfig:
     OUTPUT_OUTLINE_TXT_FILE = "course_outline_with_resources.txt"
 
 
+# Grade-indexed view of WPM_RANGES (index = grade number, K = 0), so the
+# per-video lookup is a plain tuple index.
+PopulatorConfig.WPM_RANGE_BY_GRADE = tuple(
+    PopulatorConfig.WPM_RANGES[
+        'elementary' if grade <= 5 else 'middle_school' if grade <= 8 else 'high_school'
+    ]
+    for grade in range(13)
+)
+
+
 # ============================================================================
 # PHASE 3: HANDS-ON CONFIGURATION (Worksheets & Activities)
 # ============================================================================
@@ -146,19 +240,104 @@ class HandsOnConfig:
     MAX_ACTIVITY_OPTIONS = 3          # Top activities to return
     
     # Concurrent processing
-    WORKSHEET_ANALYSIS_WORKERS = 3    # Parallel image analysis threads
+    WORKSHEET_ANALYSIS_WORKERS = 3    # Vision batches in flight at once (async, no threads)
+    VISION_BATCH_SIZE = 16            # Worksheet images analyzed per GPT-4 Vision request
+    SUBMIT_STAGGER_MS = 150           # Delay between starting consecutive vision batches
+    VISION_IMAGE_MAX_SIDE = 1024      # Worksheet images are downscaled to fit this box before upload
+    VISION_IMAGE_JPEG_QUALITY = 80    # Re-encode quality for the downscaled images
+    VISION_IMAGE_DETAIL = "low"       # GPT-4 Vision detail level ("low" = flat, small token cost)
+    IMAGE_BUFFER_BYTES = 4 * 1024 * 1024  # Largest worksheet image downscaled locally (bigger ones go by URL)
+    IMAGE_BUFFER_POOL_SIZE = 8        # Image downloads buffered at once (caps download memory)
+    VISION_RPM_LIMIT = _EnvVar("OPENAI_VISION_RPM", "450", int)     # Client-side request budget for vision calls (per minute)
+    VISION_TPM_LIMIT = _EnvVar("OPENAI_VISION_TPM", "27000", int)   # Client-side token budget for vision calls (per minute)
     ACTIVITY_CRAWL_WORKERS = 4        # Parallel web crawling threads
+    ACTIVITY_CRAWL_CONCURRENCY = 16   # Max activity pages in flight (async crawl)
+    ACTIVITY_EXTRACTION_BATCH_SIZE = 4  # Crawled pages per LLM extraction call
     TIMEOUT_SECONDS = 30              # Timeout for API/crawl operations
+    SEARCH_CACHE_TTL_SECONDS = 3600   # Reuse identical Google searches for 1 hour
+    
+    # LLM relevance checks (resource filtering)
+    RELEVANCE_CHECK_MODEL = _EnvVar("RESOURCE_FILTER_MODEL", "gpt-4o-mini")  # Cheap model for the relevance checks
+    RELEVANCE_CHECK_FALLBACK_MODEL = "gpt-4o"  # Retried once when the cheap model's output fails validation
+    RELEVANCE_CHECK_CONCURRENCY = _EnvVar("OPENAI_MAX_CONCURRENCY", "16", int)  # Max checks in flight per filter run
+    RELEVANCE_CHECK_MAX_CONNECTIONS = 32  # Pooled keep-alive connections to the OpenAI API
+    RELEVANCE_CHECK_MAX_RETRIES = 3       # SDK retries (exponential backoff) on 429 / connection errors
+    RELEVANCE_CHECK_BATCH_SIZE = 10       # Resources evaluated per LLM request
+    RELEVANCE_CHECK_TIMEOUT_SECONDS = 12  # Per LLM request; a slow request counts as failed
+    RELEVANCE_CHECK_DEADLINE_SECONDS = 30  # Per filter run; checks still pending are cancelled
+    RELEVANCE_PARSE_OFFLOAD_CHARS = 16384  # Larger responses are parsed in a worker thread, off the event loop
+    RELEVANCE_EXACT_CACHE_MAX_ENTRIES = 1024  # In-memory memo of identical relevance prompts
+    RELEVANCE_EMBEDDING_MODEL = "text-embedding-3-small"  # Embeds prompts for the semantic cache
+    RELEVANCE_SEMANTIC_CACHE_THRESHOLD = 0.92  # Min cosine similarity to reuse a cached check
+    LEXICAL_RELEVANCE_MIN_SCORE = 0.05  # Word-overlap cosine below which a resource skips the LLM check
+    LEXICAL_FALLBACK_TOP_N = 3  # Worksheets still checked by the LLM when none pass the lexical check
     
     # Quality filtering
     MIN_WORKSHEET_VISUAL_QUALITY = 5      # 0-10 scale
     MIN_WORKSHEET_EDUCATIONAL_VALUE = 5   # 0-10 scale
     MIN_ACTIVITY_QUALITY_SCORE = 4        # 0-10 scale
     
+    # Worksheet image pre-filter (search metadata only, before any vision call)
+    MIN_WORKSHEET_IMAGE_PIXELS = 300 * 300  # Smaller images are thumbnails/icons, not worksheets
+    WORKSHEET_IMAGE_MIME_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+    WORKSHEET_DOMAIN_DENYLIST = (     # Stock photo, social and shopping sites (subdomains included)
+        "instagram.com", "facebook.com", "amazon.com", "ebay.com", "walmart.com",
+        "shutterstock.com", "istockphoto.com", "gettyimages.com", "alamy.com",
+        "dreamstime.com", "123rf.com", "depositphotos.com", "vecteezy.com", "freepik.com",
+    )
+    
     # File paths
     OUTPUTS_DIR = "../outputs"
 
 
+# ============================================================================
+# PERSISTENT CACHE CONFIGURATION
+# ============================================================================
+
+class CacheConfig:
+    """On-disk caches that survive restarts (SQLite files under CACHE_DIR)"""
+    
+    CACHE_DIR = _EnvVar("EDCUBE_CACHE_DIR", ".cache")
+    
+    # Crawled page (URL + content hash) -> extracted activities
+    ACTIVITY_EXTRACTION_CACHE_FILE = "activity_extracts.sqlite"
+    ACTIVITY_EXTRACTION_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    
+    # Relevance prompt embedding -> relevance check result (similarity lookup)
+    RELEVANCE_SEMANTIC_CACHE_FILE = "relevance_semantic.sqlite"
+    RELEVANCE_SEMANTIC_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    RELEVANCE_SEMANTIC_CACHE_MAX_ENTRIES = 5000
+    
+    # Relevance prompt hash (+ model) -> relevance check result (exact match)
+    RELEVANCE_CHECK_CACHE_FILE = "relevance_checks.sqlite"
+    RELEVANCE_CHECK_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    
+    # Worksheet image URL (+ model, detail) -> GPT-4 Vision analysis
+    WORKSHEET_ANALYSIS_CACHE_FILE = "worksheet_analyses.sqlite"
+    WORKSHEET_ANALYSIS_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    
+    # Outline prompt hash (+ model, system message, images) -> Phase 1 LLM outline
+    OUTLINE_CACHE_FILE = "outlines.sqlite"
+    OUTLINE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    
+    # Course name + requirements embedding -> Phase 1 LLM outline (similarity lookup)
+    OUTLINE_SEMANTIC_CACHE_FILE = "outlines_semantic.sqlite"
+    OUTLINE_SEMANTIC_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    OUTLINE_SEMANTIC_CACHE_MAX_ENTRIES = 2000
+    
+    # YouTube video id -> parsed videos.list details that don't change (title, channel, duration, ...)
+    VIDEO_DETAILS_CACHE_FILE = "video_details.sqlite"
+    VIDEO_DETAILS_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    
+    # YouTube video id -> view/like statistics (short-lived: ranking uses them)
+    VIDEO_STATS_CACHE_FILE = "video_stats.sqlite"
+    VIDEO_STATS_CACHE_TTL_SECONDS = 6 * 3600
+    
+    # YouTube video id -> transcript entries (or "no transcript available")
+    TRANSCRIPT_CACHE_FILE = "transcripts.sqlite"
+    TRANSCRIPT_CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
@@ -166,7 +345,7 @@ class HandsOnConfig:
 class LoggingConfig:
     """Logging settings for all phases"""
     
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL = _EnvVar("LOG_LEVEL", "INFO")
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
@@ -176,11 +355,21 @@ class LoggingConfig:
 # ============================================================================
 
 # Export commonly used configs
-OPENAI_API_KEY = APIConfig.OPENAI_API_KEY
 OPENAI_MODEL = APIConfig.OPENAI_MODEL
 OPENAI_TEMPERATURE = APIConfig.OPENAI_TEMPERATURE
 
-YOUTUBE_API_KEY = APIConfig.YOUTUBE_API_KEY
-GOOGLE_API_KEY = APIConfig.GOOGLE_API_KEY
-GOOGLE_CSE_ID = APIConfig.GOOGLE_CSE_ID
-SYNOPSIS_DRIVE_FOLDER_ID = APIConfig.SYNOPSIS_DRIVE_FOLDER_ID
\ No newline at end of file
+# Env-backed exports are resolved lazily (PEP 562) so `from config import
+# OPENAI_API_KEY` only reads the environment when that name is imported.
+_LAZY_API_EXPORTS = (
+    "OPENAI_API_KEY",
+    "YOUTUBE_API_KEY",
+    "GOOGLE_API_KEY",
+    "GOOGLE_CSE_ID",
+    "SYNOPSIS_DRIVE_FOLDER_ID",
+)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_API_EXPORTS:
+        return getattr(APIConfig, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,9 +1,16 @@
 from firebase_admin import firestore
-from datetime import datetime
+from datetime import datetime, timezone
+import logging
 import uuid
 
+# Initialize logger
+logger = logging.getLogger(__name__)
+
 db = firestore.client()
 
+# Fields needed to list a teacher's courses (everything except the large content payloads)
+CURRICULUM_LISTING_FIELDS = ('courseId', 'courseName', 'class', 'subject', 'createdAt', 'lastModified')
+
 def save_curriculum(curriculum_data):
     """
     Save curriculum to Firestore with flat structure.
@@ -26,6 +33,7 @@ def save_curriculum(curriculum_data):
     try:
         # Generate unique course ID
         course_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc).isoformat()
         
         # Prepare document data
         doc_data = {
@@ -41,8 +49,8 @@ def save_curriculum(curriculum_data):
             'generatedTopics': curriculum_data.get('generatedTopics', []),
             'isPublic': False,  # Default to private
             'sharedWith': [],   # Empty array for future sharing
-            'createdAt': datetime.utcnow().isoformat(),
-            'lastModified': datetime.utcnow().isoformat()
+            'createdAt': now,
+            'lastModified': now
         }
         
         # Save to Firestore at flat path
@@ -55,36 +63,61 @@ def save_curriculum(curriculum_data):
         }
         
     except Exception as e:
-        print(f"Error saving curriculum: {e}")
+        logger.exception("Error saving curriculum")
         return {
             'success': False,
             'error': str(e)
         }
 
 
-def get_teacher_curricula(teacher_uid):
+def get_teacher_curricula(teacher_uid, limit=20, start_after=None, projection=CURRICULUM_LISTING_FIELDS):
     """
-    Get all curricula for a specific teacher.
+    Get one page of curricula for a specific teacher, most recently modified first.
+    
+    Only the listing fields are fetched by default, so the heavy `sections`,
+    `handsOnResources` and `generatedTopics` payloads never leave Firestore.
+    Pages are cursor-based (served by the teacherUid + lastModified composite
+    index in firestore.indexes.json), so later pages cost the same as the first.
+    Ties on lastModified are broken by document id, so no curriculum is skipped
+    or repeated across pages.
     
     Args:
         teacher_uid (str): Teacher's Firebase UID
+        limit (int): Maximum number of curricula to return
+        start_after (dict): `next_cursor` from the previous page, or None for the first page
+        projection (tuple): Fields to fetch, or None for full documents
     
     Returns:
-        list: List of curriculum documents
+        dict: {'items': list of curriculum documents,
+               'next_cursor': {'lastModified', 'id'} of the last item, or None if this is the last page}
     """
     try:
-        curricula = []
-        docs = db.collection('curricula').where('teacherUid', '==', teacher_uid).stream()
-        
-        for doc in docs:
-            curriculum = doc.to_dict()
-            curricula.append(curriculum)
-        
-        return curricula
-        
-    except Exception as e:
-        print(f"Error fetching curricula: {e}")
-        return []
+        query = (
+            db.collection('curricula')
+            .where('teacherUid', '==', teacher_uid)
+            .order_by('lastModified', direction=firestore.Query.DESCENDING)
+            .order_by('__name__', direction=firestore.Query.DESCENDING)
+            .limit(limit)
+        )
+        if projection:
+            query = query.select(projection)
+        if start_after:
+            query = query.start_after({
+                'lastModified': start_after['lastModified'],
+                '__name__': start_after['id']
+            })
+        
+        docs = list(query.stream())
+        items = [doc.to_dict() for doc in docs]
+        next_cursor = None
+        if len(docs) == limit:
+            next_cursor = {'lastModified': items[-1].get('lastModified'), 'id': docs[-1].id}
+        
+        return {'items': items, 'next_cursor': next_cursor}
+        
+    except Exception:
+        logger.exception("Error fetching curricula")
+        return {'items': [], 'next_cursor': None}
 
 
 def get_curriculum_by_id(course_id):
@@ -105,8 +138,8 @@ def get_curriculum_by_id(course_id):
         else:
             return None
             
-    except Exception as e:
-        print(f"Error fetching curriculum: {e}")
+    except Exception:
+        logger.exception("Error fetching curriculum")
         return None
 
 
@@ -132,17 +165,39 @@ def update_curriculum(course_id, updates):
         }
         
     except Exception as e:
-        print(f"Error updating curriculum: {e}")
+        logger.exception("Error updating curriculum")
         return {
             'success': False,
             'error': str(e)
         }
 
 
+@firestore.transactional
+def _delete_if_owner(transaction, doc_ref, teacher_uid):
+    """
+    Delete a curriculum inside a transaction if `teacher_uid` owns it.
+    
+    Returns:
+        str: 'ok', 'not_found' or 'unauthorized'
+    """
+    snapshot = doc_ref.get(field_paths=['teacherUid'], transaction=transaction)
+    
+    if not snapshot.exists:
+        return 'not_found'
+    if snapshot.get('teacherUid') != teacher_uid:
+        return 'unauthorized'
+    
+    transaction.delete(doc_ref)
+    return 'ok'
+
+
 def delete_curriculum(course_id, teacher_uid):
     """
     Delete a curriculum (only if owned by teacher).
     
+    The ownership check and the delete run in one transaction, so the document
+    can't change owner between the check and the delete.
+    
     Args:
         course_id (str): Course ID
         teacher_uid (str): Teacher's UID for verification
@@ -151,26 +206,21 @@ def delete_curriculum(course_id, teacher_uid):
         dict: Success response
     """
     try:
-        # Verify ownership first
-        doc = db.collection('curricula').document(course_id).get()
+        doc_ref = db.collection('curricula').document(course_id)
+        status = _delete_if_owner(db.transaction(), doc_ref, teacher_uid)
         
-        if not doc.exists:
+        if status == 'not_found':
             return {'success': False, 'error': 'Course not found'}
-        
-        curriculum = doc.to_dict()
-        if curriculum.get('teacherUid') != teacher_uid:
+        if status == 'unauthorized':
             return {'success': False, 'error': 'Unauthorized'}
         
-        # Delete the document
-        db.collection('curricula').document(course_id).delete()
-        
         return {
             'success': True,
             'message': 'Course deleted successfully'
         }
         
     except Exception as e:
-        print(f"Error deleting curriculum: {e}")
+        logger.exception("Error deleting curriculum")
         return {
             'success': False,
             'error': str(e)
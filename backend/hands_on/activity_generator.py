@@ -3,18 +3,40 @@ Phase 3: Activity Generation
 Single-section activity generation with concurrent web crawling
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-from config import HandsOnConfig
+from config import HandsOnConfig, CacheConfig
 from utils.google_search_handler import GoogleSearchHandler
 from utils.content_extractor import ContentExtractor
-from hands_on.resource_filter import ResourceFilter
+from utils.disk_cache import DiskCache
+from hands_on.shared_handlers import get_resource_filter, get_search_handler
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Leading grade of a grade-level string: "K", "k-5", "4", "6-8", ...
+_GRADE_RE = re.compile(r'^\s*([Kk]|\d+)')
+
+# Search-query descriptor indexed by grade number (K = 0); index 9 covers 9-12
+_GRADE_DESCRIPTOR_BUCKETS = (
+    "elementary", "elementary", "elementary", "elementary", "elementary", "elementary",
+    "middle school", "middle school", "middle school",
+    "high school",
+)
+
+# (query, num_results) -> (fetched_at, results). Sections of one course often
+# share the same activity prompt, so this saves repeat paid Custom Search calls.
+_SEARCH_CACHE: Dict[Tuple[str, int], Tuple[float, List[Dict]]] = {}
+_SEARCH_CACHE_LOCK = threading.Lock()
+_SEARCH_CACHE_MAX_ENTRIES = 256
+
 
 def generate_activities_for_section(
     section: Dict,
@@ -29,6 +51,10 @@ def generate_activities_for_section(
     concurrently to extract activity details using LLM, filters by quality and
     relevance, and returns the top options for teacher selection.
     
+    Blocking — crawling runs on its own event loop via asyncio.run(), so call
+    this from a worker thread (the orchestrator uses run_in_executor), not from
+    inside a running event loop.
+    
     Process:
     1. Build search query from user prompt and grade level
     2. Search Google for activity lesson plan pages
@@ -71,29 +97,31 @@ def generate_activities_for_section(
     # Validate input
     _validate_section_input(section)
     
-    section_title = section.get('title', 'Unknown Section')
+    title = section.get('title', '')
+    learning_objectives = section.get('learning_objectives') or []
+    content_keywords = section.get('content_keywords') or []
     
-    logger.info(f"="*70)
-    logger.info(f"Generating activities for section: {section_title}")
-    logger.info(f"Grade level: {grade_level}")
-    logger.info(f"User prompt: {user_prompt}")
-    logger.info(f"="*70)
+    logger.info(
+        "Generating activities | section=%s grade=%s prompt=%s",
+        title or 'Unknown Section', grade_level, user_prompt
+    )
     
-    # Initialize handlers
-    search_handler = GoogleSearchHandler()
-    content_extractor = ContentExtractor()
-    resource_filter = ResourceFilter()
+    # Shared handlers (built once per process)
+    search_handler = get_search_handler()
+    content_extractor = _get_content_extractor()
+    resource_filter = get_resource_filter()
     
     # Build search query with grade descriptor
     grade_descriptor = _get_grade_level_descriptor(grade_level)
     search_query = f"{user_prompt} {grade_descriptor} classroom"
-    logger.info(f"Search query: '{search_query}'")
+    logger.info("Search query: '%s'", search_query)
     
     # Search for activity pages
-    logger.info(f"Searching Google for activity pages...")
-    search_results = search_handler.search_activities(
+    logger.info("Searching Google for activity pages...")
+    search_results = _cached_search_activities(
+        search_handler,
         search_query,
-        num_results=HandsOnConfig.GOOGLE_MAX_ACTIVITY_PAGES
+        HandsOnConfig.GOOGLE_MAX_ACTIVITY_PAGES
     )
     
     if not search_results:
@@ -101,68 +129,117 @@ def generate_activities_for_section(
         section['activity_options'] = []
         return section
     
-    logger.info(f"Found {len(search_results)} activity pages")
+    logger.info("Found %d activity pages", len(search_results))
     
     # Crawl and extract CONCURRENTLY (for speed)
-    logger.info(f"Crawling pages in parallel (workers={HandsOnConfig.ACTIVITY_CRAWL_WORKERS})...")
+    logger.info("Crawling pages concurrently (max in flight=%d)...", HandsOnConfig.ACTIVITY_CRAWL_CONCURRENCY)
     all_activities = []
     
-    with ThreadPoolExecutor(max_workers=HandsOnConfig.ACTIVITY_CRAWL_WORKERS) as executor:
-        futures = {
-            executor.submit(
-                content_extractor.crawl_and_extract_activity,
-                url_data.get('url', ''),
-                url_data.get('title', '')
-            ): url_data
-            for url_data in search_results
-        }
-        
-        for future in as_completed(futures):
-            try:
-                result = future.result(timeout=HandsOnConfig.TIMEOUT_SECONDS)
-                if result and result.get('activities_found'):
-                    # Each page may have multiple activities
-                    for activity in result['activities_found']:
-                        activity['source_url'] = result.get('source_url', '')
-                        all_activities.append(activity)
-                        logger.debug(f"Extracted: {activity.get('name', 'Unknown')}")
-            except Exception as e:
-                logger.error(f"Error crawling activity page: {e}")
+    crawl_results = asyncio.run(content_extractor.crawl_activities_async(
+        search_results,
+        max_concurrency=HandsOnConfig.ACTIVITY_CRAWL_CONCURRENCY,
+        timeout_seconds=HandsOnConfig.TIMEOUT_SECONDS,
+        batch_size=HandsOnConfig.ACTIVITY_EXTRACTION_BATCH_SIZE,
+        # Twice the options requested leaves the relevance filter room to reject some
+        enough_activities=num_options * 2,
+        is_usable_activity=resource_filter._is_quality_activity
+    ))
+    
+    for result in crawl_results:
+        if isinstance(result, BaseException):
+            logger.error("Error crawling activity page: %r", result)
+            continue
+        if result and result.get('activities_found'):
+            # Each page may have multiple activities
+            for activity in result['activities_found']:
+                activity['source_url'] = result.get('source_url', '')
+                all_activities.append(activity)
+                logger.debug("Extracted: %s", activity.get('name', 'Unknown'))
     
     if not all_activities:
         logger.warning("No activities successfully extracted")
         section['activity_options'] = []
         return section
     
-    logger.info(f"Successfully extracted {len(all_activities)} activities")
+    logger.info("Successfully extracted %d activities", len(all_activities))
     
     # Filter and rank
+    # Joined once here; the relevance prompt is built per activity from these strings
     section_requirements = {
-        'title': section.get('title', ''),
-        'learning_objectives': ' '.join(section.get('learning_objectives', [])),
-        'keywords': ', '.join(section.get('content_keywords', [])),
+        'title': title,
+        'learning_objectives': ' '.join(learning_objectives),
+        'keywords': ', '.join(content_keywords),
         'grade': grade_level
     }
     
     logger.info("Filtering and ranking activities...")
-    ranked = resource_filter.filter_and_rank_activities(all_activities, section_requirements)
-    
-    # Return top N
-    top_activities = ranked[:num_options]
+    top_activities = resource_filter.filter_and_rank_activities(
+        all_activities, section_requirements, top_k=num_options
+    )
     section['activity_options'] = top_activities
     
-    logger.info(f"Selected {len(top_activities)} top activit{'ies' if len(top_activities) != 1 else 'y'}")
+    logger.info(
+        "Selected %d top activit%s",
+        len(top_activities), 'ies' if len(top_activities) != 1 else 'y'
+    )
     for i, act in enumerate(top_activities, 1):
-        logger.info(
-            f"  {i}. {act.get('name', 'Unknown')} "
-            f"(Score: {act.get('overall_score', 0):.1f})"
-        )
-    
-    logger.info(f"="*70)
+        logger.info("  %d. %s (Score: %.1f)", i, act.get('name', 'Unknown'), act.get('overall_score', 0))
     
     return section
 
 
+@lru_cache(maxsize=1)
+def _get_content_extractor() -> ContentExtractor:
+    """Lazily build the process-wide content extractor (shares one activity extraction cache)."""
+    activity_cache = DiskCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.ACTIVITY_EXTRACTION_CACHE_FILE),
+        default_ttl_seconds=CacheConfig.ACTIVITY_EXTRACTION_CACHE_TTL_SECONDS
+    )
+    return ContentExtractor(activity_cache=activity_cache)
+
+
+def _cached_search_activities(
+    search_handler: GoogleSearchHandler,
+    query: str,
+    num_results: int
+) -> List[Dict]:
+    """
+    Search for activity pages, reusing results for an identical (query, num_results)
+    seen within HandsOnConfig.SEARCH_CACHE_TTL_SECONDS.
+    
+    Empty results (no hits or an API error) are never cached, so a transient
+    failure doesn't stick for the whole TTL.
+    
+    Args:
+        search_handler: Handler used on a cache miss
+        query: Search query
+        num_results: Number of results wanted
+    
+    Returns:
+        list: Search results (fresh copies, safe for the caller to mutate)
+    """
+    key = (query, num_results)
+    now = time.monotonic()
+    
+    with _SEARCH_CACHE_LOCK:
+        cached = _SEARCH_CACHE.get(key)
+    if cached and now - cached[0] < HandsOnConfig.SEARCH_CACHE_TTL_SECONDS:
+        logger.info("Using cached search results for: '%s'", query)
+        return [dict(result) for result in cached[1]]
+    
+    results = search_handler.search_activities(query, num_results=num_results)
+    
+    if results:
+        with _SEARCH_CACHE_LOCK:
+            _SEARCH_CACHE.pop(key, None)
+            if len(_SEARCH_CACHE) >= _SEARCH_CACHE_MAX_ENTRIES:
+                # Evict the oldest entry
+                _SEARCH_CACHE.pop(next(iter(_SEARCH_CACHE)))
+            _SEARCH_CACHE[key] = (now, [dict(result) for result in results])
+    
+    return results
+
+
 def _validate_section_input(section: Dict) -> None:
     """
     Validate that section has required fields.
@@ -193,6 +270,7 @@ def _validate_section_input(section: Dict) -> None:
         )
 
 
+@lru_cache(maxsize=32)
 def _get_grade_level_descriptor(grade_level: str) -> str:
     """
     Get appropriate grade level descriptor for search queries.
@@ -209,26 +287,11 @@ def _get_grade_level_descriptor(grade_level: str) -> str:
         >>> _get_grade_level_descriptor("7")
         'middle school'
     """
-    try:
-        # Parse grade level to int
-        if isinstance(grade_level, str):
-            if '-' in grade_level:
-                grade = int(grade_level.split('-')[0])
-            elif grade_level.lower().startswith('k'):
-                grade = 0
-            else:
-                grade = int(grade_level)
-        else:
-            grade = int(grade_level)
-        
-        # Return descriptor
-        if grade <= 5:
-            return "elementary"
-        elif grade <= 8:
-            return "middle school"
-        else:
-            return "high school"
-    
-    except (ValueError, AttributeError):
+    match = _GRADE_RE.match(str(grade_level))
+    if not match:
         logger.warning(f"Could not parse grade level: {grade_level}, defaulting to 'elementary'")
-        return "elementary"
\ No newline at end of file
+        return "elementary"
+    
+    leading = match.group(1)
+    grade = 0 if leading in ('K', 'k') else int(leading)
+    return _GRADE_DESCRIPTOR_BUCKETS[min(grade, 9)]
\ No newline at end of file
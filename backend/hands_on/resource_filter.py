@@ -3,31 +3,261 @@ Resource filtering and ranking for worksheets and activities
 Filters based on quality and relevance to learning objectives
 """
 
+import asyncio
+import hashlib
 import logging
 import openai
-import json
 import os
-from typing import List, Dict, Optional
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Dict, Optional, Union
 
-from config import OPENAI_API_KEY
-from hands_on.resource_prompts import get_relevance_check_prompt
+import httpx
+import numpy as np
+import orjson
+from openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel, Field
+
+from config import OPENAI_API_KEY, HandsOnConfig, CacheConfig
+from hands_on.resource_prompts import (
+    get_relevance_check_prompt,
+    get_relevance_check_prompt_batch,
+    get_relevance_check_prompt_prefix,
+    format_relevance_resource_block
+)
+from utils.disk_cache import DiskCache
+from utils.semantic_cache import SemanticCache
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI
-openai.api_key = OPENAI_API_KEY
+# Activity score weights, one per column built in _calculate_activity_scores:
+# coverage (0-10), LLM quality (0-10), has steps, has materials, has duration, has objectives.
+# Relevance is 70% of the score (coverage/quality split evenly); content completeness is
+# 30% (steps 2.0, materials 1.0, duration 0.5, objectives 0.5, scaled by 0.75).
+_ACTIVITY_SCORE_WEIGHTS = np.array([0.35, 0.35, 1.5, 0.75, 0.375, 0.375])
+
+# Worksheet score weights, one per column built in _calculate_worksheet_scores:
+# visual quality, educational value, coverage, LLM quality (all 0-100), then a flat
+# 5-point bonus each for grade match, topic match and having images/art.
+_WORKSHEET_SCORE_WEIGHTS = np.array([0.25, 0.25, 0.30, 0.20, 5.0, 5.0, 5.0])
+
+# Lexical pre-screen: lowercase word tokens, minus words that say nothing about topic
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_LEXICAL_STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from", "how",
+    "in", "into", "is", "it", "its", "of", "on", "or", "that", "the", "their",
+    "this", "to", "use", "using", "what", "will", "with", "students", "student",
+    "learn", "understand", "grade", "activity", "worksheet",
+))
+
+
+class RelevanceCheck(BaseModel):
+    """One LLM relevance evaluation (validated before it's used for scoring)."""
+    is_suitable: bool
+    coverage_percentage: int = Field(ge=0, le=100)
+    quality_score: int = Field(ge=0, le=10)
+    matches_grade: bool
+    matches_topic: bool
+    reasoning: str
+
+
+# Structured-output schemas for the relevance requests (strict mode can't express
+# the numeric ranges, so RelevanceCheck validates those after parsing)
+_RELEVANCE_CHECK_PROPERTIES = {
+    'is_suitable': {'type': 'boolean'},
+    'coverage_percentage': {'type': 'integer'},
+    'quality_score': {'type': 'integer'},
+    'matches_grade': {'type': 'boolean'},
+    'matches_topic': {'type': 'boolean'},
+    'reasoning': {'type': 'string'},
+}
+
+_RELEVANCE_CHECK_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'relevance_check',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': _RELEVANCE_CHECK_PROPERTIES,
+            'required': list(_RELEVANCE_CHECK_PROPERTIES),
+            'additionalProperties': False,
+        },
+    },
+}
+
+_BATCHED_RELEVANCE_CHECK_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'relevance_checks',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'evaluations': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {'id': {'type': 'integer'}, **_RELEVANCE_CHECK_PROPERTIES},
+                        'required': ['id', *_RELEVANCE_CHECK_PROPERTIES],
+                        'additionalProperties': False,
+                    },
+                },
+            },
+            'required': ['evaluations'],
+            'additionalProperties': False,
+        },
+    },
+}
+
+
+@dataclass(slots=True)
+class WorksheetRecord:
+    """The fields of an analyzed worksheet the filter reads, pulled out of the dict once per run."""
+    source: Dict                        # Original worksheet dict (what callers get back)
+    worksheet_title: str = "Unknown"
+    description: str = ""
+    topics_covered: list = field(default_factory=list)
+    visual_quality: float = 0           # 0-10
+    educational_value: float = 0        # 0-10
+    is_age_appropriate: bool = False
+    has_images_or_art: bool = False
+    lexical_score: float = 0            # Word-overlap cosine with the section requirements
+    prompt_block: str = ""              # format_relevance_resource_block() text
+    relevance_data: Optional[Dict] = None
+    
+    @classmethod
+    def from_dict(cls, worksheet: Dict) -> "WorksheetRecord":
+        return cls(
+            source=worksheet,
+            worksheet_title=worksheet.get('worksheet_title', "Unknown"),
+            description=worksheet.get('description', ""),
+            topics_covered=worksheet.get('topics_covered') or [],
+            visual_quality=worksheet.get('visual_quality', 0),
+            educational_value=worksheet.get('educational_value', 0),
+            is_age_appropriate=worksheet.get('is_age_appropriate', False),
+            has_images_or_art=worksheet.get('has_images_or_art', False)
+        )
+    
+    def is_quality(self) -> bool:
+        """Check if worksheet meets minimum quality standards."""
+        # Must be age-appropriate
+        if not self.is_age_appropriate:
+            return False
+        
+        # Must have reasonable visual quality (at least 5/10)
+        if self.visual_quality < 5:
+            return False
+        
+        # Must have reasonable educational value (at least 5/10)
+        if self.educational_value < 5:
+            return False
+        
+        # Must have topics covered
+        if not self.topics_covered:
+            return False
+        
+        return True
+    
+    def lexical_fields(self) -> tuple:
+        """Text compared against the section requirements by the lexical pre-screen."""
+        return self.worksheet_title, self.description, self.topics_covered
+
+
+@dataclass(slots=True)
+class ActivityRecord:
+    """The fields of an extracted activity the filter reads, pulled out of the dict once per run."""
+    source: Dict                        # Original activity dict (what callers get back)
+    name: str = ""
+    description: str = ""
+    steps: list = field(default_factory=list)
+    materials: list = field(default_factory=list)
+    duration: str = ""
+    learning_objectives: list = field(default_factory=list)
+    prompt_block: str = ""              # format_relevance_resource_block() text
+    relevance_data: Optional[Dict] = None
+    
+    @classmethod
+    def from_dict(cls, activity: Dict) -> "ActivityRecord":
+        return cls(
+            source=activity,
+            name=activity.get('name') or "",
+            description=activity.get('description') or "",
+            steps=activity.get('steps') or [],
+            materials=activity.get('materials') or [],
+            duration=activity.get('duration') or "",
+            learning_objectives=activity.get('learning_objectives') or []
+        )
+    
+    def is_quality(self) -> bool:
+        """Check if activity meets minimum quality standards."""
+        # Must have a name
+        if not self.name:
+            return False
+        
+        # Must have description
+        if not self.description:
+            return False
+        
+        # Must have either steps or materials
+        if not self.steps and not self.materials:
+            return False
+        
+        return True
+    
+    def lexical_fields(self) -> tuple:
+        """Text compared against the section requirements by the lexical pre-screen."""
+        return self.name, self.description, self.learning_objectives
+
+
+@lru_cache(maxsize=1)
+def get_relevance_disk_cache() -> DiskCache:
+    """Lazily open the process-wide persistent relevance-check cache."""
+    return DiskCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.RELEVANCE_CHECK_CACHE_FILE),
+        default_ttl_seconds=CacheConfig.RELEVANCE_CHECK_CACHE_TTL_SECONDS
+    )
+
+
+@lru_cache(maxsize=1)
+def get_relevance_semantic_cache() -> SemanticCache:
+    """Lazily open the process-wide relevance-check semantic cache."""
+    return SemanticCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.RELEVANCE_SEMANTIC_CACHE_FILE),
+        threshold=HandsOnConfig.RELEVANCE_SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds=CacheConfig.RELEVANCE_SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries=CacheConfig.RELEVANCE_SEMANTIC_CACHE_MAX_ENTRIES
+    )
 
 
 class ResourceFilter:
     """Filters and ranks worksheets and activities based on quality and relevance."""
     
-    def __init__(self, openai_api_key: str = None):
+    def __init__(
+        self,
+        openai_api_key: str = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        relevance_cache: Optional[DiskCache] = None,
+        http_client: Optional[httpx.Client] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         """
         Initialize the resource filter.
         
         Args:
             openai_api_key: OpenAI API key (defaults to config value)
+            semantic_cache: Optional cache of relevance results keyed by the
+                embedding of the relevance prompt; near-duplicate prompts reuse
+                an earlier result instead of calling the LLM
+            relevance_cache: Optional persistent cache of relevance results keyed
+                by exact prompt and model, so reruns of a section skip the LLM
+            http_client: Optional HTTP client for the blocking OpenAI client
+                (e.g. with a mock transport in tests)
+            async_transport: Optional transport for the per-run async HTTP client
         
         Raises:
             ValueError: If API key not provided
@@ -39,20 +269,39 @@ class ResourceFilter:
                 "or pass to constructor."
             )
         
-        openai.api_key = self.api_key
+        # Own client rather than the module-level openai globals
+        self.client = OpenAI(
+            api_key=self.api_key,
+            http_client=http_client,
+            max_retries=HandsOnConfig.RELEVANCE_CHECK_MAX_RETRIES,
+            timeout=HandsOnConfig.RELEVANCE_CHECK_TIMEOUT_SECONDS
+        )
+        self.async_transport = async_transport
+        self.semantic_cache = semantic_cache
+        self.relevance_cache = relevance_cache
+        
+        # Exact-prompt memo (prompt hash -> relevance data), bounded LRU
+        self._exact_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._exact_cache_lock = threading.Lock()
         logger.info("Initialized ResourceFilter")
     
     def filter_and_rank_worksheets(
         self, 
         worksheets: List[Dict], 
-        section_requirements: Dict
+        section_requirements: Dict,
+        top_k: Optional[int] = None
     ) -> List[Dict]:
         """
         Filter and rank worksheet images based on visual quality and relevance.
         
+        Blocking — the relevance checks run concurrently on their own event loop
+        via asyncio.run(), so call this from a worker thread, not from inside a
+        running event loop (use filter_and_rank_worksheets_async() there).
+        
         Args:
             worksheets: List of analyzed worksheet images
             section_requirements: Learning objectives and keywords from outline
+            top_k: Only return the best `top_k` (None = all)
         
         Returns:
             list: Filtered and ranked worksheets (best first)
@@ -64,86 +313,289 @@ class ResourceFilter:
             >>> len(ranked) <= len(worksheets)
             True
         """
+        return asyncio.run(self.filter_and_rank_worksheets_async(worksheets, section_requirements, top_k))
+    
+    async def filter_and_rank_worksheets_async(
+        self, 
+        worksheets: List[Dict], 
+        section_requirements: Dict,
+        top_k: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Async counterpart of filter_and_rank_worksheets().
+        
+        Worksheets passing the quality checks get their LLM relevance checks
+        dispatched all at once (bounded by RELEVANCE_CHECK_CONCURRENCY).
+        
+        Args:
+            worksheets: List of analyzed worksheet images
+            section_requirements: Learning objectives and keywords from outline
+            top_k: Only return the best `top_k` (None = all)
+        
+        Returns:
+            list: Filtered and ranked worksheets (best first)
+        """
         logger.info(f"Filtering {len(worksheets)} worksheets")
-        filtered_worksheets = []
+        candidates = self._select_quality_worksheets(worksheets, section_requirements)
         
+        # Check relevance using LLM (concurrently)
+        relevance_results = await self._check_relevance_many_async(
+            [candidate.source for candidate in candidates],
+            section_requirements,
+            [candidate.prompt_block for candidate in candidates]
+        )
+        
+        return self._rank_worksheets(candidates, relevance_results, top_k)
+    
+    def filter_and_rank_activities(
+        self, 
+        activities: List[Dict], 
+        section_requirements: Dict,
+        top_k: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Filter and rank activities based on quality and relevance.
+        
+        Blocking — the relevance checks run concurrently on their own event loop
+        via asyncio.run(), so call this from a worker thread, not from inside a
+        running event loop (use filter_and_rank_activities_async() there).
+        
+        Args:
+            activities: List of extracted activities
+            section_requirements: Learning objectives and keywords from outline
+            top_k: Only return the best `top_k` (None = all)
+        
+        Returns:
+            list: Filtered and ranked activities (best first)
+        
+        Example:
+            >>> filter = ResourceFilter()
+            >>> activities = [{'name': 'Science Experiment', ...}]
+            >>> ranked = filter.filter_and_rank_activities(activities, requirements)
+            >>> len(ranked) <= len(activities)
+            True
+        """
+        return asyncio.run(self.filter_and_rank_activities_async(activities, section_requirements, top_k))
+    
+    async def filter_and_rank_activities_async(
+        self, 
+        activities: List[Dict], 
+        section_requirements: Dict,
+        top_k: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Async counterpart of filter_and_rank_activities().
+        
+        Activities passing the quality checks get their LLM relevance checks
+        dispatched all at once (bounded by RELEVANCE_CHECK_CONCURRENCY).
+        
+        Args:
+            activities: List of extracted activities
+            section_requirements: Learning objectives and keywords from outline
+            top_k: Only return the best `top_k` (None = all)
+        
+        Returns:
+            list: Filtered and ranked activities (best first)
+        """
+        logger.info(f"Filtering {len(activities)} activities")
+        candidates = self._select_quality_activities(activities, section_requirements)
+        
+        # Check relevance using LLM (concurrently)
+        relevance_results = await self._check_relevance_many_async(
+            [candidate.source for candidate in candidates],
+            section_requirements,
+            [candidate.prompt_block for candidate in candidates]
+        )
+        
+        return self._rank_activities(activities, candidates, relevance_results, top_k)
+    
+    def _select_quality_worksheets(self, worksheets: List[Dict], section_requirements: Dict) -> List[WorksheetRecord]:
+        """
+        Worksheets worth an LLM relevance check (analysis succeeded, quality and lexical checks pass).
+        
+        Worksheets have no fallback after ranking (unlike activities), so when the
+        lexical gate would reject every quality worksheet (e.g. the section is
+        phrased with synonyms), the LEXICAL_FALLBACK_TOP_N closest ones still go
+        to the LLM.
+        """
+        requirement_tokens = self._requirement_tokens(section_requirements)
+        candidates = []
+        off_topic = []
         for worksheet in worksheets:
             # Skip if analysis failed
             if not worksheet:
                 continue
             
-            # Basic quality checks
-            if not self._is_quality_worksheet(worksheet):
-                logger.info(f"[filter] REJECTED low-quality: {worksheet.get('worksheet_title', 'Unknown')} visual={worksheet.get('visual_quality')} edu={worksheet.get('educational_value')} age_ok={worksheet.get('is_age_appropriate')}")
+            record = self._evaluate_worksheet(worksheet, requirement_tokens)
+            if record is None:
                 continue
-            
-            # Check relevance using LLM
-            relevance_data = self._check_relevance(worksheet, section_requirements)
+            on_topic = record.lexical_score >= HandsOnConfig.LEXICAL_RELEVANCE_MIN_SCORE
+            (candidates if on_topic else off_topic).append(record)
+        
+        if not candidates and off_topic:
+            candidates = sorted(off_topic, key=lambda r: r.lexical_score, reverse=True)
+            candidates = candidates[:HandsOnConfig.LEXICAL_FALLBACK_TOP_N]
+            logger.info(
+                f"[filter] No worksheet passed the lexical check - sending the closest "
+                f"{len(candidates)} of {len(off_topic)} to the LLM anyway"
+            )
+            for record in candidates:
+                record.prompt_block = format_relevance_resource_block(record.source)
+        
+        return candidates
+    
+    def _evaluate_worksheet(self, worksheet: Dict, requirement_tokens: frozenset) -> Optional[WorksheetRecord]:
+        """
+        Everything done to one worksheet before its relevance check, in one pass.
+        
+        Reads the worksheet's fields once, gates on quality, scores lexical
+        overlap, and formats its relevance prompt block from the same dict;
+        scoring later reads the record rather than the dict.
+        
+        Args:
+            worksheet: Analyzed worksheet data
+            requirement_tokens: From _requirement_tokens()
+        
+        Returns:
+            WorksheetRecord: None if low quality; otherwise the record, without a
+                prompt_block if it failed the lexical check (kept for
+                _select_quality_worksheets()'s fallback)
+        """
+        record = WorksheetRecord.from_dict(worksheet)
+        
+        # Basic quality checks
+        if not record.is_quality():
+            logger.info(f"[filter] REJECTED low-quality: {record.worksheet_title} visual={record.visual_quality} edu={record.educational_value} age_ok={record.is_age_appropriate}")
+            return None
+        
+        # Cheap word-overlap check before paying for an LLM call
+        record.lexical_score = self._lexical_relevance(record, requirement_tokens)
+        if record.lexical_score < HandsOnConfig.LEXICAL_RELEVANCE_MIN_SCORE:
+            logger.info(f"[filter] REJECTED off-topic: {record.worksheet_title} lexical={record.lexical_score:.3f}")
+            return record
+        
+        record.prompt_block = format_relevance_resource_block(worksheet)
+        return record
+    
+    def _rank_worksheets(
+        self,
+        candidates: List[WorksheetRecord],
+        relevance_results: List[Optional[Dict]],
+        top_k: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Keep suitable worksheets, score them and sort best first.
+        
+        Args:
+            candidates: Worksheets that passed the quality checks
+            relevance_results: Relevance evaluation (or None) per candidate
+            top_k: Only return the best `top_k` (None = all)
+        
+        Returns:
+            list: Filtered and ranked worksheets (best first)
+        """
+        suitable = []
+        
+        for record, relevance_data in zip(candidates, relevance_results):
             if not relevance_data:
                 continue
             
             # Add relevance scores to worksheet
-            worksheet['relevance_data'] = relevance_data
+            record.relevance_data = relevance_data
+            record.source['relevance_data'] = relevance_data
             
             # Only keep suitable worksheets
             if relevance_data.get('is_suitable', False):
-                # Calculate overall score
-                worksheet['overall_score'] = self._calculate_worksheet_score(worksheet, relevance_data)
-                filtered_worksheets.append(worksheet)
+                suitable.append(record)
             else:
                 logger.info(
-                    f"[filter] REJECTED not suitable: {worksheet.get('worksheet_title', 'Unknown')} - "
+                    f"[filter] REJECTED not suitable: {record.worksheet_title} - "
                     f"{relevance_data.get('reasoning', '')}"
                 )
         
-        # Sort by overall score (highest first)
-        filtered_worksheets.sort(key=lambda x: x['overall_score'], reverse=True)
+        # Score all suitable worksheets in one pass and rank (highest first, ties keep input order)
+        filtered_worksheets = []
+        if suitable:
+            scores = self._calculate_worksheet_scores(suitable)
+            for record, score in zip(suitable, scores.tolist()):
+                record.source['overall_score'] = score
+            filtered_worksheets = [suitable[i].source for i in self._best_first(scores, top_k)]
         
         logger.info(f"Filtered to {len(filtered_worksheets)} quality worksheets")
         return filtered_worksheets
     
-    def filter_and_rank_activities(
-        self, 
-        activities: List[Dict], 
-        section_requirements: Dict
+    def _select_quality_activities(self, activities: List[Dict], section_requirements: Dict) -> List[ActivityRecord]:
+        """Activities worth an LLM relevance check (extraction succeeded, quality and lexical checks pass)."""
+        requirement_tokens = self._requirement_tokens(section_requirements)
+        candidates = []
+        for activity in activities:
+            # Skip if extraction failed
+            if not activity:
+                continue
+            
+            record = self._evaluate_activity(activity, requirement_tokens)
+            if record is not None:
+                candidates.append(record)
+        
+        return candidates
+    
+    def _evaluate_activity(self, activity: Dict, requirement_tokens: frozenset) -> Optional[ActivityRecord]:
+        """
+        Everything done to one activity before its relevance check, in one pass.
+        
+        Same as _evaluate_worksheet(), for an extracted activity.
+        
+        Args:
+            activity: Extracted activity data
+            requirement_tokens: From _requirement_tokens()
+        
+        Returns:
+            ActivityRecord: Candidate for the relevance check, or None if rejected
+        """
+        record = ActivityRecord.from_dict(activity)
+        
+        # Basic quality checks
+        if not record.is_quality():
+            logger.debug("Skipping low-quality activity: %s", record.name or 'Unknown')
+            return None
+        
+        # Cheap word-overlap check before paying for an LLM call
+        lexical_score = self._lexical_relevance(record, requirement_tokens)
+        if lexical_score < HandsOnConfig.LEXICAL_RELEVANCE_MIN_SCORE:
+            logger.debug("Skipping off-topic activity: %s (lexical=%.3f)", record.name, lexical_score)
+            return None
+        
+        record.prompt_block = format_relevance_resource_block(activity)
+        return record
+    
+    def _rank_activities(
+        self,
+        activities: List[Dict],
+        candidates: List[ActivityRecord],
+        relevance_results: List[Optional[Dict]],
+        top_k: Optional[int] = None
     ) -> List[Dict]:
         """
-        Filter and rank activities based on quality and relevance.
+        Keep suitable activities, score them and sort best first.
         
         Args:
-            activities: List of extracted activities
-            section_requirements: Learning objectives and keywords from outline
+            activities: All activities passed in (used for the fallback)
+            candidates: Activities that passed the quality checks
+            relevance_results: Relevance evaluation (or None) per candidate
+            top_k: Only return the best `top_k` (None = all)
         
         Returns:
             list: Filtered and ranked activities (best first)
-        
-        Example:
-            >>> filter = ResourceFilter()
-            >>> activities = [{'name': 'Science Experiment', ...}]
-            >>> ranked = filter.filter_and_rank_activities(activities, requirements)
-            >>> len(ranked) <= len(activities)
-            True
         """
-        logger.info(f"Filtering {len(activities)} activities")
-        filtered_activities = []
+        suitable = []
         
-        for activity in activities:
-            # Skip if extraction failed
-            if not activity:
-                continue
-            
-            # Basic quality checks
-            if not self._is_quality_activity(activity):
-                logger.debug(f"Skipping low-quality activity: {activity.get('name', 'Unknown')}")
-                continue
-            
-            # Check relevance using LLM
-            relevance_data = self._check_relevance(activity, section_requirements)
+        for record, relevance_data in zip(candidates, relevance_results):
             if not relevance_data:
                 continue
             
             # Add relevance scores to activity
-            activity['relevance_data'] = relevance_data
+            record.relevance_data = relevance_data
+            record.source['relevance_data'] = relevance_data
             
             # Only keep suitable activities - LENIENT FILTERING
             is_lenient_suitable = (
@@ -153,15 +605,21 @@ class ResourceFilter:
             )
             
             if is_lenient_suitable:
-                # Calculate overall score
-                activity['overall_score'] = self._calculate_activity_score(activity, relevance_data)
-                filtered_activities.append(activity)
+                suitable.append(record)
             else:
                 logger.debug(
-                    f"Activity not suitable: {activity.get('name', 'Unknown')} - "
+                    f"Activity not suitable: {record.name} - "
                     f"{relevance_data.get('reasoning', '')}"
                 )
         
+        # Score all suitable activities in one pass and rank (highest first, ties keep input order)
+        filtered_activities = []
+        if suitable:
+            scores = self._calculate_activity_scores(suitable)
+            for record, score in zip(suitable, scores.tolist()):
+                record.source['overall_score'] = score
+            filtered_activities = [suitable[i].source for i in self._best_first(scores, top_k)]
+        
         # FALLBACK: If NO activities passed, take top 3 by quality anyway
         if len(filtered_activities) == 0 and len(activities) > 0:
             logger.warning("No activities met strict criteria - showing top 3 by description quality")
@@ -171,180 +629,566 @@ class ResourceFilter:
                 key=lambda x: len(x.get('steps', [])) + (10 if x.get('materials') else 0),
                 reverse=True
             )
-            for act in quality_sorted[:3]:
+            for act in quality_sorted[:3 if top_k is None else min(3, top_k)]:
                 act['overall_score'] = 7.0  # Default score
                 filtered_activities.append(act)
         
-        # Sort by overall score (highest first)
-        filtered_activities.sort(key=lambda x: x.get('overall_score', 0), reverse=True)
-        
         logger.info(f"Filtered to {len(filtered_activities)} quality activities")
         return filtered_activities
     
-    def _is_quality_worksheet(self, worksheet: Dict) -> bool:
+    @staticmethod
+    def _best_first(scores: np.ndarray, top_k: Optional[int] = None) -> List[int]:
+        """
+        Indices of `scores`, highest first (ties keep input order).
+        
+        With `top_k`, an O(N) partition finds the cut-off score first and
+        only the entries at or above it are sorted.
+        """
+        if top_k is None or top_k >= len(scores):
+            return np.argsort(-scores, kind='stable').tolist()
+        if top_k <= 0:
+            return []
+        cutoff = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        candidates = np.flatnonzero(scores >= cutoff)  # ascending index, so ties stay in input order
+        return candidates[np.argsort(-scores[candidates], kind='stable')][:top_k].tolist()
+    
+    def _is_quality_activity(self, activity: Dict) -> bool:
         """
-        Check if worksheet meets minimum quality standards.
+        Check if activity meets minimum quality standards.
         
         Args:
-            worksheet: Analyzed worksheet data
+            activity: Extracted activity data
         
         Returns:
             bool: True if meets quality standards
         """
-        # Must be age-appropriate
-        if not worksheet.get('is_age_appropriate', False):
-            return False
+        return ActivityRecord.from_dict(activity).is_quality()
+    
+    @staticmethod
+    def _tokenize(*values) -> frozenset:
+        """Distinct content words across strings / lists of strings (trailing plural 's' dropped)."""
+        tokens = set()
+        for value in values:
+            if not value:
+                continue
+            text = ' '.join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+            for token in _TOKEN_RE.findall(text.lower()):
+                if token in _LEXICAL_STOPWORDS:
+                    continue
+                tokens.add(token[:-1] if len(token) > 3 and token.endswith('s') else token)
+        return frozenset(tokens)
+    
+    def _requirement_tokens(self, section_requirements: Dict) -> frozenset:
+        """Token set of the section requirements, built once per filter run."""
+        return self._tokenize(
+            section_requirements.get('title'),
+            section_requirements.get('learning_objectives'),
+            section_requirements.get('keywords')
+        )
+    
+    def _lexical_relevance(
+        self,
+        resource: Union[WorksheetRecord, ActivityRecord],
+        requirement_tokens: frozenset
+    ) -> float:
+        """
+        Word-overlap cosine between a resource and the section requirements.
         
-        # Must have reasonable visual quality (at least 5/10)
-        if worksheet.get('visual_quality', 0) < 5:
-            return False
+        Cosine over binary bag-of-words vectors, i.e. |A ∩ B| / sqrt(|A| |B|) —
+        no model or fitting needed. Only meant to drop clearly off-topic scraper
+        noise; anything borderline is left to the LLM check.
         
-        # Must have reasonable educational value (at least 5/10)
-        if worksheet.get('educational_value', 0) < 5:
-            return False
+        Args:
+            resource: Worksheet or activity
+            requirement_tokens: From _requirement_tokens()
         
-        # Must have topics covered
-        if not worksheet.get('topics_covered'):
-            return False
+        Returns:
+            float: 0.0-1.0 (1.0 when there are no requirements to compare against)
+        """
+        if not requirement_tokens:
+            return 1.0
         
-        return True
+        resource_tokens = self._tokenize(*resource.lexical_fields())
+        if not resource_tokens:
+            return 0.0
+        
+        overlap = len(resource_tokens & requirement_tokens)
+        return overlap / (len(resource_tokens) * len(requirement_tokens)) ** 0.5
     
-    def _is_quality_activity(self, activity: Dict) -> bool:
+    async def _check_relevance_many_async(
+        self,
+        resources: List[Dict],
+        section_requirements: Dict,
+        resource_blocks: Optional[List[str]] = None
+    ) -> List[Optional[Dict]]:
         """
-        Check if activity meets minimum quality standards.
+        Run the relevance check for every resource concurrently.
+        
+        Resources whose prompts are identical (e.g. the same worksheet found
+        twice) share one check. Each distinct prompt is looked up in the exact
+        memo, then (with one embeddings call for all of them) in the semantic
+        cache. The rest are packed RELEVANCE_CHECK_BATCH_SIZE to an LLM request,
+        with all requests in flight concurrently.
+        
+        One AsyncOpenAI client (and one pooled HTTP connection set) is shared
+        by all the checks, with at most RELEVANCE_CHECK_CONCURRENCY requests in
+        flight to stay under rate limits. Rate-limit and connection errors are
+        retried by the SDK with exponential backoff.
+        
+        Results are collected as they complete. Each request is cut off after
+        RELEVANCE_CHECK_TIMEOUT_SECONDS, and whatever hasn't finished
+        RELEVANCE_CHECK_DEADLINE_SECONDS into the run is cancelled, so one slow
+        tail request can't hold up the ranking (those resources get None).
         
         Args:
-            activity: Extracted activity data
+            resources: Resources that passed the quality checks
+            section_requirements: Learning objectives from outline
+            resource_blocks: Precomputed format_relevance_resource_block() per
+                resource (e.g. record.prompt_block)
         
         Returns:
-            bool: True if meets quality standards
+            list: Relevance evaluation data (or None) per resource, in input order
         """
-        # Must have a name
-        if not activity.get('name'):
-            return False
+        if not resources:
+            return []
         
-        # Must have description
-        if not activity.get('description'):
-            return False
+        if resource_blocks is None:
+            resource_blocks = [format_relevance_resource_block(r) for r in resources]
         
-        # Must have either steps or materials
-        if not activity.get('steps') and not activity.get('materials'):
-            return False
+        prefix = get_relevance_check_prompt_prefix(section_requirements)
+        requests = [
+            self._get_relevance_check_request(r, section_requirements, prefix, block)
+            for r, block in zip(resources, resource_blocks)
+        ]
+        keys = [self._exact_cache_key(request) for request in requests]
+        # first (resource, request, block) per distinct prompt
+        unique = dict(zip(keys, zip(resources, requests, resource_blocks)))
         
-        return True
+        results: Dict[str, Optional[Dict]] = {}
+        for key in unique:
+            cached = self._get_exact_cached(key)
+            if cached is not None:
+                results[key] = cached
+        
+        semaphore = asyncio.Semaphore(HandsOnConfig.RELEVANCE_CHECK_CONCURRENCY)
+        
+        # Built per run: the blocking entry points give each run its own event
+        # loop (asyncio.run), and an async HTTP client can't outlive its loop
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HandsOnConfig.RELEVANCE_CHECK_MAX_CONNECTIONS,
+                max_keepalive_connections=HandsOnConfig.RELEVANCE_CHECK_MAX_CONNECTIONS
+            ),
+            transport=self.async_transport
+        )
+        
+        # Closing the OpenAI client also closes http_client
+        async with AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=http_client,
+            max_retries=HandsOnConfig.RELEVANCE_CHECK_MAX_RETRIES
+        ) as llm_client:
+            misses = [key for key in unique if key not in results]
+            
+            embeddings = dict(zip(misses, await self._embed_relevance_prompts_async(
+                [unique[key][1] for key in misses], llm_client
+            )))
+            # Score every miss against the whole cache in one product
+            semantic_hits = self._lookup_semantic_cache_many([embeddings[key] for key in misses])
+            for key, cached in zip(misses, semantic_hits):
+                if cached is not None:
+                    results[key] = cached
+                    self._set_exact_cached(key, cached)
+            
+            remaining = [key for key in misses if key not in results]
+            batch_size = HandsOnConfig.RELEVANCE_CHECK_BATCH_SIZE
+            batches = [remaining[i:i + batch_size] for i in range(0, len(remaining), batch_size)]
+            
+            async def check_batch(batch: List[str]):
+                return batch, await self._check_relevance_batch_async(
+                    [unique[key][0] for key in batch],
+                    [unique[key][1] for key in batch],
+                    section_requirements,
+                    llm_client,
+                    semaphore,
+                    [unique[key][2] for key in batch]
+                )
+            
+            tasks = [asyncio.create_task(check_batch(batch)) for batch in batches]
+            try:
+                for next_done in asyncio.as_completed(tasks, timeout=HandsOnConfig.RELEVANCE_CHECK_DEADLINE_SECONDS):
+                    try:
+                        batch, batch_result = await next_done
+                    except asyncio.TimeoutError:
+                        raise  # the run deadline, handled below
+                    except Exception as e:
+                        logger.error(f"Error checking relevance: {e!r}")
+                        continue
+                    
+                    for key, relevance_data in zip(batch, batch_result):
+                        if relevance_data is None:
+                            continue
+                        results[key] = relevance_data
+                        self._set_exact_cached(key, relevance_data)
+                        self._store_semantic_cache(embeddings[key], relevance_data)
+            
+            except asyncio.TimeoutError:
+                pending = [task for task in tasks if not task.done()]
+                logger.warning(
+                    f"Relevance checks hit the {HandsOnConfig.RELEVANCE_CHECK_DEADLINE_SECONDS}s deadline; "
+                    f"cancelling {len(pending)} of {len(tasks)} batches"
+                )
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        return [results.get(key) for key in keys]
     
-    def _check_relevance(self, resource: Dict, section_requirements: Dict) -> Optional[Dict]:
+    async def _check_relevance_batch_async(
+        self,
+        resources: List[Dict],
+        requests: List[Dict],
+        section_requirements: Dict,
+        llm_client: AsyncOpenAI,
+        semaphore: asyncio.Semaphore,
+        resource_blocks: Optional[List[str]] = None
+    ) -> List[Optional[Dict]]:
         """
-        Use LLM to check if resource matches section requirements.
+        Check several resources with a single LLM request.
+        
+        Falls back to one request per resource if the batched response can't
+        be used, so one bad evaluation doesn't lose the whole batch.
         
         Args:
-            resource: Extracted resource data
+            resources: Resources to check
+            requests: Their single-resource requests (used for the fallback)
             section_requirements: Learning objectives from outline
+            llm_client: Shared async OpenAI client
+            semaphore: Bounds the number of requests in flight
+            resource_blocks: Precomputed resource blocks for the batched prompt
+        
+        Returns:
+            list: Relevance evaluation data (or None) per resource, in order
+        """
+        if len(resources) > 1:
+            try:
+                async with semaphore:
+                    response = await asyncio.wait_for(
+                        llm_client.chat.completions.create(
+                            **self._get_batched_relevance_check_request(
+                                resources, section_requirements, resource_blocks
+                            )
+                        ),
+                        timeout=HandsOnConfig.RELEVANCE_CHECK_TIMEOUT_SECONDS
+                    )
+                return await self._parse_off_loop(self._parse_batched_relevance_check, response, len(resources))
+            
+            except asyncio.TimeoutError:
+                logger.warning("Batched relevance check timed out, retrying per resource")
+            except (openai.APIError, ValueError) as e:
+                logger.warning(f"Batched relevance check failed, retrying per resource: {e}")
+        
+        return list(await asyncio.gather(*(
+            self._check_relevance_async(request, llm_client, semaphore)
+            for request in requests
+        )))
+    
+    async def _check_relevance_async(
+        self,
+        request: Dict,
+        llm_client: AsyncOpenAI,
+        semaphore: asyncio.Semaphore
+    ) -> Optional[Dict]:
+        """
+        Use the LLM to check one prebuilt relevance request against the section
+        (no cache lookups — _check_relevance_many_async() handles those).
+        An invalid response is retried once with the fallback model.
+        
+        Args:
+            request: Relevance request from _get_relevance_check_request()
+            llm_client: Shared async OpenAI client
+            semaphore: Bounds the number of requests in flight
         
         Returns:
             dict: Relevance evaluation data, or None if check fails
         """
+        timeout = HandsOnConfig.RELEVANCE_CHECK_TIMEOUT_SECONDS
         try:
-            prompt = get_relevance_check_prompt(resource, section_requirements)
-            
-            response = openai.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at evaluating educational resources for elementary students. Always return valid JSON."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
-            
-            # Extract and parse response
-            response_text = response.choices[0].message.content.strip()
+            async with semaphore:
+                response = await asyncio.wait_for(llm_client.chat.completions.create(**request), timeout)
+            try:
+                return await self._parse_off_loop(self._parse_relevance_check, response)
+            except ValueError as e:
+                logger.warning(f"Invalid relevance check from {request['model']}, retrying with fallback model: {e}")
             
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text.replace("```json", "").replace("```", "").strip()
-            elif response_text.startswith("```"):
-                response_text = response_text.replace("```", "").strip()
-            
-            relevance_data = json.loads(response_text)
-            return relevance_data
+            async with semaphore:
+                response = await asyncio.wait_for(
+                    llm_client.chat.completions.create(**self._with_fallback_model(request)),
+                    timeout
+                )
+            return await self._parse_off_loop(self._parse_relevance_check, response)
         
-        except Exception as e:
+        except asyncio.TimeoutError:
+            logger.error(f"Relevance check timed out after {timeout}s")
+            return None
+        except (openai.APIError, ValueError) as e:
             logger.error(f"Error checking relevance: {e}")
             return None
     
-    def _calculate_worksheet_score(self, worksheet: Dict, relevance_data: Dict) -> float:
+    @staticmethod
+    async def _parse_off_loop(parse, response, *args):
         """
-        Calculate overall score for ranking worksheet images.
+        Run a response parser, in the default thread pool if the response is large.
         
-        Args:
-            worksheet: Analyzed worksheet data
-            relevance_data: Relevance evaluation from LLM
+        Small responses (nearly all of them) are parsed inline — a thread hop
+        costs more than orjson does. Big ones (long batched evaluations) would
+        otherwise stall every other in-flight check while they parse.
+        """
+        content = response.choices[0].message.content
+        if content and len(content) > HandsOnConfig.RELEVANCE_PARSE_OFFLOAD_CHARS:
+            return await asyncio.get_running_loop().run_in_executor(None, parse, response, *args)
+        return parse(response, *args)
+    
+    @staticmethod
+    def _exact_cache_key(request: Dict) -> str:
+        """Stable hash of a relevance request's model and prompt."""
+        prompt = request['messages'][-1]['content']
+        return hashlib.blake2b(
+            f"{request['model']}\0{prompt}".encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+    
+    def _get_exact_cached(self, key: str) -> Optional[Dict]:
+        """
+        Relevance data for an identical prompt, if any: the in-memory memo
+        first, then the persistent cache (a disk hit is promoted to memory).
+        """
+        with self._exact_cache_lock:
+            cached = self._exact_cache.get(key)
+            if cached is not None:
+                self._exact_cache.move_to_end(key)
+        if cached is not None:
+            logger.debug("Using cached relevance check (exact match)")
+            return cached
         
-        Returns:
-            float: Overall score (0-100)
+        if self.relevance_cache is not None:
+            cached = self.relevance_cache.get(key)
+            if cached is not None:
+                logger.debug("Using cached relevance check (disk)")
+                self._memoize(key, cached)
+        return cached
+    
+    def _set_exact_cached(self, key: str, relevance_data: Dict) -> None:
+        """Memoize relevance data and persist it to the disk cache, if any."""
+        self._memoize(key, relevance_data)
+        if self.relevance_cache is not None:
+            self.relevance_cache.set(key, relevance_data)
+    
+    def _memoize(self, key: str, relevance_data: Dict) -> None:
+        """Add to the in-memory memo, evicting the least recently used entry when full."""
+        with self._exact_cache_lock:
+            self._exact_cache[key] = relevance_data
+            self._exact_cache.move_to_end(key)
+            if len(self._exact_cache) > HandsOnConfig.RELEVANCE_EXACT_CACHE_MAX_ENTRIES:
+                self._exact_cache.popitem(last=False)
+    
+    async def _embed_relevance_prompts_async(
+        self,
+        requests: List[Dict],
+        llm_client: AsyncOpenAI
+    ) -> List[Optional[List[float]]]:
         """
-        # Visual quality score
-        visual_score = worksheet.get('visual_quality', 5) * 10  # Convert 0-10 to 0-100
+        Embed relevance requests' user prompts for the semantic cache (one API call).
         
-        # Educational value score
-        educational_score = worksheet.get('educational_value', 5) * 10
+        Only the varying part of each prompt (section requirements + resource) is
+        embedded, not the fixed instructions or system message, which would
+        otherwise dominate the similarity. Returns None for every request when
+        there's no cache or the embedding call fails, in which case the checks
+        simply run uncached.
+        """
+        if self.semantic_cache is None or not requests:
+            return [None] * len(requests)
+        try:
+            response = await llm_client.embeddings.create(
+                model=HandsOnConfig.RELEVANCE_EMBEDDING_MODEL,
+                input=[self._semantic_cache_text(request) for request in requests]
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            logger.warning(f"Error embedding relevance prompts: {e}")
+            return [None] * len(requests)
+    
+    @staticmethod
+    def _semantic_cache_text(request: Dict) -> str:
+        """The section-requirements + resource tail of a relevance prompt."""
+        prompt = request['messages'][-1]['content']
+        return prompt[prompt.find('SECTION REQUIREMENTS:'):] if 'SECTION REQUIREMENTS:' in prompt else prompt
+    
+    def _lookup_semantic_cache_many(self, embeddings: List[Optional[List[float]]]) -> List[Optional[Dict]]:
+        """Cached relevance data for near-identical prompts, if any (None embeddings are misses)."""
+        results: List[Optional[Dict]] = [None] * len(embeddings)
+        present = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        if not present:
+            return results
         
-        # Coverage score from relevance check
-        coverage_score = relevance_data.get('coverage_percentage', 50)
+        for i, cached in zip(present, self.semantic_cache.lookup_many([embeddings[i] for i in present])):
+            results[i] = cached
+        hits = sum(cached is not None for cached in results)
+        if hits:
+            logger.debug(f"Using {hits} cached relevance check(s) (semantic match)")
+        return results
+    
+    def _store_semantic_cache(self, embedding: Optional[List[float]], relevance_data: Dict) -> None:
+        """Remember a fresh relevance result under its prompt embedding."""
+        if embedding is not None:
+            self.semantic_cache.add(embedding, relevance_data)
+    
+    def _get_relevance_check_request(
+        self,
+        resource: Dict,
+        section_requirements: Dict,
+        prompt_prefix: Optional[str] = None,
+        resource_block: Optional[str] = None
+    ) -> Dict:
+        """
+        Build the chat.completions.create() arguments for one relevance check.
         
-        # LLM quality rating
-        llm_quality = relevance_data.get('quality_score', 5) * 10
+        Pass `prompt_prefix` (get_relevance_check_prompt_prefix()) when checking
+        many resources against the same section, so it's built only once, and
+        `resource_block` when the resource's block is already formatted.
+        """
+        prompt = get_relevance_check_prompt(resource, section_requirements, prompt_prefix, resource_block)
         
-        # Weighted average - visual quality matters for worksheets!
-        overall_score = (
-            visual_score * 0.25 +           # 25% visual appeal
-            educational_score * 0.25 +      # 25% educational value
-            coverage_score * 0.30 +         # 30% topic coverage
-            llm_quality * 0.20              # 20% LLM assessment
-        )
+        return {
+            'model': HandsOnConfig.RELEVANCE_CHECK_MODEL,
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "You are an expert at evaluating educational resources for elementary students. Always return valid JSON."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': 500,
+            'response_format': _RELEVANCE_CHECK_RESPONSE_FORMAT
+        }
+    
+    @staticmethod
+    def _with_fallback_model(request: Dict) -> Dict:
+        """The same relevance request, sent to the (stronger) fallback model."""
+        return {**request, 'model': HandsOnConfig.RELEVANCE_CHECK_FALLBACK_MODEL}
+    
+    def _parse_relevance_check(self, response) -> Dict:
+        """
+        Parse and validate a relevance check response.
+        
+        Raises:
+            ValueError: If the response isn't valid JSON or fails RelevanceCheck
+                validation (pydantic's ValidationError is a ValueError)
+        """
+        # json_schema response_format guarantees bare JSON, so no fence stripping
+        response_text = response.choices[0].message.content
+        if not response_text:
+            raise ValueError("Empty relevance check response")
+        
+        relevance_data = RelevanceCheck.model_validate(orjson.loads(response_text)).model_dump()
+        return relevance_data
+    
+    def _get_batched_relevance_check_request(
+        self,
+        resources: List[Dict],
+        section_requirements: Dict,
+        resource_blocks: Optional[List[str]] = None
+    ) -> Dict:
+        """Build the chat.completions.create() arguments for a multi-resource relevance check."""
+        prompt = get_relevance_check_prompt_batch(resources, section_requirements, resource_blocks)
+        
+        return {
+            'model': HandsOnConfig.RELEVANCE_CHECK_MODEL,
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "You are an expert at evaluating educational resources for elementary students. Always return valid JSON."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': 500 * len(resources),
+            'response_format': _BATCHED_RELEVANCE_CHECK_RESPONSE_FORMAT
+        }
+    
+    def _parse_batched_relevance_check(self, response, count: int) -> List[Optional[Dict]]:
+        """
+        Parse a multi-resource relevance response into one evaluation per resource.
         
-        # Bonus for exact grade match
-        if relevance_data.get('matches_grade', False):
-            overall_score += 5
+        Raises:
+            ValueError: If the response isn't the expected JSON shape or an
+                evaluation fails RelevanceCheck validation
+        """
+        response_text = response.choices[0].message.content
+        if not response_text:
+            raise ValueError("Empty batched relevance check response")
         
-        # Bonus for exact topic match
-        if relevance_data.get('matches_topic', False):
-            overall_score += 5
+        data = orjson.loads(response_text)
+        evaluations = data.get('evaluations')
+        if not isinstance(evaluations, list):
+            raise ValueError("Batched relevance response missing 'evaluations' list")
         
-        # Bonus for having visual elements (images/art)
-        if worksheet.get('has_images_or_art', False):
-            overall_score += 5
+        results: List[Optional[Dict]] = [None] * count
+        for evaluation in evaluations:
+            index = evaluation.pop('id', None) if isinstance(evaluation, dict) else None
+            if isinstance(index, int) and 0 <= index < count:
+                results[index] = RelevanceCheck.model_validate(evaluation).model_dump()
         
-        return min(overall_score, 100)  # Cap at 100
+        if any(result is None for result in results):
+            raise ValueError("Batched relevance response is missing evaluations")
+        return results
     
-    def _calculate_activity_score(self, activity: Dict, relevance_data: Dict) -> float:
+    def _calculate_worksheet_scores(self, worksheets: List[WorksheetRecord]) -> np.ndarray:
         """
-        Calculate overall score for an activity.
+        Calculate overall scores for a batch of relevance-checked worksheet images.
         
         Args:
-            activity: Activity data
-            relevance_data: Relevance evaluation from LLM
+            worksheets: Worksheets with relevance_data set
         
         Returns:
-            float: Overall score (0-10)
+            np.ndarray: Overall score per worksheet (0-100), in input order
         """
-        # Relevance factors (70% of score)
-        coverage = relevance_data.get('coverage_percentage', 50) / 10  # Scale to 0-10
-        quality = relevance_data.get('quality_score', 5)
-        relevance_score = (coverage * 0.5 + quality * 0.5) * 0.7
+        features = np.array([
+            (
+                worksheet.visual_quality * 10,  # Convert 0-10 to 0-100
+                worksheet.educational_value * 10,
+                worksheet.relevance_data.get('coverage_percentage', 50),
+                worksheet.relevance_data.get('quality_score', 5) * 10,
+                bool(worksheet.relevance_data.get('matches_grade', False)),
+                bool(worksheet.relevance_data.get('matches_topic', False)),
+                bool(worksheet.has_images_or_art),
+            )
+            for worksheet in worksheets
+        ], dtype=np.float64)
         
-        # Content quality factors (30% of score)
-        has_steps = 2.0 if activity.get('steps') else 0
-        has_materials = 1.0 if activity.get('materials') else 0
-        has_duration = 0.5 if activity.get('duration') else 0
-        has_objectives = 0.5 if activity.get('learning_objectives') else 0
+        return np.minimum(features @ _WORKSHEET_SCORE_WEIGHTS, 100.0)  # Cap at 100
+    
+    def _calculate_activity_scores(self, activities: List[ActivityRecord]) -> np.ndarray:
+        """
+        Calculate overall scores for a batch of relevance-checked activities.
         
-        content_score = (has_steps + has_materials + has_duration + has_objectives) * 0.75
+        Args:
+            activities: Activities with relevance_data set
         
-        overall = relevance_score + content_score
+        Returns:
+            np.ndarray: Overall score per activity (0-10), in input order
+        """
+        features = np.array([
+            (
+                activity.relevance_data.get('coverage_percentage', 50) / 10,  # Scale to 0-10
+                activity.relevance_data.get('quality_score', 5),
+                bool(activity.steps),
+                bool(activity.materials),
+                bool(activity.duration),
+                bool(activity.learning_objectives),
+            )
+            for activity in activities
+        ], dtype=np.float64)
         
-        return min(overall, 10.0)  # Cap at 10
\ No newline at end of file
+        return np.minimum(features @ _ACTIVITY_SCORE_WEIGHTS, 10.0)  # Cap at 10
@@ -3,7 +3,7 @@ Prompts for Phase 3: Worksheet & Activity Generation
 """
 
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from utils.llm_handler import call_openai
 
@@ -244,21 +244,137 @@ def _get_fallback_activity_prompts(section_title: str, grade_level: str) -> List
     ]
 
 
-def get_relevance_check_prompt(resource: Dict, section_requirements: Dict) -> str:
+_RELEVANCE_CHECK_INSTRUCTIONS = """
+Evaluate if the educational resource at the end of this prompt matches the section requirements.
+
+Analyze and return JSON:
+{
+  "is_suitable": true/false,
+  "coverage_percentage": 0-100,
+  "quality_score": 0-10,
+  "matches_grade": true/false,
+  "matches_topic": true/false,
+  "reasoning": "brief explanation of suitability"
+}
+
+Return valid JSON only.
+"""
+
+
+def get_relevance_check_prompt_prefix(section_requirements: Dict) -> str:
+    """
+    Build the part of the relevance prompt shared by every resource in a section.
+    
+    Static instructions first, then the section requirements, so all checks for
+    one section start with the same text (eligible for provider-side prompt
+    caching). Build it once per filter run and pass it to
+    get_relevance_check_prompt().
+    
+    Args:
+        section_requirements: Learning objectives from section
+    
+    Returns:
+        str: Prompt prefix ending just before the resource block
+    """
+    return f"""{_RELEVANCE_CHECK_INSTRUCTIONS}
+SECTION REQUIREMENTS:
+- Title: {section_requirements.get('title', 'Unknown')}
+- Learning Objectives: {section_requirements.get('learning_objectives', 'N/A')}
+- Keywords: {section_requirements.get('keywords', 'N/A')}
+- Grade: {section_requirements.get('grade', 'Unknown')}
+"""
+
+
+def get_relevance_check_prompt(
+    resource: Dict,
+    section_requirements: Dict,
+    prefix: Optional[str] = None,
+    resource_block: Optional[str] = None
+) -> str:
     """
     Generate prompt for LLM to check resource relevance.
     
+    The per-resource block comes last, after the shared prefix.
+    
     Args:
         resource: Extracted resource data (worksheet or activity)
         section_requirements: Learning objectives from section
+        prefix: Precomputed get_relevance_check_prompt_prefix(section_requirements)
+        resource_block: Precomputed format_relevance_resource_block(resource)
     
     Returns:
         str: Prompt for LLM relevance checking
     """
-    resource_type = resource.get('resource_type', 'resource')
+    if prefix is None:
+        prefix = get_relevance_check_prompt_prefix(section_requirements)
+    if resource_block is None:
+        resource_block = format_relevance_resource_block(resource)
+    
+    return prefix + resource_block
+
+
+def get_relevance_check_prompt_batch(
+    resources: List[Dict],
+    section_requirements: Dict,
+    resource_blocks: Optional[List[str]] = None
+) -> str:
+    """
+    Generate one prompt checking several resources against the same section.
+    
+    Resources are numbered 0..K-1 and the model returns one evaluation per id,
+    each with the same fields as the single-resource prompt.
+    
+    Args:
+        resources: Extracted resources (worksheets or activities)
+        section_requirements: Learning objectives from section
+        resource_blocks: Precomputed format_relevance_resource_block() per resource
+    
+    Returns:
+        str: Prompt asking for {"evaluations": [{"id": 0, ...}, ...]}
+    """
+    if resource_blocks is None:
+        resource_blocks = [format_relevance_resource_block(resource) for resource in resources]
+    
+    resource_blocks = "\n".join(
+        f"=== RESOURCE id: {i} ==={block}"
+        for i, block in enumerate(resource_blocks)
+    )
     
-    if resource_type == 'worksheet_image':
-        resource_info = f"""
+    return f"""
+Evaluate EACH of the {len(resources)} educational resources at the end of this prompt
+against the section requirements, independently of one another.
+
+Return a JSON object with one evaluation per resource id:
+{{
+  "evaluations": [
+    {{
+      "id": 0,
+      "is_suitable": true/false,
+      "coverage_percentage": 0-100,
+      "quality_score": 0-10,
+      "matches_grade": true/false,
+      "matches_topic": true/false,
+      "reasoning": "brief explanation of suitability"
+    }}
+  ]
+}}
+
+Return valid JSON only.
+
+SECTION REQUIREMENTS:
+- Title: {section_requirements.get('title', 'Unknown')}
+- Learning Objectives: {section_requirements.get('learning_objectives', 'N/A')}
+- Keywords: {section_requirements.get('keywords', 'N/A')}
+- Grade: {section_requirements.get('grade', 'Unknown')}
+
+{resource_blocks}
+"""
+
+
+def format_relevance_resource_block(resource: Dict) -> str:
+    """Describe one worksheet or activity for the relevance prompts."""
+    if resource.get('resource_type', 'resource') == 'worksheet_image':
+        return f"""
 WORKSHEET:
 - Title: {resource.get('worksheet_title', 'Unknown')}
 - Grade Level: {resource.get('grade_level', 'Unknown')}
@@ -266,8 +382,8 @@ WORKSHEET:
 - Visual Quality: {resource.get('visual_quality', 0)}/10
 - Educational Value: {resource.get('educational_value', 0)}/10
 """
-    else:
-        resource_info = f"""
+    
+    return f"""
 ACTIVITY:
 - Name: {resource.get('name', 'Unknown')}
 - Type: {resource.get('type', 'Unknown')}
@@ -275,32 +391,6 @@ ACTIVITY:
 - Grade Level: {resource.get('grade_level', 'Unknown')}
 - Learning Objectives: {resource.get('learning_objectives', [])}
 """
-    
-    prompt = f"""
-Evaluate if this educational resource matches the section requirements.
-
-{resource_info}
-
-SECTION REQUIREMENTS:
-- Title: {section_requirements.get('title', 'Unknown')}
-- Learning Objectives: {section_requirements.get('learning_objectives', 'N/A')}
-- Keywords: {section_requirements.get('keywords', 'N/A')}
-- Grade: {section_requirements.get('grade', 'Unknown')}
-
-Analyze and return JSON:
-{{
-  "is_suitable": true/false,
-  "coverage_percentage": 0-100,
-  "quality_score": 0-10,
-  "matches_grade": true/false,
-  "matches_topic": true/false,
-  "reasoning": "brief explanation of suitability"
-}}
-
-Return valid JSON only.
-"""
-    
-    return prompt
 
 
 def get_worksheet_image_analysis_prompt(image_result: Dict) -> str:
@@ -0,0 +1,24 @@
+"""
+Process-wide handler singletons shared by the Phase 3 generators
+Worksheets and activities use the same search handler and resource filter (one OpenAI client, one relevance memo)
+"""
+
+from functools import lru_cache
+
+from utils.google_search_handler import GoogleSearchHandler
+from hands_on.resource_filter import ResourceFilter, get_relevance_disk_cache, get_relevance_semantic_cache
+
+
+@lru_cache(maxsize=1)
+def get_search_handler() -> GoogleSearchHandler:
+    """Lazily build the process-wide Google search handler."""
+    return GoogleSearchHandler()
+
+
+@lru_cache(maxsize=1)
+def get_resource_filter() -> ResourceFilter:
+    """Lazily build the process-wide resource filter."""
+    return ResourceFilter(
+        semantic_cache=get_relevance_semantic_cache(),
+        relevance_cache=get_relevance_disk_cache()
+    )
@@ -3,18 +3,22 @@ Phase 3: Worksheet Generation
 Single-section worksheet generation with concurrent image analysis
 """
 
+import asyncio
 import logging
+import os
+from functools import lru_cache
 from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from config import HandsOnConfig
-from utils.google_search_handler import GoogleSearchHandler
+from config import HandsOnConfig, CacheConfig
 from utils.content_extractor import ContentExtractor
-from hands_on.resource_filter import ResourceFilter
+from utils.disk_cache import DiskCache
+from hands_on.shared_handlers import get_resource_filter, get_search_handler
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+_BANNER = "=" * 70
+
 
 def generate_worksheets_for_section(
     section: Dict,
@@ -29,12 +33,17 @@ def generate_worksheets_for_section(
     prompt, analyzes them using GPT-4 Vision, filters by quality and relevance,
     and returns the top options for teacher selection.
     
+    Blocking — image analysis runs on its own event loop via asyncio.run(), so
+    call this from a worker thread (the orchestrator uses run_in_executor), not
+    from inside a running event loop.
+    
     Process:
     1. Build search query from user prompt and grade level
     2. Search Google Images for worksheet images
-    3. Analyze images concurrently using GPT-4 Vision
-    4. Filter worksheets by quality and relevance
-    5. Rank and return top N options
+    3. Drop obvious non-worksheets using search metadata alone
+    4. Analyze images in batches using GPT-4 Vision
+    5. Filter worksheets by quality and relevance
+    6. Rank and return top N options
     
     Args:
         section: Section dictionary containing:
@@ -74,23 +83,23 @@ def generate_worksheets_for_section(
     
     section_title = section.get('title', 'Unknown Section')
     
-    logger.info(f"="*70)
-    logger.info(f"Generating worksheets for section: {section_title}")
-    logger.info(f"Grade level: {grade_level}")
-    logger.info(f"User prompt: {user_prompt}")
-    logger.info(f"="*70)
+    logger.info(_BANNER)
+    logger.info("Generating worksheets for section: %s", section_title)
+    logger.info("Grade level: %s", grade_level)
+    logger.info("User prompt: %s", user_prompt)
+    logger.info(_BANNER)
     
-    # Initialize handlers
-    search_handler = GoogleSearchHandler()
-    content_extractor = ContentExtractor()
-    resource_filter = ResourceFilter()
+    # Shared handlers (built once per process)
+    search_handler = get_search_handler()
+    content_extractor = _get_content_extractor()
+    resource_filter = get_resource_filter()
     
     # Build search query
     search_query = f"{user_prompt} grade {grade_level}"
-    logger.info(f"Search query: '{search_query}'")
+    logger.info("Search query: '%s'", search_query)
     
     # Search for worksheet images
-    logger.info(f"Searching Google Images...")
+    logger.info("Searching Google Images...")
     search_results = search_handler.search_worksheets(
         search_query,
         num_results=HandsOnConfig.GOOGLE_MAX_WORKSHEET_IMAGES
@@ -101,33 +110,43 @@ def generate_worksheets_for_section(
         section['worksheet_options'] = []
         return section
     
-    logger.info(f"Found {len(search_results)} images")
+    logger.info("Found %d images", len(search_results))
     
-    # Analyze images CONCURRENTLY (for speed)
-    logger.info(f"Analyzing images in parallel (workers={HandsOnConfig.WORKSHEET_ANALYSIS_WORKERS})...")
-    all_worksheets = []
+    # Drop obvious non-worksheets before they cost a vision call
+    search_results = _cheap_prefilter(search_results)
+    if not search_results:
+        logger.warning("No worksheet images left after pre-filter")
+        section['worksheet_options'] = []
+        return section
     
-    with ThreadPoolExecutor(max_workers=HandsOnConfig.WORKSHEET_ANALYSIS_WORKERS) as executor:
-        futures = {
-            executor.submit(content_extractor.analyze_worksheet_image, img): img
-            for img in search_results
-        }
-        
-        for future in as_completed(futures):
-            try:
-                result = future.result(timeout=HandsOnConfig.TIMEOUT_SECONDS)
-                if result:
-                    all_worksheets.append(result)
-                    logger.info(f"[analyze] OK: {result.get('worksheet_title', 'Unknown')} src={result.get('source_url','')[:60]}")
-            except Exception as e:
-                logger.error(f"Error analyzing worksheet image: {e}")
+    # Analyze images in batches (one vision request per batch), batches CONCURRENTLY
+    logger.info(
+        "Analyzing images in batches of %d (max in flight=%d)...",
+        HandsOnConfig.VISION_BATCH_SIZE, HandsOnConfig.WORKSHEET_ANALYSIS_WORKERS
+    )
+    
+    # Staggered starts let one batch's image downloads overlap another's LLM wait
+    analyses = asyncio.run(content_extractor.analyze_worksheets_async(
+        search_results,
+        max_concurrency=HandsOnConfig.WORKSHEET_ANALYSIS_WORKERS,
+        batch_size=HandsOnConfig.VISION_BATCH_SIZE,
+        stagger_seconds=HandsOnConfig.SUBMIT_STAGGER_MS / 1000
+    ))
+    
+    all_worksheets = [result for result in analyses if result]
+    if logger.isEnabledFor(logging.INFO):
+        for result in all_worksheets:
+            logger.info(
+                "[analyze] OK: %s src=%s",
+                result.get('worksheet_title', 'Unknown'), result.get('source_url', '')[:60]
+            )
     
     if not all_worksheets:
         logger.warning("No worksheets successfully analyzed")
         section['worksheet_options'] = []
         return section
     
-    logger.info(f"Successfully analyzed {len(all_worksheets)} worksheets")
+    logger.info("Successfully analyzed %d worksheets", len(all_worksheets))
     
     # Filter and rank
     section_requirements = {
@@ -138,24 +157,72 @@ def generate_worksheets_for_section(
     }
     
     logger.info("Filtering and ranking worksheets...")
-    ranked = resource_filter.filter_and_rank_worksheets(all_worksheets, section_requirements)
-    
-    # Return top N
-    top_worksheets = ranked[:num_options]
+    top_worksheets = resource_filter.filter_and_rank_worksheets(
+        all_worksheets, section_requirements, top_k=num_options
+    )
     section['worksheet_options'] = top_worksheets
     
-    logger.info(f"Selected {len(top_worksheets)} top worksheet(s)")
-    for i, ws in enumerate(top_worksheets, 1):
-        logger.info(
-            f"  {i}. {ws.get('worksheet_title', 'Unknown')} "
-            f"(Score: {ws.get('overall_score', 0):.1f})"
-        )
+    logger.info("Selected %d top worksheet(s)", len(top_worksheets))
+    if logger.isEnabledFor(logging.INFO):
+        for i, ws in enumerate(top_worksheets, 1):
+            logger.info("  %d. %s (Score: %.1f)", i, ws.get('worksheet_title', 'Unknown'), ws.get('overall_score', 0))
     
-    logger.info(f"="*70)
+    logger.info(_BANNER)
     
     return section
 
 
+@lru_cache(maxsize=1)
+def _get_content_extractor() -> ContentExtractor:
+    """Lazily build the process-wide content extractor (shares one worksheet analysis cache)."""
+    worksheet_cache = DiskCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.WORKSHEET_ANALYSIS_CACHE_FILE),
+        default_ttl_seconds=CacheConfig.WORKSHEET_ANALYSIS_CACHE_TTL_SECONDS
+    )
+    return ContentExtractor(worksheet_cache=worksheet_cache)
+
+
+def _cheap_prefilter(search_results: List[Dict]) -> List[Dict]:
+    """
+    Drop image results that are clearly not worksheets, from search metadata only.
+    
+    Removes tiny images (< HandsOnConfig.MIN_WORKSHEET_IMAGE_PIXELS), non-image
+    or unusual MIME types, and images hosted on a denylisted domain. Missing
+    metadata never drops a result; the vision analysis and ranker judge those.
+    
+    Args:
+        search_results: Image results from GoogleSearchHandler.search_worksheets()
+    
+    Returns:
+        list: The results worth a vision call, in original order
+    """
+    kept = []
+    
+    for result in search_results:
+        width, height = result.get('width') or 0, result.get('height') or 0
+        mime = (result.get('mime') or '').lower()
+        host = (result.get('display_link') or '').lower()
+        
+        if width and height and width * height < HandsOnConfig.MIN_WORKSHEET_IMAGE_PIXELS:
+            reason = f"too small ({width}x{height})"
+        elif mime and mime not in HandsOnConfig.WORKSHEET_IMAGE_MIME_TYPES:
+            reason = f"mime {mime}"
+        elif host and any(
+            host == domain or host.endswith('.' + domain)
+            for domain in HandsOnConfig.WORKSHEET_DOMAIN_DENYLIST
+        ):
+            reason = f"denylisted host {host}"
+        else:
+            kept.append(result)
+            continue
+        
+        logger.info("[prefilter] Skipping %s: %s", result.get('image_url', '')[:60], reason)
+    
+    if len(kept) < len(search_results):
+        logger.info("Pre-filter kept %d/%d images", len(kept), len(search_results))
+    return kept
+
+
 def _validate_section_input(section: Dict) -> None:
     """
     Validate that section has required fields.
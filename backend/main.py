@@ -2,12 +2,15 @@
 import logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from dotenv import load_dotenv
+from config import load_env
 
-load_dotenv()
+load_env()
 
 import uvicorn
 from routes.file_upload import router as file_upload_router
@@ -15,61 +18,93 @@ from routes.uploads import router as uploads_router
 import os
 from routes import curriculum, resources, topics, teachers, contact, notifications, synopsis
 
-app = FastAPI(title="EdCube API")
-
-# CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-    "http://localhost:5173",
-    "http://localhost:5174",
-    "http://localhost:5175",
-    "https://edcube-8fe7d.web.app",
-    "https://edcube-8fe7d.firebaseapp.com",
-    "https://edcubeai.web.app",
-    "https://edcubeai.firebaseapp.com"
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(curriculum.router, prefix="/api", tags=["curriculum"])
-app.include_router(resources.router, prefix="/api", tags=["resources"])
-app.include_router(topics.router, prefix="/api", tags=["topics"])
-app.include_router(file_upload_router, prefix="/api", tags=["file_upload"])
-app.include_router(teachers.router, tags=["teachers"])
-app.include_router(contact.router, prefix="/api", tags=["contact"])
-app.include_router(notifications.router, tags=["notifications"])
-app.include_router(uploads_router, tags=["uploads"])
-app.include_router(synopsis.router, tags=["synopsis"])
-
+# Single source for CORS: the middleware and the error handler's fallback headers
 ALLOWED_ORIGINS = {
     "http://localhost:5173", "http://localhost:5174", "http://localhost:5175",
     "https://edcube-8fe7d.web.app", "https://edcube-8fe7d.firebaseapp.com",
     "https://edcubeai.web.app", "https://edcubeai.firebaseapp.com",
 }
 
-@app.exception_handler(Exception)
-async def unhandled_exception_handler(request: Request, exc: Exception):
-    logging.getLogger(__name__).error("Unhandled exception", exc_info=exc)
-    # Explicitly add CORS headers so they are never stripped by error paths
-    origin = request.headers.get("origin", "")
-    headers = {}
-    if origin in ALLOWED_ORIGINS:
-        headers["Access-Control-Allow-Origin"] = origin
-        headers["Access-Control-Allow-Credentials"] = "true"
-    return JSONResponse(status_code=500, content={"detail": "Internal server error"}, headers=headers)
 
+def _warm_hands_on_handlers():
+    """Build the Phase 3 handler singletons now so the first request doesn't pay for it."""
+    from hands_on import activity_generator, shared_handlers, worksheet_generator
+
+    factories = (
+        shared_handlers.get_search_handler, shared_handlers.get_resource_filter,
+        worksheet_generator._get_content_extractor, activity_generator._get_content_extractor
+    )
+    for factory in factories:
+        try:
+            factory()
+        except Exception as e:
+            # Missing keys etc. surface again (and properly) on first use
+            logging.getLogger(__name__).warning(f"Could not pre-warm {factory.__module__}.{factory.__name__}: {e}")
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # Off the event loop: building them opens cache files and API clients
+    await asyncio.to_thread(_warm_hands_on_handlers)
+    yield
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="EdCube API", lifespan=_lifespan)
+
+    # CORS configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=sorted(ALLOWED_ORIGINS),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Include routers
+    app.include_router(curriculum.router, prefix="/api", tags=["curriculum"])
+    app.include_router(resources.router, prefix="/api", tags=["resources"])
+    app.include_router(topics.router, prefix="/api", tags=["topics"])
+    app.include_router(file_upload_router, prefix="/api", tags=["file_upload"])
+    app.include_router(teachers.router, tags=["teachers"])
+    app.include_router(contact.router, prefix="/api", tags=["contact"])
+    app.include_router(notifications.router, tags=["notifications"])
+    app.include_router(uploads_router, tags=["uploads"])
+    app.include_router(synopsis.router, tags=["synopsis"])
+
+    @app.exception_handler(Exception)
+    async def unhandled_exception_handler(request: Request, exc: Exception):
+        logging.getLogger(__name__).error("Unhandled exception", exc_info=exc)
+        # Explicitly add CORS headers so they are never stripped by error paths
+        origin = request.headers.get("origin", "")
+        headers = {}
+        if origin in ALLOWED_ORIGINS:
+            headers["Access-Control-Allow-Origin"] = origin
+            headers["Access-Control-Allow-Credentials"] = "true"
+        return JSONResponse(status_code=500, content={"detail": "Internal server error"}, headers=headers)
+
+    @app.get("/")
+    async def root():
+        return {"message": "EdCube API is running"}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
 
-@app.get("/")
-async def root():
-    return {"message": "EdCube API is running"}
 
-@app.get("/health")
-async def health():
-    return {"status": "healthy"}
+app = create_app()
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Auto-reload only while developing (DEBUG=1); otherwise run worker processes
+    debug = os.environ.get("DEBUG", "").lower() in ("1", "true", "yes")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        reload=debug,
+        workers=None if debug else int(os.environ.get("WEB_CONCURRENCY", "2")),
+    )
\ No newline at end of file
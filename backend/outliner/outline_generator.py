@@ -3,18 +3,81 @@ Phase 1: Course Outline Generation
 Generates modular teaching boxes and creates final course outlines
 """
 
-import json
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Optional
-
-from outliner.outline_prompts import get_box_generation_prompt
-from utils.llm_handler import call_openai, validate_json_response
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Literal, Optional, Union
+
+import orjson
+from openai import AsyncOpenAI
+from pydantic import BaseModel, Field, ValidationError
+
+from config import CacheConfig, OutlinerConfig, OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE
+from outliner.outline_prompts import (
+    BOX_GENERATION_PROMPT_CACHE_KEY,
+    BOX_GENERATION_SYSTEM_MESSAGE,
+    format_age_range,
+    get_box_generation_prompt,
+)
+from utils.disk_cache import DiskCache
+from utils.llm_handler import acall_openai, embed_text
+from utils.semantic_cache import SemanticCache
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+_BANNER = "=" * 70
+_RULE = _BANNER + "\n"  # Separator line in the TXT outline
+
+# Outline cache hits/misses for this process (logged on every lookup)
+_OUTLINE_CACHE_STATS = Counter()
+
+
+class OutlineSection(BaseModel):
+    """One Phase 1 section as returned by the LLM (extra keys are ignored)."""
+    section_id: Union[str, int]
+    title: str
+    description: str
+    depth_ceiling: Literal['Basics', 'Intermediate', 'Advanced']
+
+
+class OutlineResponse(BaseModel):
+    """Phase 1 LLM response; validated in one pass before the outline is built."""
+    age_range: Any
+    sections: List[OutlineSection] = Field(min_length=1)
+
 
 def generate_boxes(teacher_input: Dict, images: Optional[List[str]] = None) -> Dict:
+    """
+    Blocking wrapper around agenerate_boxes() for callers without an event loop.
+    
+    Runs its own event loop via asyncio.run(), so don't call it from inside a
+    running loop (await agenerate_boxes() there instead).
+    
+    Args:
+        teacher_input: As for agenerate_boxes()
+        images: As for agenerate_boxes()
+    
+    Returns:
+        dict: Outline data from LLM (see agenerate_boxes())
+    """
+    async def _run() -> Dict:
+        # A client per loop: its connections can't outlive this asyncio.run()
+        async with AsyncOpenAI(api_key=OPENAI_API_KEY) as llm_client:
+            return await agenerate_boxes(teacher_input, images=images, llm_client=llm_client)
+    
+    return asyncio.run(_run())
+
+
+async def agenerate_boxes(
+    teacher_input: Dict,
+    images: Optional[List[str]] = None,
+    llm_client: Optional[AsyncOpenAI] = None
+) -> Dict:
     """
     Generate course outline with sections and subsections using LLM.
 
@@ -26,6 +89,7 @@ def generate_boxes(teacher_input: Dict, images: Optional[List[str]] = None) -> D
             - total_minutes (int)
             - requirements (str)
         images: Optional list of base64 data URIs for reference images
+        llm_client: AsyncOpenAI client for the LLM call (default: the shared one)
 
     Returns:
         dict: Outline data from LLM containing:
@@ -35,33 +99,285 @@ def generate_boxes(teacher_input: Dict, images: Optional[List[str]] = None) -> D
     Raises:
         ValueError: If response is invalid
     """
-    logger.info("="*70)
+    logger.info(_BANNER)
     logger.info("Generating course outline (sections + subsections)...")
-    logger.info(f"Course: {teacher_input.get('course_name', 'Unknown')}")
-    logger.info(f"Grade: {teacher_input.get('grade_level', 'Unknown')}")
+    logger.info("Course: %s", teacher_input.get('course_name', 'Unknown'))
+    logger.info("Grade: %s", teacher_input.get('grade_level', 'Unknown'))
     if images:
-        logger.info(f"Reference images provided: {len(images)}")
-    logger.info("="*70)
+        logger.info("Reference images provided: %d", len(images))
+    logger.info(_BANNER)
 
     prompt = get_box_generation_prompt(teacher_input, has_images=bool(images))
 
-    system_message = (
-        "You are an expert elementary education curriculum designer. "
-        "You generate well-structured, pedagogically sound course outlines in JSON format."
-    )
-
-    logger.info("Calling LLM to generate outline (this may take 30-60 seconds)...")
-    outline_data = call_openai(prompt, system_message, images=images or None)
+    system_message = BOX_GENERATION_SYSTEM_MESSAGE
+
+    cache_key = None
+    outline_data = None
+    if OutlinerConfig.OUTLINE_CACHE_ENABLED:
+        cache_key = _outline_cache_key(prompt, system_message, images)
+        outline_data = _get_outline_cache().get(cache_key)
+        _OUTLINE_CACHE_STATS['hits' if outline_data is not None else 'misses'] += 1
+        logger.info(
+            "Outline cache %s (hits=%d, misses=%d)",
+            'hit' if outline_data is not None else 'miss',
+            _OUTLINE_CACHE_STATS['hits'], _OUTLINE_CACHE_STATS['misses']
+        )
+
+    # Rephrased but equivalent courses (same ages/days/hours) reuse an earlier outline.
+    # Reference images aren't part of the embedding, so those requests skip it.
+    embedding = None
+    if outline_data is None and cache_key is not None and not images:
+        embedding = await asyncio.to_thread(_embed_teacher_input, teacher_input)
+        outline_data = _lookup_semantic_outline(embedding, teacher_input)
+
+    # Where the outline came from: 'cache', 'references' or 'full_model'
+    source = 'cache'
+    if outline_data is None:
+        # Related (not equivalent) earlier courses: let the cheaper model adapt them
+        outline_data = await _agenerate_from_references(
+            embedding, teacher_input, system_message, llm_client
+        )
+        source = 'references'
+    if outline_data is None:
+        logger.info("Calling LLM to generate outline (this may take 30-60 seconds)...")
+        outline_data = await _acall_outline_llm(prompt, system_message, images, llm_client)
+        source = 'full_model'
 
     # Validate the new structure
     _validate_outline_response(outline_data)
+    # The model only echoes the age range (create_final_outline puts it in the
+    # course title), so take it from the teacher's input instead
+    outline_data = {
+        **outline_data,
+        'age_range': format_age_range(
+            teacher_input.get('age_range_start', ''), teacher_input.get('age_range_end', '')
+        )
+    }
 
-    logger.info(f"Successfully generated {len(outline_data.get('sections', []))} sections")
-    logger.info("="*70)
+    # Only outlines that passed validation are worth serving again
+    if cache_key is not None:
+        _get_outline_cache().set(cache_key, outline_data)
+    # Only full-model outlines become semantic hits / references for later courses,
+    # so cheaper-model adaptations can't compound into more of the same
+    if source == 'full_model' and embedding is not None:
+        _get_outline_semantic_cache().add(embedding, {
+            'shape': _outline_shape(teacher_input),
+            'course_name': teacher_input.get('course_name', ''),
+            'outline': outline_data
+        })
+
+    logger.info("Successfully generated %d sections", len(outline_data.get('sections', [])))
+    logger.info(_BANNER)
 
     return outline_data
 
 
+async def _acall_outline_llm(
+    prompt: str,
+    system_message: str,
+    images: Optional[List[str]],
+    llm_client: Optional[AsyncOpenAI],
+    model: Optional[str] = None
+) -> Dict:
+    """Stream the outline call, validating each section as soon as it's complete."""
+    # A malformed section stops the generation right away instead of after the whole response
+    scanner = _SectionStreamScanner()
+
+    def validate_streamed_sections(delta: str) -> None:
+        for section_text in scanner.feed(delta):
+            _validate_streamed_section(section_text)
+
+    return await acall_openai(
+        prompt, system_message, images=images or None, llm_client=llm_client,
+        on_text=validate_streamed_sections, prompt_cache_key=BOX_GENERATION_PROMPT_CACHE_KEY,
+        model=model
+    )
+
+
+async def _agenerate_from_references(
+    embedding: Optional[List[float]],
+    teacher_input: Dict,
+    system_message: str,
+    llm_client: Optional[AsyncOpenAI]
+) -> Optional[Dict]:
+    """
+    Build the outline with OutlinerConfig.OUTLINE_REFERENCE_MODEL, using the outlines
+    of the most similar earlier courses as few-shot references.
+    
+    Returns None when there are no references close enough, or when the cheaper
+    model's outline doesn't validate; the caller then uses the full model.
+    """
+    if embedding is None:
+        return None
+    
+    cached = _get_outline_semantic_cache().nearest(
+        embedding,
+        k=OutlinerConfig.OUTLINE_REFERENCE_TOP_K,
+        min_similarity=OutlinerConfig.OUTLINE_REFERENCE_MIN_SIMILARITY
+    )
+    if not cached:
+        return None
+    
+    references = [
+        {'course_name': entry.get('course_name', ''), **entry['outline']}
+        for entry in cached
+    ]
+    prompt = get_box_generation_prompt(teacher_input, reference_outlines=references)
+    
+    logger.info(
+        "Generating outline from %d reference outline(s) with %s...",
+        len(references), OutlinerConfig.OUTLINE_REFERENCE_MODEL
+    )
+    try:
+        outline_data = await _acall_outline_llm(
+            prompt, system_message, None, llm_client, model=OutlinerConfig.OUTLINE_REFERENCE_MODEL
+        )
+        _validate_outline_response(outline_data)
+    except ValueError as e:
+        logger.warning("Reference-based outline rejected, using %s: %s", OPENAI_MODEL, e)
+        return None
+    
+    _OUTLINE_CACHE_STATS['reference_builds'] += 1
+    logger.info(
+        "Outline built from references (reference_builds=%d)", _OUTLINE_CACHE_STATS['reference_builds']
+    )
+    return outline_data
+
+
+def generate_boxes_batch(teacher_inputs: List[Dict]) -> List[Optional[Dict]]:
+    """
+    Blocking wrapper around agenerate_boxes_batch() for callers without an event loop.
+
+    Args:
+        teacher_inputs: One teacher input per outline (see agenerate_boxes())
+
+    Returns:
+        list: Outline data per input, in input order (None where generation failed)
+    """
+    async def _run() -> List[Optional[Dict]]:
+        async with AsyncOpenAI(api_key=OPENAI_API_KEY) as llm_client:
+            return await agenerate_boxes_batch(teacher_inputs, llm_client=llm_client)
+
+    return asyncio.run(_run())
+
+
+async def agenerate_boxes_batch(
+    teacher_inputs: List[Dict],
+    llm_client: Optional[AsyncOpenAI] = None
+) -> List[Optional[Dict]]:
+    """
+    Generate outlines for several queued teacher inputs in one dispatch.
+
+    Chat Completions has no list-of-prompts form, so the batch is coalesced
+    instead: identical inputs are generated once, and the distinct ones go out
+    concurrently over one client, at most OutlinerConfig.MAX_CONCURRENCY at a time.
+
+    Args:
+        teacher_inputs: One teacher input per outline (see agenerate_boxes())
+        llm_client: AsyncOpenAI client for the LLM calls (default: the shared one)
+
+    Returns:
+        list: Outline data per input, in input order (None where generation failed)
+    """
+    keys = [orjson.dumps(teacher_input, option=orjson.OPT_SORT_KEYS) for teacher_input in teacher_inputs]
+    distinct = dict(zip(keys, teacher_inputs))
+    logger.info(
+        "Dispatching outline batch: %d input(s), %d distinct", len(teacher_inputs), len(distinct)
+    )
+
+    semaphore = asyncio.Semaphore(OutlinerConfig.MAX_CONCURRENCY)
+
+    async def generate(teacher_input: Dict) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                return await agenerate_boxes(teacher_input, llm_client=llm_client)
+            except Exception as e:
+                logger.error(
+                    "Outline generation failed for '%s': %s", teacher_input.get('course_name', 'Unknown'), e
+                )
+                return None
+
+    outlines = await asyncio.gather(*(generate(teacher_input) for teacher_input in distinct.values()))
+    by_key = dict(zip(distinct, outlines))
+    return [by_key[key] for key in keys]
+
+
+@lru_cache(maxsize=1)
+def _get_outline_cache() -> DiskCache:
+    """Lazily open the process-wide persistent outline cache."""
+    return DiskCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.OUTLINE_CACHE_FILE),
+        default_ttl_seconds=CacheConfig.OUTLINE_CACHE_TTL_SECONDS
+    )
+
+
+def _outline_cache_key(prompt: str, system_message: str, images: Optional[List[str]]) -> str:
+    """Hash of everything that shapes the outline call (model, temperature, messages, images)."""
+    payload = orjson.dumps({
+        'model': OPENAI_MODEL,
+        'temperature': OPENAI_TEMPERATURE,
+        'system': system_message,
+        'prompt': prompt,
+        'images': images or [],
+    }, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _get_outline_semantic_cache() -> SemanticCache:
+    """Lazily open the process-wide outline semantic cache."""
+    return SemanticCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.OUTLINE_SEMANTIC_CACHE_FILE),
+        threshold=OutlinerConfig.OUTLINE_SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds=CacheConfig.OUTLINE_SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries=CacheConfig.OUTLINE_SEMANTIC_CACHE_MAX_ENTRIES
+    )
+
+
+def _outline_shape(teacher_input: Dict) -> List[str]:
+    """
+    The teacher inputs an outline is only valid for as-is (ages, days, hours).
+    
+    The prompt bakes these into the section count and age_range, so a semantic
+    match on the course text alone must also match these exactly.
+    """
+    return [
+        str(teacher_input.get(field, ''))
+        for field in ('age_range_start', 'age_range_end', 'num_days', 'hours_per_day')
+    ]
+
+
+def _embed_teacher_input(teacher_input: Dict) -> Optional[List[float]]:
+    """
+    Embed the free-text part of the teacher input (course name + requirements).
+    
+    Returns None if the embedding call fails, in which case the outline is
+    simply generated without the semantic cache.
+    """
+    text = f"{teacher_input.get('course_name', '')}|{teacher_input.get('requirements', '')}"
+    try:
+        return embed_text(text, OutlinerConfig.OUTLINE_EMBEDDING_MODEL)
+    except Exception as e:
+        logger.warning("Error embedding teacher input for the outline cache: %s", e)
+        return None
+
+
+def _lookup_semantic_outline(embedding: Optional[List[float]], teacher_input: Dict) -> Optional[Dict]:
+    """Outline stored for the most similar earlier course, if it has the same shape."""
+    if embedding is None:
+        return None
+    
+    cached = _get_outline_semantic_cache().lookup(embedding)
+    if cached is None or cached.get('shape') != _outline_shape(teacher_input):
+        return None
+    
+    _OUTLINE_CACHE_STATS['semantic_hits'] += 1
+    logger.info(
+        "Outline semantic cache hit (semantic_hits=%d)", _OUTLINE_CACHE_STATS['semantic_hits']
+    )
+    return cached['outline']
+
+
 def create_final_outline(outline_data: Dict, course_name: str = '', subject: str = '', topic: str = '') -> Dict:
     """
     Pass through the LLM outline, adding computed fields.
@@ -97,9 +413,10 @@ def create_final_outline(outline_data: Dict, course_name: str = '', subject: str
             "subsections": []
         })
 
-    logger.info(f"Final outline: {len(outline['sections'])} sections")
-    for s in outline['sections']:
-        logger.info(f"  - {s['title']} (depth_ceiling: {s['depth_ceiling']})")
+    logger.info("Final outline: %d sections", len(outline['sections']))
+    if logger.isEnabledFor(logging.INFO):
+        for s in outline['sections']:
+            logger.info("  - %s (depth_ceiling: %s)", s['title'], s['depth_ceiling'])
 
     return outline
 
@@ -116,51 +433,160 @@ def save_outline(outline: Dict, output_dir: str) -> None:
         >>> outline = {'course_title': 'Math - Grade 5', ...}
         >>> save_outline(outline, '../outputs')
     """
-    import os
-    
-    logger.info(f"Saving outline to: {output_dir}")
+    logger.info("Saving outline to: %s", output_dir)
     
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    # Save JSON
     json_path = os.path.join(output_dir, "course_outline.json")
-    with open(json_path, 'w') as f:
-        json.dump(outline, f, indent=2)
-    logger.info(f"✅ Saved JSON: {json_path}")
-    
-    # Save readable TXT
     txt_path = os.path.join(output_dir, "course_outline.txt")
-    with open(txt_path, 'w') as f:
-        f.write("="*70 + "\n")
-        f.write("COURSE OUTLINE\n")
-        f.write("="*70 + "\n\n")
-        
-        f.write(f"Course: {outline['course_title']}\n")
-        f.write(f"Grade Level: {outline['grade_level']}\n")
-        f.write(f"Topic: {outline['topic']}\n")
-        total = outline['total_duration_minutes']
-        f.write(f"Total Duration: {total} minutes ({total//60}h {total%60}m)\n")
-        f.write("\n" + "="*70 + "\n\n")
+    
+    # The two files are independent, so write them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        json_future = executor.submit(_write_outline_json, outline, json_path)
+        txt_future = executor.submit(_write_outline_txt, outline, txt_path)
+        json_future.result()
+        txt_future.result()
+    
+    logger.info("✅ Saved JSON: %s", json_path)
+    logger.info("✅ Saved TXT: %s", txt_path)
+
+
+def _write_outline_json(outline: Dict, json_path: str) -> None:
+    """Write the outline as indented JSON (orjson writes UTF-8 bytes)."""
+    with open(json_path, 'wb') as f:
+        f.write(orjson.dumps(outline, option=orjson.OPT_INDENT_2))
+
+
+def _write_outline_txt(outline: Dict, txt_path: str) -> None:
+    """Write the readable TXT outline (built in memory, written once)."""
+    total = outline.get('total_duration_minutes')
+    if total is None:
+        # Outlines straight from create_final_outline() don't carry a total yet
+        total = sum(sub.get('duration_minutes', 0) for sub in _iter_subsections(outline))
+    parts = [
+        _RULE,
+        "COURSE OUTLINE\n",
+        _RULE, "\n",
+        f"Course: {outline['course_title']}\n",
+        f"Grade Level: {outline['grade_level']}\n",
+        f"Topic: {outline['topic']}\n",
+        f"Total Duration: {total} minutes ({total//60}h {total%60}m)\n",
+        "\n", _RULE, "\n",
+    ]
+    
+    for i, section in enumerate(outline['sections'], 1):
+        parts.append(f"SECTION {i}: {section['title']}\n")
+        parts.append(f"  {section['description']}\n\n")
         
-        for i, section in enumerate(outline['sections'], 1):
-            f.write(f"SECTION {i}: {section['title']}\n")
-            f.write(f"  {section['description']}\n\n")
-            
-            for j, sub in enumerate(section['subsections'], 1):
-                f.write(f"  {i}.{j} {sub['title']} ({sub['duration_minutes']} min)\n")
-                f.write(f"      {sub['description']}\n")
-                f.write(f"      PLA: {', '.join(sub.get('pla_pillars', []))}\n")
-                f.write(f"      Keywords: {', '.join(sub.get('content_keywords', []))}\n")
-                f.write(f"\n")
-            
-            f.write("\n")
+        for j, sub in enumerate(section['subsections'], 1):
+            parts.append(
+                f"  {i}.{j} {sub['title']} ({sub['duration_minutes']} min)\n"
+                f"      {sub['description']}\n"
+                f"      PLA: {', '.join(sub.get('pla_pillars', []))}\n"
+                f"      Keywords: {', '.join(sub.get('content_keywords', []))}\n"
+                f"\n"
+            )
         
-        f.write("="*70 + "\n")
-        f.write("Phase 2 (videos) and Phase 3 (worksheets/activities) run on-demand per subsection.\n")
-        f.write("="*70 + "\n")
+        parts.append("\n")
+    
+    parts.append(_RULE)
+    parts.append("Phase 2 (videos) and Phase 3 (worksheets/activities) run on-demand per subsection.\n")
+    parts.append(_RULE)
     
-    logger.info(f"✅ Saved TXT: {txt_path}")
+    with open(txt_path, 'w', encoding='utf-8') as f:
+        f.write("".join(parts))
+
+
+def _iter_subsections(outline: Dict) -> Iterator[Dict]:
+    """Yield every subsection of an outline, section by section."""
+    for section in outline.get('sections', ()):
+        yield from section.get('subsections', ())
+
+
+def _validate_streamed_section(section_text: str) -> None:
+    """
+    Validate one complete section object taken from the streamed response.
+
+    Raises:
+        ValueError: If the section isn't valid JSON or doesn't match OutlineSection
+    """
+    try:
+        section = OutlineSection.model_validate(orjson.loads(section_text))
+    except (ValidationError, orjson.JSONDecodeError) as e:
+        error_msg = f"Invalid outline section in streamed response: {e}"
+        logger.error(error_msg)
+        raise ValueError(error_msg) from e
+
+    logger.debug("Streamed section OK: %s", section.title)
+
+
+class _SectionStreamScanner:
+    """
+    Incremental scanner that picks complete objects out of the outline's
+    top-level "sections" array while the JSON is still streaming in.
+
+    Only tracks nesting, strings and the current top-level key, which is all
+    that's needed to find where each section object starts and ends; the
+    objects themselves are parsed by the caller.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_chars: List[str] = []
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._in_sections = False
+        self._capture: Optional[List[str]] = None
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Consume the next chunk of response text.
+
+        Returns:
+            list: JSON text of each section object completed by this chunk
+        """
+        completed = []
+
+        for char in text:
+            if self._capture is not None:
+                self._capture.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = ''.join(self._string_chars)
+                elif self._depth == 1:
+                    self._string_chars.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_chars = []
+            elif char == ':' and self._depth == 1:
+                self._key = self._last_string
+            elif char in '{[':
+                self._depth += 1
+                if self._depth == 2 and char == '[' and self._key == 'sections':
+                    self._in_sections = True
+                elif self._depth == 3 and char == '{' and self._in_sections:
+                    self._capture = ['{']
+            elif char in '}]':
+                if self._depth == 3 and char == '}' and self._capture is not None:
+                    completed.append(''.join(self._capture))
+                    self._capture = None
+                self._depth -= 1
+                if self._depth < 2:
+                    self._in_sections = False
+
+        return completed
 
 
 def _validate_outline_response(outline_data: Dict) -> bool:
@@ -177,27 +603,12 @@ def _validate_outline_response(outline_data: Dict) -> bool:
     Raises:
         ValueError: If validation fails
     """
-    required_top = ['age_range', 'sections']
-    validate_json_response(outline_data, required_top, "outline response")
-
-    if not isinstance(outline_data['sections'], list):
-        raise ValueError("'sections' must be a list")
-
-    if len(outline_data['sections']) == 0:
-        raise ValueError("No sections generated")
-
-    required_section_fields = ['section_id', 'title', 'description', 'depth_ceiling']
-
-    for i, section in enumerate(outline_data['sections']):
-        try:
-            validate_json_response(section, required_section_fields, f"section {i+1}")
-        except ValueError as e:
-            raise ValueError(f"Section {i+1} validation failed: {e}")
-
-        if section['depth_ceiling'] not in ('Basics', 'Intermediate', 'Advanced'):
-            raise ValueError(
-                f"Section {i+1} '{section['title']}' has invalid depth_ceiling: {section['depth_ceiling']!r}"
-            )
-
-    logger.info(f"✅ Validated: {len(outline_data['sections'])} sections")
-    return True
\ No newline at end of file
+    try:
+        outline = OutlineResponse.model_validate(outline_data)
+    except ValidationError as e:
+        error_msg = f"Invalid outline response: {e}"
+        logger.error(error_msg)
+        raise ValueError(error_msg) from e
+
+    logger.info("✅ Validated: %d sections", len(outline.sections))
+    return True
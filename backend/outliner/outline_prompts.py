@@ -2,43 +2,37 @@
 Prompts for Phase 1: Course Outline Generation
 """
 
+import sys
+from functools import lru_cache
+
+import orjson
+
 from config import OutlinerConfig
-from typing import Dict
+from typing import Dict, List, Optional
 
 DEPTH_LEVELS = ["Basics", "Intermediate", "Advanced"]
 
+# Fixed PLA block of the outline prompt, assembled once at import
+_PLA_PROMPT_BLOCK = sys.intern(
+    "PLA FRAMEWORK (context for what this course should build toward):\n"
+    + OutlinerConfig.PLA_FRAMEWORK
+)
 
-def get_box_generation_prompt(teacher_input: Dict, has_images: bool = False) -> str:
-    """
-    Generate the prompt for creating a course outline.
-    Sections = teaching days/themes. Subsections are NOT generated here — they are
-    proposed per-section in Phase 1.5 (subsection ideation & selection) and reviewed
-    by the teacher before any block content is written.
-    """
-    age_range_start = teacher_input.get('age_range_start', '')
-    age_range_end = teacher_input.get('age_range_end', '')
-    num_students = teacher_input.get('num_students', '')
-    age_range = f"{age_range_start}–{age_range_end} years old"
-    course_name = teacher_input.get('course_name', '')
-    num_days = teacher_input['num_days']
-    hours_per_day = teacher_input['hours_per_day']
-    requirements = teacher_input['requirements']
-
-    image_instruction = ""
-    if has_images:
-        image_instruction = """
-REFERENCE IMAGES PROVIDED:
-The teacher has uploaded reference images (e.g., syllabus pages, curriculum guides, textbook pages, whiteboard notes, or other materials). Carefully analyze each image and extract:
-- Any specific topics, subtopics, or concepts to cover
-- Vocabulary words or key terms visible in the images
-- Learning objectives or standards mentioned
-- Suggested activities, projects, or assessment ideas
-- Any sequencing or pacing information
-Incorporate all relevant details extracted from the images into the course outline below.
-"""
 
-    prompt = f"""
-You are an expert elementary education curriculum designer. Generate a structured course outline for the following course.
+# System message for the outline call
+BOX_GENERATION_SYSTEM_MESSAGE = (
+    "You are an expert elementary education curriculum designer. "
+    "You generate well-structured, pedagogically sound course outlines in JSON format."
+)
+
+# Routing key for OpenAI's prompt cache; bump the version whenever _BOX_PROMPT_PREAMBLE changes
+BOX_GENERATION_PROMPT_CACHE_KEY = "edcube-outline-v1"
+
+# Everything that doesn't depend on the course comes first, so every outline request
+# shares this prefix byte for byte and OpenAI's automatic prompt caching can reuse it.
+# Per-course details only appear in _BOX_PROMPT_SUFFIX below.
+_BOX_PROMPT_PREAMBLE = sys.intern(f"""
+You are an expert elementary education curriculum designer. Generate a structured course outline for the course described under TEACHER INPUT at the end of this prompt.
 
 TIME MODEL:
 - Each SECTION = one teaching DAY / theme within the course
@@ -46,30 +40,21 @@ TIME MODEL:
   candidate subsections per section for the teacher to review and select. Do NOT include a
   "subsections" field in your output.
 
-{image_instruction}
-TEACHER INPUT:
-- Course Name: {course_name}
-- Student Age Range: {age_range}
-- Number of Students: {num_students}
-- Course Length: {num_days} day(s), {hours_per_day} teaching hour(s) per day
-- Special Requirements: {requirements}
-
-Infer the subject and specific theme of this course from the Course Name above — course names are
+Infer the subject and specific theme of the course from its Course Name — course names are
 usually self-descriptive (e.g. "Science Camp", "The Water Cycle", "Art & Theater Camp").
 
-PLA FRAMEWORK (context for what this course should build toward):
-{OutlinerConfig.PLA_FRAMEWORK}
+{_PLA_PROMPT_BLOCK}
 
 WHAT A SECTION MEANS:
-- A SECTION = one full teaching day/theme. Title it "Day N: [specific aspect of {course_name}]". Generate EXACTLY {num_days} section(s).
+- A SECTION = one full teaching day/theme. Title it "Day N: [specific aspect of the course]". Generate EXACTLY one section per day of the Course Length.
 - Each section must declare a depth_ceiling: one of {DEPTH_LEVELS} — how deep this section's
-  content is allowed to go. Base this on {hours_per_day} teaching hour(s)/day and the age range:
+  content is allowed to go. Base this on the teaching hours per day and the age range:
   more hours per day and older students support a higher ceiling (up to "Advanced"); fewer hours
   or younger students should stay at "Basics" or "Intermediate".
 
 CRITICAL SPECIFICITY RULES:
-- ALL titles and descriptions must be SPECIFIC to "{course_name}" for students aged {age_range} — never use generic filler
-- Section titles must name the specific aspect of "{course_name}" covered that day (e.g. "Day 1: What Is the Water Cycle and Why Does It Matter?")
+- ALL titles and descriptions must be SPECIFIC to the course and the students' age range — never use generic filler
+- Section titles must name the specific aspect of the course covered that day (e.g. "Day 1: What Is the Water Cycle and Why Does It Matter?")
 - Section descriptions must be 2-3 sentences with CONCRETE details about what students will learn that day — not vague summaries. Keep descriptions under 400 characters.
 
 BAD EXAMPLES (too generic — DO NOT do this):
@@ -84,27 +69,60 @@ UNIQUENESS RULES (CRITICAL — violations make the course worthless):
 - Think of the full course as one continuous progression: Day 1 introduces X, Day 2 deepens with Y, Day 3 applies Z — never revisiting the same territory
 
 DESIGN RULES:
-1. Generate EXACTLY {num_days} section(s) — one per teaching day
+1. Generate EXACTLY one section per teaching day
 2. Sections must flow in logical teaching order (foundational themes first, then deeper dives, then application)
 3. Themes must be specific yet well-known enough that a later step can find real learning resources for them
 4. Do NOT include subsections, topic boxes, worksheets, or activities in this output — those come later
 
 OUTPUT FORMAT (strict JSON, no other text):
 {{
-"age_range": "{age_range}",
-"num_days": {num_days},
-"hours_per_day": {hours_per_day},
+"age_range": "string (the Student Age Range exactly as given)",
+"num_days": integer (days in the Course Length),
+"hours_per_day": number (teaching hours per day in the Course Length),
 "sections": [
 {{
     "section_id": "section_1",
-    "title": "Day 1: [specific aspect of {course_name}]",
+    "title": "Day 1: [specific aspect of the course]",
     "description": "string (what this day covers with specific subtopics mentioned, 2-3 sentences, max 400 characters)",
     "depth_ceiling": "string — one of {DEPTH_LEVELS}"
 }}
 ]
 }}
+""")
+
+# Shown only when the teacher attached reference images
+_IMAGE_INSTRUCTION = """
+REFERENCE IMAGES PROVIDED:
+The teacher has uploaded reference images (e.g., syllabus pages, curriculum guides, textbook pages, whiteboard notes, or other materials). Carefully analyze each image and extract:
+- Any specific topics, subtopics, or concepts to cover
+- Vocabulary words or key terms visible in the images
+- Learning objectives or standards mentioned
+- Suggested activities, projects, or assessment ideas
+- Any sequencing or pacing information
+Incorporate all relevant details extracted from the images into the course outline.
+"""
+
+# Shown only when outlines of related earlier courses are passed as references
+_REFERENCE_OUTLINES_INSTRUCTION = """
+REFERENCE OUTLINES:
+Below are approved outlines from earlier, related courses. Use them as a guide to the expected
+structure, specificity and quality. Reuse a theme only where it genuinely fits this course, and
+adapt everything to this course's name, age range, Course Length and requirements — do NOT copy
+a reference outline, and keep exactly one section per day of THIS course.
+{reference_outlines}
+"""
+
+# Per-course tail of the prompt, filled by str.format
+_BOX_PROMPT_SUFFIX = """{image_instruction}{reference_instruction}
+TEACHER INPUT:
+- Course Name: {course_name}
+- Student Age Range: {age_range}
+- Number of Students: {num_students}
+- Course Length: {num_days} day(s), {hours_per_day} teaching hour(s) per day
+- Special Requirements: {requirements}
 
 IMPORTANT:
+- Every section title must name a specific aspect of "{course_name}".
 - All content must be age-appropriate for students aged {age_range_start}–{age_range_end} years old.
 - Do NOT include subsections, worksheets, or activities in the outline — those are generated in later steps.
 - Address teacher's requirements: {requirements}
@@ -114,4 +132,87 @@ IMPORTANT:
 Generate the course outline now as valid JSON only. No other text.
 """
 
-    return prompt
+
+def get_box_generation_prompt(
+    teacher_input: Dict,
+    has_images: bool = False,
+    reference_outlines: Optional[List[Dict]] = None
+) -> str:
+    """
+    Generate the prompt for creating a course outline.
+    Sections = teaching days/themes. Subsections are NOT generated here — they are
+    proposed per-section in Phase 1.5 (subsection ideation & selection) and reviewed
+    by the teacher before any block content is written.
+    
+    reference_outlines are outlines of related earlier courses (each with an optional
+    'course_name' and the outline's 'age_range' and 'sections'), added as few-shot context.
+    """
+    reference_instruction = ""
+    if reference_outlines:
+        reference_instruction = _REFERENCE_OUTLINES_INSTRUCTION.format(
+            reference_outlines=_format_reference_outlines(reference_outlines)
+        )
+    
+    return _build_box_generation_prompt(
+        teacher_input.get('course_name', ''),
+        teacher_input.get('age_range_start', ''),
+        teacher_input.get('age_range_end', ''),
+        teacher_input.get('num_students', ''),
+        teacher_input['num_days'],
+        teacher_input['hours_per_day'],
+        teacher_input['requirements'],
+        has_images,
+        reference_instruction
+    )
+
+
+def format_age_range(age_range_start, age_range_end) -> str:
+    """The Student Age Range as shown to the model and on the outline, e.g. "8–10 years old"."""
+    return f"{age_range_start}–{age_range_end} years old"
+
+
+def _format_reference_outlines(reference_outlines: List[Dict]) -> str:
+    """One compact JSON line per reference: course name, age range and section titles/descriptions."""
+    lines = []
+    for i, reference in enumerate(reference_outlines, 1):
+        summary = {
+            'course_name': reference.get('course_name', ''),
+            'age_range': reference.get('age_range', ''),
+            'sections': [
+                {
+                    'title': section.get('title', ''),
+                    'description': section.get('description', ''),
+                    'depth_ceiling': section.get('depth_ceiling', '')
+                }
+                for section in reference.get('sections', [])
+            ]
+        }
+        lines.append(f"Reference {i}: {orjson.dumps(summary).decode()}")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=256)
+def _build_box_generation_prompt(
+    course_name,
+    age_range_start,
+    age_range_end,
+    num_students,
+    num_days,
+    hours_per_day,
+    requirements,
+    has_images: bool,
+    reference_instruction: str = ""
+) -> str:
+    """Shared preamble + this course's tail; identical inputs (retries, regenerations) are served from cache."""
+    return _BOX_PROMPT_PREAMBLE + _BOX_PROMPT_SUFFIX.format(
+        image_instruction=_IMAGE_INSTRUCTION if has_images else "",
+        reference_instruction=reference_instruction,
+        course_name=course_name,
+        age_range=format_age_range(age_range_start, age_range_end),
+        age_range_start=age_range_start,
+        age_range_end=age_range_end,
+        num_students=num_students,
+        num_days=num_days,
+        hours_per_day=hours_per_day,
+        requirements=requirements
+    )
@@ -6,6 +6,7 @@ more independent subsection chains (Basics -> Intermediate -> Advanced) for the
 teacher to review and prune before any full block content is generated.
 """
 
+import sys
 from typing import Dict, List, Optional
 
 from config import OutlinerConfig
@@ -18,6 +19,12 @@ from outliner.block_prompts import (
 
 DEPTH_LEVELS = ["Basics", "Intermediate", "Advanced"]
 
+# Fixed PLA block of the subsection prompt, assembled once at import
+_PLA_PROMPT_BLOCK = sys.intern(
+    "PLA FRAMEWORK (every subsection must map to one or more of these pillars):\n"
+    + OutlinerConfig.PLA_FRAMEWORK
+)
+
 
 def _format_recurring_and_day_context(day_slice: Optional[Dict], recurring_structure: Optional[Dict]) -> str:
     """
@@ -224,8 +231,7 @@ SECTION TO PROPOSE SUBSECTIONS FOR:
 - Description: {section_description}
 - depth_ceiling: {depth_ceiling} (you may propose subsections up to and including this depth: {', '.join(allowed_depths)})
 
-PLA FRAMEWORK (every subsection must map to one or more of these pillars):
-{OutlinerConfig.PLA_FRAMEWORK}
+{_PLA_PROMPT_BLOCK}
 
 WHAT A SUBSECTION IS:
 A subsection is a self-contained learning arc: the smallest unit that teaches one concept,
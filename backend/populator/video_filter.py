@@ -3,14 +3,72 @@ Video Filter for Phase 2
 Filters and ranks videos based on content quality and relevance
 """
 
+import heapq
 import logging
-from typing import Dict, List
+import math
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from config import PopulatorConfig
+from utils.channel_database import get_channel_tier
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Recency buckets: a video at most this many whole days old earns the matching points
+# (1, 2, 3 and 5 years; anything older gets the last entry)
+_RECENCY_MAX_AGE_DAYS = np.array([365, 730, 1095, 1825], dtype=np.float64)
+_RECENCY_POINTS = np.array([20.0, 15.0, 10.0, 5.0, 2.0])
+
+_GRADE_RE = re.compile(r'\d+')
+
+# Metadata-only limits (duration avoids extremes; views are a basic quality bar)
+_MIN_DURATION_SECONDS = 120
+_MAX_DURATION_SECONDS = 3600
+_MIN_VIEW_COUNT = 500
+
+
+@dataclass(slots=True)
+class VideoBatch:
+    """
+    Candidate videos as parallel NumPy columns (structure of arrays), built once
+    per filter pass so every filter and score reads contiguous arrays instead of
+    chasing nested dict keys per video.
+    """
+    videos: List[Dict]                  # Original video dicts (what callers get back), row order
+    has_id: np.ndarray                  # bool: has a videoId
+    coverage: np.ndarray                # content_coverage.coverage_percentage
+    redundant: np.ndarray               # bool: redundancy_analysis.is_redundant
+    duration: np.ndarray                # durationSeconds
+    view_count: np.ndarray              # viewCount
+    
+    @classmethod
+    def from_videos(cls, videos: List[Dict]) -> "VideoBatch":
+        n = len(videos)
+        return cls(
+            videos=videos,
+            has_id=np.fromiter((bool(v.get('videoId', '')) for v in videos), dtype=bool, count=n),
+            coverage=np.fromiter(
+                (v.get('content_coverage', {}).get('coverage_percentage', 0) for v in videos),
+                dtype=np.float64, count=n
+            ),
+            redundant=np.fromiter(
+                (bool(v.get('redundancy_analysis', {}).get('is_redundant', False)) for v in videos),
+                dtype=bool, count=n
+            ),
+            duration=np.fromiter((v.get('durationSeconds', 0) or 0 for v in videos), dtype=np.float64, count=n),
+            view_count=np.fromiter((v.get('viewCount', 0) or 0 for v in videos), dtype=np.float64, count=n)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.videos)
+
 
 def filter_and_rank_videos(
     videos: List[Dict],
@@ -19,7 +77,32 @@ def filter_and_rank_videos(
     already_selected: List[Dict]
 ) -> List[Dict]:
     """
-    Filter and rank videos based on multiple criteria.
+    Filter videos (see filter_videos()) and sort every survivor by ranking score.
+    
+    When only the best few are needed, use filter_videos() and pass its scores
+    to select_top_videos() instead of sorting the whole list.
+    
+    Args:
+        videos: List of videos with analysis data
+        section: Section data with learning objectives
+        grade_level: Target grade level
+        already_selected: Videos already selected for this section
+    
+    Returns:
+        list: Filtered and ranked videos (best first)
+    """
+    filtered_videos, scores = filter_videos(videos, section, grade_level, already_selected)
+    return [filtered_videos[i] for i in np.argsort(-scores, kind='stable').tolist()]
+
+
+def filter_videos(
+    videos: List[Dict],
+    section: Dict,
+    grade_level: str,
+    already_selected: List[Dict]
+) -> Tuple[List[Dict], np.ndarray]:
+    """
+    Filter and score videos based on multiple criteria.
     
     1. Fetch video details (including FULL description)
     2. Filter by description quality first
@@ -33,198 +116,271 @@ def filter_and_rank_videos(
         already_selected: Videos already selected for this section
     
     Returns:
-        list: Filtered and ranked videos (best first)
+        tuple: (videos that passed, in input order, each with 'ranking_score' set;
+            their ranking scores as a float array)
     """
     logger.info(f"Filtering {len(videos)} videos for grade {grade_level}")
     logger.info(f"📊 FILTER DEBUG: Checking {len(videos)} videos")
     logger.info(f"Section: {section.get('title', 'Unknown')}")
     
-    filtered_videos = []
+    n = len(videos)
+    if not n:
+        logger.info("Filtered to 0 quality videos")
+        return [], np.empty(0)
     
-    for video in videos:
-        vid_id = video.get('videoId', '')
-        vid_title = video.get('title', 'Unknown')
-        vid_url = f"https://www.youtube.com/watch?v={vid_id}" if vid_id else "no-url"
-
-        # Skip if missing critical data
-        if not vid_id:
-            logger.warning(f"❌ REJECTED (no videoId): '{vid_title}'")
-            continue
-
-        # Filter 1: Content coverage check
-        coverage = video.get('content_coverage', {})
-        cov_pct = coverage.get('coverage_percentage', 0)
-        if cov_pct < PopulatorConfig.MIN_CONTENT_COVERAGE_PERCENTAGE:
-            logger.warning(
-                f"❌ REJECTED (coverage {cov_pct}% < {PopulatorConfig.MIN_CONTENT_COVERAGE_PERCENTAGE}%): "
-                f"'{vid_title}' — {vid_url}"
-            )
-            continue
-
-        # Filter 2: Redundancy check
-        redundancy = video.get('redundancy_analysis', {})
-        if redundancy.get('is_redundant', False):
-            overlap = redundancy.get('overlap_percentage', 0)
-            logger.warning(
-                f"❌ REJECTED (redundant {overlap}% overlap): "
-                f"'{vid_title}' — {vid_url}"
-            )
-            continue
-
-        # Filter 3: Duration check (flexible, just avoid extremes)
-        if not _passes_duration_filter(video, grade_level):
-            duration_s = video.get('durationSeconds', 0)
-            logger.warning(
-                f"❌ REJECTED (duration {duration_s}s out of 120–3600s range): "
-                f"'{vid_title}' — {vid_url}"
-            )
-            continue
-
-        # Filter 4: Basic quality check (views and engagement)
-        if not _passes_quality_filter(video):
-            view_count = video.get('viewCount', 0)
-            logger.warning(
-                f"❌ REJECTED (only {view_count:,} views, need ≥500): "
-                f"'{vid_title}' — {vid_url}"
-            )
-            continue
-        
-        # Calculate ranking score
-        video['ranking_score'] = _calculate_ranking_score(video, grade_level)
-        filtered_videos.append(video)
-    
-    # Sort by ranking score (highest first)
-    filtered_videos.sort(key=lambda x: x['ranking_score'], reverse=True)
-    
-    logger.info(f"Filtered to {len(filtered_videos)} quality videos")
-    return filtered_videos
-
-
-def select_top_videos(filtered_videos: List[Dict], num_to_select: int) -> List[Dict]:
+    # One array per field, so every filter is one vector op
+    batch = VideoBatch.from_videos(videos)
+    
+    # Each filter is one boolean column; a video is kept only if every column passes
+    passes_coverage = batch.coverage >= PopulatorConfig.MIN_CONTENT_COVERAGE_PERCENTAGE  # Filter 1: content coverage
+    passes_redundancy = ~batch.redundant                                                 # Filter 2: redundancy
+    passes_duration = (batch.duration >= _MIN_DURATION_SECONDS) & (batch.duration <= _MAX_DURATION_SECONDS)  # Filter 3: duration
+    passes_quality = batch.view_count >= _MIN_VIEW_COUNT                                 # Filter 4: basic quality (views)
+    keep = batch.has_id & passes_coverage & passes_redundancy & passes_duration & passes_quality
+    
+    # Per-video reasons are only worth building when someone will read them
+    if logger.isEnabledFor(logging.DEBUG):
+        for i in np.flatnonzero(~keep).tolist():
+            _log_rejected_video(videos[i])
+    
+    kept = np.flatnonzero(keep)
+    if not kept.size:
+        logger.info(f"Filtered to 0 quality videos ({n} rejected)")
+        return [], np.empty(0)
+    
+    # Score the survivors; ordering is left to the caller
+    filtered_videos = [videos[i] for i in kept.tolist()]
+    scores = _calculate_ranking_scores(filtered_videos, batch.coverage[kept])
+    for video, score in zip(filtered_videos, scores.tolist()):
+        video['ranking_score'] = score
+    
+    logger.info(f"Filtered to {len(filtered_videos)} quality videos ({n - len(filtered_videos)} rejected)")
+    return filtered_videos, scores
+
+
+def prefilter_videos(videos: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
     """
-    Select top N videos from filtered list.
+    Drop videos that fail the checks needing only their metadata, before any
+    content analysis is spent on them.
+    
+    Applies the duration and view-count limits of filter_videos() (which
+    analysis can't change) and rejects blacklisted channels. Blacklisted
+    videos are dropped outright rather than skipped, so they can't become
+    the fallback pick either.
     
     Args:
-        filtered_videos: List of filtered and ranked videos
-        num_to_select: Number of videos to select
+        videos: Videos with details (durationSeconds, viewCount, channelName)
     
     Returns:
-        list: Top N videos
+        tuple: (videos worth analyzing, skipped videos still eligible as the
+            fallback), each in input order
     """
-    return filtered_videos[:num_to_select]
+    kept, skipped = [], []
+    blacklisted = 0
+    for video in videos:
+        if get_channel_tier(video.get('channelName', '')) == -1:
+            logger.debug("Pre-filter: '%s' is from a blacklisted channel", video.get('title', 'Unknown'))
+            blacklisted += 1
+        elif _passes_metadata_checks(video):
+            kept.append(video)
+        else:
+            skipped.append(video)
+    
+    if skipped or blacklisted:
+        logger.info(
+            f"Pre-filtered out {len(skipped) + blacklisted} of {len(videos)} videos "
+            f"(duration/views: {len(skipped)}, blacklisted channel: {blacklisted})"
+        )
+    return kept, skipped
 
 
-def _passes_duration_filter(video: Dict, grade_level: str) -> bool:
-    """
-    Check if video duration is reasonable (not too short or too long).
-    
-    Flexible ranges - we're just avoiding extremes:
-    - Too short: < 2 minutes (likely not enough content)
-    - Too long: > 30 minutes (too much for classroom use)
-    """
-    duration = video.get('durationSeconds', 0)
-    if not duration:
+def _passes_metadata_checks(video: Dict) -> bool:
+    """Duration and view-count checks for prefilter_videos()."""
+    duration_s = video.get('durationSeconds', 0) or 0
+    if not _MIN_DURATION_SECONDS <= duration_s <= _MAX_DURATION_SECONDS:
+        logger.debug("Pre-filter: '%s' duration %ss out of range", video.get('title', 'Unknown'), duration_s)
         return False
     
-    # Avoid extremes
-    if duration < 120:  # Less than 1 minute
-        return False
-    if duration > 3600:  # More than 60 minutes
+    view_count = video.get('viewCount', 0) or 0
+    if view_count < _MIN_VIEW_COUNT:
+        logger.debug("Pre-filter: '%s' has only %s views", video.get('title', 'Unknown'), view_count)
         return False
     
     return True
 
 
-def _passes_quality_filter(video: Dict) -> bool:
+def select_top_videos(
+    filtered_videos: List[Dict],
+    num_to_select: int,
+    scores: Optional[np.ndarray] = None
+) -> List[Dict]:
     """
-    Basic quality check - ensure video has some engagement.
+    Select top N videos from filtered list.
+    
+    Args:
+        filtered_videos: List of filtered videos; already ranked unless scores is given
+        num_to_select: Number of videos to select
+        scores: Ranking score per video (from filter_videos()); the top N are then
+            picked without sorting the whole list, ties keeping their list order
     
-    We're being lenient here - just filtering out very low quality content.
+    Returns:
+        list: Top N videos (best first)
     """
-    view_count = video.get('viewCount', 0)
+    if scores is None:
+        return filtered_videos[:num_to_select]
     
-    # Require at least 500 views (very lenient)
-    if view_count < 500:
-        return False
+    top = heapq.nlargest(num_to_select, range(len(filtered_videos)), key=scores.__getitem__)
+    return [filtered_videos[i] for i in top]
+
+
+def _log_rejected_video(video: Dict) -> None:
+    """Debug-log why a video failed filter_and_rank_videos() (first failing filter, in filter order)."""
+    vid_id = video.get('videoId', '')
+    vid_title = video.get('title', 'Unknown')
+    vid_url = f"https://www.youtube.com/watch?v={vid_id}" if vid_id else "no-url"
     
-    return True
+    cov_pct = video.get('content_coverage', {}).get('coverage_percentage', 0)
+    redundancy = video.get('redundancy_analysis', {})
+    duration_s = video.get('durationSeconds', 0)
+    view_count = video.get('viewCount', 0)
+    
+    if not vid_id:
+        logger.debug(f"❌ REJECTED (no videoId): '{vid_title}'")
+    elif cov_pct < PopulatorConfig.MIN_CONTENT_COVERAGE_PERCENTAGE:
+        logger.debug(
+            f"❌ REJECTED (coverage {cov_pct}% < {PopulatorConfig.MIN_CONTENT_COVERAGE_PERCENTAGE}%): "
+            f"'{vid_title}' — {vid_url}"
+        )
+    elif redundancy.get('is_redundant', False):
+        logger.debug(
+            f"❌ REJECTED (redundant {redundancy.get('overlap_percentage', 0)}% overlap): "
+            f"'{vid_title}' — {vid_url}"
+        )
+    elif not duration_s or duration_s < _MIN_DURATION_SECONDS or duration_s > _MAX_DURATION_SECONDS:
+        logger.debug(
+            f"❌ REJECTED (duration {duration_s}s out of {_MIN_DURATION_SECONDS}–{_MAX_DURATION_SECONDS}s range): "
+            f"'{vid_title}' — {vid_url}"
+        )
+    else:
+        logger.debug(
+            f"❌ REJECTED (only {view_count:,} views, need ≥{_MIN_VIEW_COUNT}): "
+            f"'{vid_title}' — {vid_url}"
+        )
 
 
-def _calculate_ranking_score(video: Dict, grade_level: str) -> float:
+def _calculate_ranking_scores(videos: List[Dict], coverage: np.ndarray) -> np.ndarray:
     """
-    Calculate overall ranking score for video.
+    Calculate the overall ranking score of each video, as one array.
     
     Scoring factors:
     1. Content coverage (50% weight) - most important
     2. Engagement metrics (30% weight) - views and likes
     3. Recency (20% weight) - prefer newer content
+    
+    Args:
+        videos: Videos to score
+        coverage: Their coverage percentages (same order)
+    
+    Returns:
+        np.ndarray: Score per video (float64)
+    """
+    n = len(videos)
+    view_count = np.fromiter((v.get('view_count', 0) for v in videos), dtype=np.float64, count=n)
+    like_count = np.fromiter((v.get('like_count', 0) for v in videos), dtype=np.float64, count=n)
+    recency = _recency_scores([v.get('published_at', '') for v in videos])
+    
+    return _ranking_score_kernel(coverage, view_count, like_count, recency)
+
+
+def _ranking_score_kernel(
+    coverage: np.ndarray,
+    view_count: np.ndarray,
+    like_count: np.ndarray,
+    recency: np.ndarray
+) -> np.ndarray:
     """
-    score = 0.0
+    The scoring formula over plain float64 columns (no Python objects touched).
+    
+    Updates its arrays in place (out=) instead of allocating a temporary per
+    operation, so scoring a section is a handful of ufunc passes.
+    """
+    has_views = view_count > 0
+    scratch = np.where(has_views, view_count, 1.0)  # Views, with 1 where there are none
     
     # 1. Content coverage (0-50 points)
-    coverage = video.get('content_coverage', {}).get('coverage_percentage', 0)
-    score += (coverage / 100) * 50
+    score = coverage / 100
+    score *= 50
     
     # 2. Engagement metrics (0-30 points)
-    view_count = video.get('view_count', 0)
-    like_count = video.get('like_count', 0)
+    # Like ratio, capped at 10% (computed first, while scratch still holds the views)
+    like_points = np.divide(like_count, scratch)
+    np.minimum(like_points, 0.1, out=like_points)
+    like_points /= 0.1
+    like_points *= 15
+    like_points[~(has_views & (like_count > 0))] = 0.0
     
-    # Normalize view count (log scale)
-    if view_count > 0:
-        import math
-        normalized_views = min(math.log10(view_count) / 7, 1.0)  # Cap at 10M views
-        score += normalized_views * 15
+    # Normalize view count (log scale), capped at 10M views
+    np.log10(scratch, out=scratch)
+    scratch /= 7
+    np.minimum(scratch, 1.0, out=scratch)
+    scratch *= 15  # 0 where there are no views (log10(1) == 0)
     
-    # Like ratio
-    if view_count > 0 and like_count > 0:
-        like_ratio = min(like_count / view_count, 0.1)  # Cap at 10%
-        normalized_likes = like_ratio / 0.1
-        score += normalized_likes * 15
+    score += scratch
+    score += like_points
     
     # 3. Recency (0-20 points)
-    # Prefer videos from last 3 years
-    published_at = video.get('published_at', '')
-    if published_at:
-        from datetime import datetime
-        try:
-            pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-            age_days = (datetime.now(pub_date.tzinfo) - pub_date).days
-            age_years = age_days / 365
-            
-            if age_years <= 1:
-                score += 20
-            elif age_years <= 2:
-                score += 15
-            elif age_years <= 3:
-                score += 10
-            elif age_years <= 5:
-                score += 5
-            else:
-                score += 2
-        except:
-            score += 10  # Default middle score if parsing fails
+    score += recency
     
     return score
 
 
+def _recency_scores(published_dates: List[str]) -> np.ndarray:
+    """
+    Recency points (0-20) per ISO publish date; prefers videos from the last 3 years.
+    
+    Each date is parsed once; the age buckets are a single searchsorted over the
+    ages in whole days. A missing date scores 0, an unparseable one 10.
+    """
+    timestamps = np.fromiter(
+        (_published_timestamp(published_at) for published_at in published_dates),
+        dtype=np.float64, count=len(published_dates)
+    )
+    age_days = np.floor((time.time() - timestamps) / 86400)
+    points = _RECENCY_POINTS[np.searchsorted(_RECENCY_MAX_AGE_DAYS, age_days, side='left')]
+    
+    points = np.where(np.isinf(timestamps), 10.0, points)  # Default middle score if parsing fails
+    return np.where(np.isnan(timestamps), 0.0, points)
+
+
+def _published_timestamp(published_at: str) -> float:
+    """Epoch seconds of an ISO date; NaN if missing, +inf if it can't be parsed."""
+    if not published_at:
+        return math.nan
+    try:
+        return datetime.fromisoformat(published_at.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, TypeError, ValueError, OverflowError, OSError):
+        return math.inf
+
+
+@lru_cache(maxsize=64)
 def _extract_grade_number(grade_level: str) -> int:
     """
     Extract numeric grade from grade_level string.
     
+    Memoized: a run only ever sees a handful of distinct grade levels.
+    
     Examples:
         "Grade 3" -> 3
         "5th Grade" -> 5
         "Kindergarten" -> 0
     """
-    import re
-    
     grade_lower = grade_level.lower()
     
     if 'kindergarten' in grade_lower or grade_lower == 'k':
         return 0
     
     # Extract number
-    match = re.search(r'\d+', grade_level)
+    match = _GRADE_RE.search(grade_level)
     if match:
         return int(match.group())
     
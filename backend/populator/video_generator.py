@@ -4,10 +4,13 @@ Single-section video generation with iterative search and content validation
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Optional
 
 from config import PopulatorConfig
 from populator.search_query_generator import generate_queries_for_section
+from utils.channel_database import get_channel_tier
 from utils.youtube_handler import search_videos, get_video_details
 from utils.transcript_handler import (
     get_transcript,
@@ -20,13 +23,24 @@ from utils.content_analyzer import (
     detect_redundancy
 )
 from populator.video_filter import (
-    filter_and_rank_videos,
-    select_top_videos
+    filter_videos,
+    prefilter_videos,
+    select_top_videos,
+    _extract_grade_number
 )
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Query priorities searched in each iteration, for diversity (None = every query,
+# to cast a wider net). Later iterations, and plan steps with no matching
+# queries, use every query.
+_ITERATION_QUERY_PRIORITIES = (
+    ('primary', 'secondary'),       # First iteration
+    ('tertiary', 'quaternary'),     # Second iteration
+    None,                           # Third iteration
+)
+
 
 def generate_videos_for_section(
     section: Dict,
@@ -109,46 +123,58 @@ def generate_videos_for_section(
     # Iterative search with content validation
     selected_videos = []
     all_analyzed_videos = []  # Fallback pool: every video analyzed, even rejected ones
+    prefiltered_videos = []   # Skipped by the pre-filter; analyzed only if the fallback needs them
+    analyzed_video_ids = set()  # Ids whose details came back and were analyzed (or held for the fallback)
+    coverage_sum = 0            # Running sum / max of the selected videos' coverage percentages
+    best_coverage = 0
     iteration = 0
     previous_coverage = 0
+    
+    # Every iteration's queries, bucketed by priority once up front (order kept)
+    iteration_queries = [
+        ([q for q in queries if q.get('priority') in priorities] if priorities else queries) or queries
+        for priorities in _ITERATION_QUERY_PRIORITIES
+    ]
 
     while (iteration < PopulatorConfig.MAX_SEARCH_ITERATIONS):
         iteration += 1
         logger.info(f"--- Search Iteration {iteration}/{PopulatorConfig.MAX_SEARCH_ITERATIONS} ---")
         
         # Use different queries each iteration for diversity
-        queries_this_iteration = []
-        if iteration == 1:
-            # First iteration: Use primary and secondary
-            queries_this_iteration = [q for q in queries if q.get('priority') in ['primary', 'secondary']]
-        elif iteration == 2:
-            # Second iteration: Use tertiary and quaternary
-            queries_this_iteration = [q for q in queries if q.get('priority') in ['tertiary', 'quaternary']]
-        elif iteration == 3:
-            # Third iteration: Use all queries (cast wider net)
-            queries_this_iteration = queries
-        
-        # If no queries for this iteration, use all available
-        if not queries_this_iteration:
-            queries_this_iteration = queries
+        queries_this_iteration = (
+            iteration_queries[iteration - 1] if iteration <= len(iteration_queries) else queries
+        )
         
-        # Search YouTube for each query
-        all_video_ids = []
-        for query_data in queries_this_iteration:
-            query = query_data.get('query', '')
+        # Search YouTube for each query (concurrently: each is one API round-trip)
+        query_strings = [query_data.get('query', '') for query_data in queries_this_iteration]
+        for query in query_strings:
             logger.info(f"🔍 Iteration {iteration} - Searching: '{query}'")
-            
-            video_ids = search_videos(query, PopulatorConfig.YOUTUBE_MAX_RESULTS_PER_QUERY)
-            all_video_ids.extend(video_ids)
         
-        # Remove duplicates
-        all_video_ids = list(set(all_video_ids))
+        search_results = _get_search_executor().map(
+            search_videos, query_strings,
+            [PopulatorConfig.YOUTUBE_MAX_RESULTS_PER_QUERY] * len(query_strings)
+        )
+        
+        # Remove duplicates (first occurrence wins, so the order is stable)
+        all_video_ids = list(dict.fromkeys(
+            video_id for video_ids in search_results for video_id in video_ids
+        ))
         
         if not all_video_ids:
             logger.warning(f"No videos found in iteration {iteration}")
             break
         
-        logger.info(f"Found {len(all_video_ids)} unique videos, fetching details...")
+        # Later iterations re-run earlier queries; videos already analyzed for this
+        # section (selected or rejected) would only cost another LLM pass
+        found_count = len(all_video_ids)
+        all_video_ids = [video_id for video_id in all_video_ids if video_id not in analyzed_video_ids]
+        if not all_video_ids:
+            logger.info(f"All {found_count} videos in iteration {iteration} were already analyzed")
+            continue
+        
+        logger.info(
+            f"Found {found_count} unique videos ({len(all_video_ids)} new), fetching details..."
+        )
         
         # Get detailed info for all videos
         videos = get_video_details(all_video_ids)
@@ -157,37 +183,22 @@ def generate_videos_for_section(
             logger.warning("Failed to fetch video details")
             break
         
-        # Get transcripts and analyze content
-        logger.info(f"Analyzing content for {len(videos)} videos...")
-        for video in videos:
-
-            # Skip transcripts
-            video['transcript_available'] = False
-            video['wpm'] = None
-            
-            # Analyze content
-            content_analysis = analyze_video_content(transcript_text="", video_metadata=video, section_requirements=section)
-            video['topics_covered'] = content_analysis.get('topics_covered', [])
-            video['main_focus'] = content_analysis.get('main_focus', '')
-            video['content_depth'] = content_analysis.get('content_depth', 'unknown')
-            
-            # Calculate content coverage
-            coverage_analysis = calculate_content_coverage(content_analysis, section)
-            video['content_coverage'] = coverage_analysis
-            
-            # Detect redundancy with already-selected videos
-            redundancy_analysis = detect_redundancy(video['topics_covered'], selected_videos)
-            video['redundancy_analysis'] = redundancy_analysis
+        # Videos that will fail on duration/views/channel anyway aren't worth an analysis pass
+        videos, skipped_videos = prefilter_videos(videos)
+        prefiltered_videos.extend(skipped_videos)
+        analyzed_video_ids.update(video['videoId'] for video in skipped_videos)  # Already held for the fallback
+        if not videos:
+            logger.warning(f"⚠️  No videos passed pre-filters in iteration {iteration}")
+            continue
         
-        # Keep every analyzed video in the fallback pool (ranked by coverage)
-        for v in videos:
-            cov = v.get('content_coverage', {}).get('coverage_percentage', 0)
-            v['_fallback_coverage'] = cov
-        all_analyzed_videos.extend(videos)
+        # Analyze content (every analyzed video also joins the fallback pool)
+        logger.info(f"Analyzing content for {len(videos)} videos...")
+        _analyze_videos(videos, section, selected_videos, all_analyzed_videos)
+        analyzed_video_ids.update(video['videoId'] for video in videos)
 
         # Filter and rank videos
         logger.info(f"Filtering and ranking videos...")
-        filtered_videos = filter_and_rank_videos(videos, section, grade_level, selected_videos)
+        filtered_videos, ranking_scores = filter_videos(videos, section, grade_level, selected_videos)
 
         if not filtered_videos:
             logger.warning(f"⚠️  No videos passed filters in iteration {iteration}")
@@ -206,24 +217,24 @@ def generate_videos_for_section(
             logger.info("Already have maximum number of videos")
             break
         
-        new_selections = select_top_videos(filtered_videos, remaining_slots)
+        new_selections = select_top_videos(filtered_videos, remaining_slots, ranking_scores)
         
         # Add to selected list with rationale
         for video in new_selections:
-            video['why_selected'] = _generate_selection_rationale(video, section)
+            video['why_selected'] = _generate_selection_rationale(video, section, grade_level)
             selected_videos.append(video)
+            
+            video_coverage = video.get('content_coverage', {}).get('coverage_percentage', 0)
+            coverage_sum += video_coverage
+            best_coverage = max(best_coverage, video_coverage)
         
         logger.info(f"Selected {len(new_selections)} video(s) this iteration (total: {len(selected_videos)})")
 
-        # Calculate current coverage
-        current_coverage = _calculate_section_coverage(selected_videos)
+        # Current coverage: average across the selected videos
+        current_coverage = _average_coverage(coverage_sum, len(selected_videos))
         logger.info(f"Content coverage: {current_coverage}%")
 
         # Early stop: if we have at least one video with ≥70% coverage, no need to iterate further
-        best_coverage = max(
-            (v.get('content_coverage', {}).get('coverage_percentage', 0) for v in selected_videos),
-            default=0
-        )
         if best_coverage >= 70:
             logger.info(f"✅ High-quality match found ({best_coverage}% coverage) — stopping early")
             break
@@ -242,20 +253,27 @@ def generate_videos_for_section(
             previous_coverage = current_coverage
     
     # Fallback: if nothing passed all filters, return the most relevant candidate
+    # (pre-filtered videos included, so it can still pick from every candidate found
+    # outside a blacklisted channel)
+    if not selected_videos and prefiltered_videos:
+        logger.info(f"Analyzing {len(prefiltered_videos)} pre-filtered videos for the fallback...")
+        _analyze_videos(prefiltered_videos, section, selected_videos, all_analyzed_videos)
+    
     if not selected_videos and all_analyzed_videos:
         best = max(all_analyzed_videos, key=lambda v: v.get('_fallback_coverage', 0))
-        best['why_selected'] = _generate_selection_rationale(best, section)
+        best['why_selected'] = _generate_selection_rationale(best, section, grade_level)
         best['_fallback_used'] = True
         logger.warning(
             f"⚠️  Using fallback video '{best.get('title', '?')}' "
             f"(coverage {best.get('_fallback_coverage', 0)}%) — no video passed all filters"
         )
         selected_videos = [best]
+        coverage_sum = best.get('content_coverage', {}).get('coverage_percentage', 0)
 
     # Store results in section
     section['video_resources'] = selected_videos
     section['content_coverage_status'] = {
-        'coverage_percentage': _calculate_section_coverage(selected_videos),
+        'coverage_percentage': _average_coverage(coverage_sum, len(selected_videos)),
         'iterations_performed': iteration
     }
     
@@ -266,6 +284,72 @@ def generate_videos_for_section(
     return section
 
 
+@lru_cache(maxsize=1)
+def _get_search_executor() -> ThreadPoolExecutor:
+    """
+    Lazily build the process-wide pool for YouTube searches.
+    
+    Shared by every section (and kept alive), so concurrent sections can't
+    multiply the searches in flight, and each worker thread reuses its
+    thread-local YouTube client.
+    """
+    return ThreadPoolExecutor(
+        max_workers=PopulatorConfig.SEARCH_WORKERS, thread_name_prefix="yt-search"
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_analysis_executor() -> ThreadPoolExecutor:
+    """Lazily build the process-wide pool for per-video content analysis (shared like the search pool)."""
+    return ThreadPoolExecutor(
+        max_workers=PopulatorConfig.ANALYSIS_WORKERS, thread_name_prefix="video-analysis"
+    )
+
+
+def _analyze_videos(
+    videos: List[Dict],
+    section: Dict,
+    selected_videos: List[Dict],
+    fallback_pool: List[Dict]
+) -> None:
+    """
+    Analyze videos in place, side by side (each is independent LLM round-trips),
+    and add them to the fallback pool ranked by coverage.
+    """
+    list(_get_analysis_executor().map(
+        lambda video: _analyze_video(video, section, selected_videos), videos
+    ))
+    
+    for v in videos:
+        cov = v.get('content_coverage', {}).get('coverage_percentage', 0)
+        v['_fallback_coverage'] = cov
+    fallback_pool.extend(videos)
+
+
+def _analyze_video(video: Dict, section: Dict, selected_videos: List[Dict]) -> None:
+    """
+    Analyze one candidate video in place: topics, coverage of the section, and
+    redundancy with the videos already selected (which this doesn't modify).
+    """
+    # Skip transcripts
+    video['transcript_available'] = False
+    video['wpm'] = None
+    
+    # Analyze content
+    content_analysis = analyze_video_content(transcript_text="", video_metadata=video, section_requirements=section)
+    video['topics_covered'] = content_analysis.get('topics_covered', [])
+    video['main_focus'] = content_analysis.get('main_focus', '')
+    video['content_depth'] = content_analysis.get('content_depth', 'unknown')
+    
+    # Calculate content coverage
+    coverage_analysis = calculate_content_coverage(content_analysis, section)
+    video['content_coverage'] = coverage_analysis
+    
+    # Detect redundancy with already-selected videos
+    redundancy_analysis = detect_redundancy(video['topics_covered'], selected_videos)
+    video['redundancy_analysis'] = redundancy_analysis
+
+
 def _validate_section_input(section: Dict) -> None:
     """
     Validate that section has required fields.
@@ -290,42 +374,37 @@ def _validate_section_input(section: Dict) -> None:
         )
 
 
-def _calculate_section_coverage(selected_videos: List[Dict]) -> int:
+def _average_coverage(coverage_sum: float, video_count: int) -> int:
     """
-    Calculate overall coverage percentage for a section.
+    Overall coverage percentage for a section: the average across its selected videos.
     
     Args:
-        selected_videos: Videos selected so far
+        coverage_sum: Sum of the selected videos' coverage percentages
+        video_count: Number of selected videos
     
     Returns:
         int: Coverage percentage (0-100)
     """
-    if not selected_videos:
+    if not video_count:
         return 0
     
-    # Average coverage across all selected videos
-    total_coverage = sum([
-        v.get('content_coverage', {}).get('coverage_percentage', 0)
-        for v in selected_videos
-    ])
-    avg_coverage = total_coverage / len(selected_videos)
-    
-    return int(avg_coverage)
+    return int(coverage_sum / video_count)
 
 
-def _generate_selection_rationale(video: Dict, section: Dict) -> str:
+def _generate_selection_rationale(video: Dict, section: Dict, grade_level: str = "5") -> str:
     """
     Generate a brief explanation of why this video was selected.
     
     Args:
         video: Video data
         section: Section data
+        grade_level: Target grade level, used for the pacing (WPM) check
     
     Returns:
         str: Rationale text explaining selection
     
     Example:
-        >>> rationale = _generate_selection_rationale(video, section)
+        >>> rationale = _generate_selection_rationale(video, section, grade_level)
         >>> 'relevance' in rationale.lower() or 'coverage' in rationale.lower()
         True
     """
@@ -344,11 +423,12 @@ def _generate_selection_rationale(video: Dict, section: Dict) -> str:
     
     # Appropriate pacing
     wpm = video.get('wpm')
-    if wpm and 100 <= wpm <= 130:
+    grade = min(max(_extract_grade_number(str(grade_level)), 0), 12)
+    min_wpm, max_wpm = PopulatorConfig.WPM_RANGE_BY_GRADE[grade]
+    if wpm and min_wpm <= wpm <= max_wpm:
         reasons.append("appropriate pacing for grade level")
     
     # Kid-friendly channel
-    from utils.channel_database import get_channel_tier
     tier = get_channel_tier(video.get('channelName', ''))
     if tier == 1:
         reasons.append("kid-friendly channel")
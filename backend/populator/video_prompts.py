@@ -2,69 +2,24 @@
 Prompts for Phase 2: Video Resource Generation
 """
 
+from functools import lru_cache
 from typing import Dict
 
-def get_search_query_generation_prompt(section: Dict, grade_level: str, teacher_comments: str) -> str:
-    """
-    Generate the prompt for creating YouTube search queries for a section.
-    
-    Args:
-        section: Section data from course outline
-        grade_level: Grade level of students
-        teacher_comments: Teacher's special requirements/objectives
-    
-    Returns:
-        str: Prompt for LLM
-    """
-    section_title = section.get('title', '')
-    section_description = section.get('description', '')
-    duration_minutes = section.get('duration_minutes', 0)
-    subtopics = section.get('subtopics', [])
-    
-    course_name = section.get('course_name', '')
-    # Extract detailed objectives and keywords from instruction
-    instruction = section.get('components', {}).get('instruction', {})
-    learning_objectives = instruction.get('learning_objectives', [])
-    content_keywords = instruction.get('content_keywords', [])
-    what_must_be_covered = instruction.get('what_must_be_covered', '')
-    
-    # Extract subtopic details
-    subtopic_list = []
-    for subtopic in subtopics:
-        topics = ', '.join(subtopic.get('topics', []))
-        subtopic_list.append(topics)
-    
-    subtopics_text = '; '.join(subtopic_list) if subtopic_list else "N/A"
-    objectives_text = '\n'.join([f"- {obj}" for obj in learning_objectives]) if learning_objectives else "N/A"
-    keywords_text = ', '.join(content_keywords) if content_keywords else "N/A"
-    
-    # Parse grade level to int
-    try:
-        if isinstance(grade_level, str):
-            if '-' in grade_level:
-                grade_num = int(grade_level.split('-')[0])
-            elif grade_level.lower().startswith('k'):
-                grade_num = 0
-            else:
-                grade_num = int(grade_level)
-        else:
-            grade_num = int(grade_level)
-    except (ValueError, TypeError):
-        grade_num = 5
-    
-    prompt = f"""
+# Search query prompt, filled by str.format (parsed once here instead of re-rendering
+# an f-string per section)
+_SEARCH_QUERY_PROMPT_TEMPLATE = """
 You are an expert at finding educational YouTube videos for elementary students. Generate 1-3 optimal YouTube search queries for the following course section.
 
 TEACHER'S PRIORITY OBJECTIVES (HIGHEST PRIORITY):
-{teacher_comments if teacher_comments else "No special comments provided"}
+{teacher_comments_text}
 
 SECTION DETAILS:
-- Course Name: {course_name if course_name else "Not specified"}
+- Course Name: {course_name_text}
 - Section Title: {section_title}
 - Description: {section_description}
 - Subtopics: {subtopics_text}
 - Duration: {duration_minutes} minutes
-- Grade Level: {grade_level} (approximately {grade_num + 5} years old)
+- Grade Level: {grade_level} (approximately {approx_age} years old)
 
 DETAILED LEARNING OBJECTIVES:
 {objectives_text}
@@ -73,7 +28,7 @@ CONTENT KEYWORDS THAT MUST BE COVERED:
 {keywords_text}
 
 WHAT MUST BE COVERED IN THIS SECTION:
-{what_must_be_covered if what_must_be_covered else "See learning objectives above"}
+{what_must_be_covered_text}
 
 REQUIREMENTS FOR QUERY GENERATION:
 
@@ -113,7 +68,7 @@ Generate EXACTLY 4 queries ranked by priority.
 
 OUTPUT FORMAT (strict JSON):
 {{
-  "section_id": "{section.get('id', '')}",
+  "section_id": "{section_id}",
   "section_title": "{section_title}",
   "queries": [
     {{
@@ -141,5 +96,76 @@ OUTPUT FORMAT (strict JSON):
 
 Generate the search queries now as valid JSON only. No other text.
 """
+
+
+def get_search_query_generation_prompt(section: Dict, grade_level: str, teacher_comments: str) -> str:
+    """
+    Generate the prompt for creating YouTube search queries for a section.
+    
+    Args:
+        section: Section data from course outline
+        grade_level: Grade level of students
+        teacher_comments: Teacher's special requirements/objectives
+    
+    Returns:
+        str: Prompt for LLM
+    """
+    section_title = section.get('title', '')
+    section_description = section.get('description', '')
+    duration_minutes = section.get('duration_minutes', 0)
+    subtopics = section.get('subtopics', [])
     
-    return prompt
\ No newline at end of file
+    course_name = section.get('course_name', '')
+    # Extract detailed objectives and keywords from instruction
+    instruction = section.get('components', {}).get('instruction', {})
+    learning_objectives = instruction.get('learning_objectives', [])
+    content_keywords = instruction.get('content_keywords', [])
+    what_must_be_covered = instruction.get('what_must_be_covered', '')
+    
+    # Extract subtopic details
+    subtopics_text = '; '.join(
+        ', '.join(subtopic.get('topics', [])) for subtopic in subtopics
+    ) if subtopics else "N/A"
+    objectives_text = "- " + "\n- ".join(map(str, learning_objectives)) if learning_objectives else "N/A"
+    keywords_text = ', '.join(content_keywords) if content_keywords else "N/A"
+    
+    # Everything is passed as text, so the rendered prompt is cached per distinct section
+    return _build_search_query_prompt(
+        section_id=str(section.get('id', '')),
+        section_title=str(section_title),
+        section_description=str(section_description),
+        duration_minutes=str(duration_minutes),
+        subtopics_text=subtopics_text,
+        course_name=str(course_name),
+        course_name_text=str(course_name) if course_name else "Not specified",
+        objectives_text=objectives_text,
+        keywords_text=keywords_text,
+        what_must_be_covered_text=(
+            str(what_must_be_covered) if what_must_be_covered else "See learning objectives above"
+        ),
+        grade_level=str(grade_level),
+        approx_age=_parse_grade_number(grade_level) + 5,
+        teacher_comments_text=str(teacher_comments) if teacher_comments else "No special comments provided"
+    )
+
+
+@lru_cache(maxsize=256)
+def _build_search_query_prompt(**fields) -> str:
+    """Render the template; retries and regenerations of a section are served from cache."""
+    return _SEARCH_QUERY_PROMPT_TEMPLATE.format(**fields)
+
+
+def _parse_grade_number(grade_level) -> int:
+    """Grade as an int (K = 0, "3-5" -> 3); 5 if it can't be parsed."""
+    try:
+        if isinstance(grade_level, str):
+            if '-' in grade_level:
+                return int(grade_level.split('-')[0])
+            elif grade_level.lower().startswith('k'):
+                return 0
+            else:
+                return int(grade_level)
+        else:
+            return int(grade_level)
+    except (ValueError, TypeError):
+        return 5
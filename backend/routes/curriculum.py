@@ -72,7 +72,6 @@ async def generate_curriculum(
         tmp_paths = []
         try:
             yield f"data: {json.dumps({'phase': 0, 'message': 'Starting...', 'progress': 0})}\n\n"
-            await asyncio.sleep(0.1)
 
             # ── Extract content from attached files and upload to Storage ────
             combined_extracted_text = ""
@@ -144,7 +143,6 @@ async def generate_curriculum(
 
             # ── Requirements Interpreter: structure the raw text once, up front ──
             yield f"data: {json.dumps({'phase': 0.5, 'message': 'Interpreting your requirements...', 'progress': 8})}\n\n"
-            await asyncio.sleep(0.1)
 
             from interpreter.requirements_interpreter import interpret_requirements
             interpreted_requirements = interpret_requirements(
@@ -190,7 +188,6 @@ async def generate_curriculum(
                 return
 
             yield f"data: {json.dumps({'type': 'outline_ready', 'outline': outline_data, 'phase': 1, 'message': 'Outline ready! Proposing subsections...', 'progress': 50})}\n\n"
-            await asyncio.sleep(0.2)
 
             # ── Phase 1.5: Propose candidate subsection chains per section ──
             async for event in orchestrator.run_phase1_5(teacher_input, outline_data):
@@ -329,7 +326,6 @@ async def generate_blocks(body: GenerateBlocksRequest):
     async def generate():
         try:
             yield f"data: {json.dumps({'phase': 2, 'message': 'Starting block generation...', 'progress': 0})}\n\n"
-            await asyncio.sleep(0.1)
 
             # subject/topic aren't sent as separate wire fields — they were auto-detected
             # in generate-curriculum and already live on the outline the teacher approved.
@@ -376,7 +372,6 @@ async def generate_blocks(body: GenerateBlocksRequest):
                     blocks_by_subsection = event['blocks_by_subsection']
 
             yield f"data: {json.dumps({'phase': 2, 'message': 'Blocks generated! Saving...', 'progress': 95})}\n\n"
-            await asyncio.sleep(0.2)
 
             # ── Merge approved subsections (with their final selected blocks
             # manifest) back into the outline's section/subsection tree ──────
@@ -8,7 +8,6 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 import json
-import asyncio
 
 from services.orchestrator import CurriculumOrchestrator
 from services.firebase_service import FirebaseService
@@ -29,6 +28,13 @@ class PopulateSectionRequest(BaseModel):
     grade_level: str
     teacher_comments: Optional[str] = ""
 
+class PopulateSectionsRequest(BaseModel):
+    """Request model for populating several sections with videos at once (Phase 2)"""
+    curriculum_id: str
+    sections: List[dict]  # Box data per section; each needs its 'id'
+    grade_level: str
+    teacher_comments: Optional[str] = ""
+
 class GenerateVideosRequest(BaseModel):
     """Request model for generating videos for a topic"""
     topicId: str
@@ -61,7 +67,6 @@ async def populate_section(request: PopulateSectionRequest):
             
             # Initial status
             yield f"data: {json.dumps({'message': 'Finding educational videos...', 'progress': 0})}\n\n"
-            await asyncio.sleep(0.1)
             
             # Run Phase 2 for this section only
             yield f"data: {json.dumps({'message': 'Searching YouTube...', 'progress': 20})}\n\n"
@@ -77,7 +82,6 @@ async def populate_section(request: PopulateSectionRequest):
                 return
             
             yield f"data: {json.dumps({'message': 'Analyzing video content...', 'progress': 60})}\n\n"
-            await asyncio.sleep(0.3)
             
             # Update Firebase with populated section
             yield f"data: {json.dumps({'message': 'Saving videos...', 'progress': 90})}\n\n"
@@ -108,6 +112,60 @@ async def populate_section(request: PopulateSectionRequest):
     )
 
 
+@router.post("/populate-sections")
+async def populate_sections(request: PopulateSectionsRequest):
+    """
+    Populate several sections with video resources (Phase 2).
+    
+    Sections run concurrently; each one is saved and streamed as soon as it
+    finishes, so the teacher sees boxes fill in without waiting for the slowest.
+    
+    Args:
+        request: The sections to populate
+    
+    Returns:
+        StreamingResponse: Progress updates via SSE, one 'section' event per
+            populated section, then a final event with all sections
+    """
+    
+    async def generate():
+        """Generator function for SSE streaming"""
+        try:
+            logger.info(f"Populating {len(request.sections)} section(s)")
+            
+            async for event in orchestrator.populate_sections(
+                sections=request.sections,
+                grade_level=request.grade_level,
+                teacher_comments=request.teacher_comments
+            ):
+                if event['type'] == 'progress':
+                    yield f"data: {json.dumps({'message': event['message'], 'progress': event['progress']})}\n\n"
+                elif event['type'] == 'section_videos':
+                    await firebase.update_section(
+                        curriculum_id=request.curriculum_id,
+                        section_id=event['section_id'],
+                        section_data=event['section']
+                    )
+                    yield f"data: {json.dumps({'type': 'section', 'section_id': event['section_id'], 'section': event['section'], 'progress': event['progress']})}\n\n"
+                elif event['type'] == 'done':
+                    yield f"data: {json.dumps({'message': 'Complete!', 'progress': 100, 'sections': event['sections'], 'done': True})}\n\n"
+
+        except Exception as e:
+            error_msg = f"Error populating sections: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            yield f"data: {json.dumps({'message': error_msg, 'error': True})}\n\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/section/{curriculum_id}/{section_id}")
 async def get_section(curriculum_id: str, section_id: str, teacherUid: str):
     """
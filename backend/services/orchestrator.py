@@ -10,7 +10,10 @@ Phase 2 and Phase 3 are commented out for testing.
 import logging
 import asyncio
 import time
-from typing import Dict, List, Optional, AsyncGenerator
+from typing import Dict, List, Optional, AsyncGenerator, Tuple
+
+from config import OutlinerConfig, PopulatorConfig
+from utils.section_batcher import SectionBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +47,7 @@ class CurriculumOrchestrator:
         Run Phase 1: Generate course outline (sections only — each a day/theme with a
         depth_ceiling). Subsections are proposed later in Phase 1.5 (run_phase1_5).
         """
-        from outliner.outline_generator import generate_boxes, create_final_outline
+        from outliner.outline_generator import agenerate_boxes, create_final_outline
 
         logger.info(f"Running Phase 1 for: {teacher_input.get('course_name', 'Unknown')}")
 
@@ -62,8 +65,7 @@ class CurriculumOrchestrator:
                 'requirements':    teacher_input.get('objectives', 'None'),
             }
 
-            # Call synchronously — blocks the event loop but acceptable for single-user SSE
-            outline_data = generate_boxes(teacher_input_formatted, images=images)
+            outline_data = await agenerate_boxes(teacher_input_formatted, images=images)
 
             if not outline_data:
                 logger.error("Phase 1 failed: No outline generated")
@@ -244,9 +246,7 @@ class CurriculumOrchestrator:
           {'type': 'subsection_blocks', 'subsection_id': str, 'blocks': [...]}
           {'type': 'done', 'blocks_by_subsection': {subsection_id: [block, ...]}}
         """
-        from outliner.block_prompts import get_block_generation_prompt, _filter_excluded_block_specs
         from outliner.context_utils import build_subsection_labels
-        from utils.llm_handler import call_openai
 
         total_subs = len(approved_subsections)
         if total_subs == 0:
@@ -262,105 +262,150 @@ class CurriculumOrchestrator:
             {'title': title, 'subsections': subs} for title, subs in sections_for_labels.items()
         ])
 
-        blocks_by_subsection: Dict[str, List] = {}
+        # Subsections are independent once the sibling labels are fixed, so their
+        # LLM calls run concurrently (bounded) and are reported as each finishes.
+        async def generate_one(entry: Tuple[int, Dict]):
+            flat_idx, sub = entry
+            return await self._generate_subsection_blocks(
+                flat_idx, sub, teacher_input, all_subsection_labels
+            )
 
-        for flat_idx, sub in enumerate(approved_subsections):
-            sub_id = sub.get('id', f'sub-{flat_idx}')
-            section_title = sub.get('section_title', f'Section {flat_idx + 1}')
+        batcher = SectionBatcher(generate_one, OutlinerConfig.MAX_CONCURRENCY)
+
+        yield {
+            'type': 'progress',
+            'message': f'Generating blocks for {total_subs} subsection(s)...',
+            'progress': 70,
+        }
+
+        stamped_by_subsection: Dict[str, List] = {}
+        done_count = 0
+
+        async for _, (sub_id, label, stamped) in batcher.run(enumerate(approved_subsections)):
+            stamped_by_subsection[sub_id] = stamped
+            done_count += 1
 
-            pct = 70 + int(flat_idx / total_subs * 25)
+            pct = 70 + int(done_count / total_subs * 25)
             yield {
                 'type': 'progress',
-                'message': f'Generating blocks: {section_title} — {sub.get("title", sub_id)} ({flat_idx + 1}/{total_subs})',
+                'message': f'Generated blocks: {label} ({done_count}/{total_subs})',
+                'progress': pct,
+            }
+            yield {
+                'type': 'subsection_blocks',
+                'subsection_id': sub_id,
+                'blocks': stamped,
                 'progress': pct,
             }
 
-            other_subsections = [
-                lbl for lbl in all_subsection_labels
-                if not (lbl['section'] == section_title and lbl['subsection'] == sub.get('title', ''))
-            ]
+        # Keep the approved order in the final payload
+        blocks_by_subsection: Dict[str, List] = {}
+        for flat_idx, sub in enumerate(approved_subsections):
+            sub_id = sub.get('id', f'sub-{flat_idx}')
+            blocks_by_subsection[sub_id] = stamped_by_subsection.get(sub_id, [])
 
-            excluded_block_ids = sub.get('excluded_block_ids', [])
-            block_specs = _filter_excluded_block_specs(sub.get('blocks', []), excluded_block_ids)
+        yield {'type': 'done', 'blocks_by_subsection': blocks_by_subsection}
 
-            if not block_specs:
-                blocks_by_subsection[sub_id] = []
-                yield {'type': 'subsection_blocks', 'subsection_id': sub_id, 'blocks': [], 'progress': pct}
-                continue
+    async def _generate_subsection_blocks(
+        self,
+        flat_idx: int,
+        sub: Dict,
+        teacher_input: Dict,
+        all_subsection_labels: List[Dict],
+    ) -> Tuple[str, str, List[Dict]]:
+        """
+        Generate the full blocks for one approved subsection (one LLM call).
 
-            session_minutes = int(sub.get('duration_minutes') or sum(
-                {'content': 15, 'worksheet': 15, 'activity': 30}.get(b.get('type'), 15) for b in block_specs
-            ))
+        Returns: (subsection_id, progress label, stamped blocks) — an empty block
+        list if nothing was left after exclusions or the LLM call failed.
+        """
+        from outliner.block_prompts import get_block_generation_prompt, _filter_excluded_block_specs
+        from utils.llm_handler import acall_openai
 
-            try:
-                prompt = get_block_generation_prompt(
-                    teacher_input={
-                        'course_name':     teacher_input.get('course_name', ''),
-                        'subject':         teacher_input.get('subject', ''),
-                        'topic':           teacher_input.get('topic', ''),
-                        'age_range_start': teacher_input.get('age_range_start', ''),
-                        'age_range_end':   teacher_input.get('age_range_end', ''),
-                        'requirements':    teacher_input.get('objectives', 'None'),
-                    },
-                    subsection=sub,
-                    section_title=section_title,
-                    block_specs=block_specs,
-                    other_subsections=other_subsections,
-                    session_minutes=session_minutes,
-                )
+        sub_id = sub.get('id', f'sub-{flat_idx}')
+        section_title = sub.get('section_title', f'Section {flat_idx + 1}')
+        label = f'{section_title} — {sub.get("title", sub_id)}'
 
-                result = call_openai(
-                    prompt,
-                    system_message=(
-                        "You are an expert elementary education curriculum designer. "
-                        "Generate content blocks as valid JSON only."
-                    ),
-                    max_tokens=8000,
-                )
+        other_subsections = [
+            lbl for lbl in all_subsection_labels
+            if not (lbl['section'] == section_title and lbl['subsection'] == sub.get('title', ''))
+        ]
 
-                raw_blocks = result.get('blocks', []) if isinstance(result, dict) else []
-                if not isinstance(raw_blocks, list):
-                    raw_blocks = []
-
-                # Block ids are stable from Phase 1.5 onward (block_specs already carry
-                # real ids, e.g. referenced by worksheet source_block_ids) — keep whatever
-                # the LLM echoed back, falling back to the approved spec's id by position
-                # if it dropped or mangled one.
-                spec_ids_by_position = [spec.get('id') for spec in block_specs]
-                stamped = []
-                for i, block in enumerate(raw_blocks):
-                    if not isinstance(block, dict):
-                        continue
-                    if not block.get('id') and i < len(spec_ids_by_position):
-                        block['id'] = spec_ids_by_position[i]
-                    block.setdefault('addedAt', None)
-                    stamped.append(block)
-
-                if len(stamped) > 1:
-                    group_id = f"group-{sub_id}"
-                    for block in stamped:
-                        block['groupId'] = group_id
+        excluded_block_ids = sub.get('excluded_block_ids', [])
+        block_specs = _filter_excluded_block_specs(sub.get('blocks', []), excluded_block_ids)
 
-            except Exception as e:
-                logger.error(f"Block generation failed for subsection {sub_id}: {e}", exc_info=True)
-                stamped = []
+        if not block_specs:
+            return sub_id, label, []
 
-            blocks_by_subsection[sub_id] = stamped
+        session_minutes = int(sub.get('duration_minutes') or sum(
+            {'content': 15, 'worksheet': 15, 'activity': 30}.get(b.get('type'), 15) for b in block_specs
+        ))
 
-            yield {
-                'type': 'subsection_blocks',
-                'subsection_id': sub_id,
-                'blocks': stamped,
-                'progress': pct,
-            }
+        try:
+            prompt = get_block_generation_prompt(
+                teacher_input={
+                    'course_name':     teacher_input.get('course_name', ''),
+                    'subject':         teacher_input.get('subject', ''),
+                    'topic':           teacher_input.get('topic', ''),
+                    'age_range_start': teacher_input.get('age_range_start', ''),
+                    'age_range_end':   teacher_input.get('age_range_end', ''),
+                    'requirements':    teacher_input.get('objectives', 'None'),
+                },
+                subsection=sub,
+                section_title=section_title,
+                block_specs=block_specs,
+                other_subsections=other_subsections,
+                session_minutes=session_minutes,
+            )
 
-        yield {'type': 'done', 'blocks_by_subsection': blocks_by_subsection}
+            result = await acall_openai(
+                prompt,
+                system_message=(
+                    "You are an expert elementary education curriculum designer. "
+                    "Generate content blocks as valid JSON only."
+                ),
+                max_tokens=8000,
+            )
+
+            raw_blocks = result.get('blocks', []) if isinstance(result, dict) else []
+            if not isinstance(raw_blocks, list):
+                raw_blocks = []
+
+            # Block ids are stable from Phase 1.5 onward (block_specs already carry
+            # real ids, e.g. referenced by worksheet source_block_ids) — keep whatever
+            # the LLM echoed back, falling back to the approved spec's id by position
+            # if it dropped or mangled one.
+            spec_ids_by_position = [spec.get('id') for spec in block_specs]
+            stamped = []
+            for i, block in enumerate(raw_blocks):
+                if not isinstance(block, dict):
+                    continue
+                if not block.get('id') and i < len(spec_ids_by_position):
+                    block['id'] = spec_ids_by_position[i]
+                block.setdefault('addedAt', None)
+                stamped.append(block)
+
+            if len(stamped) > 1:
+                group_id = f"group-{sub_id}"
+                for block in stamped:
+                    block['groupId'] = group_id
+
+        except Exception as e:
+            logger.error(f"Block generation failed for subsection {sub_id}: {e}", exc_info=True)
+            stamped = []
+
+        return sub_id, label, stamped
 
     # PHASE 2 METHODS - COMMENTED OUT FOR PHASE 1 TESTING
     # Uncomment these when ready to test Phase 2
     
     async def run_phase2(self, outline_data: Dict) -> Dict:
-        """Run Phase 2: Add video resources (DISABLED FOR TESTING)"""
+        """
+        Run Phase 2: Add video resources (DISABLED FOR TESTING)
+
+        When re-enabled, stream from populate_sections() (as POST /populate-sections
+        does) rather than adding another way to run sections side by side.
+        """
         logger.warning("Phase 2 is disabled - boxes will not be populated with videos")
         return outline_data
     
@@ -378,7 +423,9 @@ class CurriculumOrchestrator:
         print("Calling Orchstrator HIT", section.get('title', 'Unknown'))
         
         try:
-            enriched_section = generate_videos_for_section(
+            # Blocking (YouTube + OpenAI calls), so keep it off the event loop
+            enriched_section = await asyncio.to_thread(
+                generate_videos_for_section,
                 section=section,
                 grade_level=grade_level,
                 teacher_comments=teacher_comments
@@ -389,7 +436,68 @@ class CurriculumOrchestrator:
         except Exception as e:
             logger.error(f"Error populating section: {e}", exc_info=True)
             return section  # Return original section if fails
-    
+
+    async def populate_sections(
+        self,
+        sections: List[Dict],
+        grade_level: str,
+        teacher_comments: str = ""
+    ) -> AsyncGenerator[Dict, None]:
+        """
+        Populate several sections with video resources (Phase 2), streaming results.
+
+        Sections are independent, so they run concurrently (at most
+        PopulatorConfig.SECTION_WORKERS at once) and each is reported as soon as it
+        finishes instead of after the slowest one.
+
+        This is the one entry point for populating many sections; POST
+        /populate-sections relays these events over SSE as they come.
+
+        Yields dicts:
+          {'type': 'progress', 'message': str, 'progress': int}
+          {'type': 'section_videos', 'section_id': str, 'section': {...}, 'progress': int}
+          {'type': 'done', 'sections': [section, ...]}  (input order)
+        """
+        total_sections = len(sections)
+        if total_sections == 0:
+            yield {'type': 'done', 'sections': []}
+            return
+
+        # populate_single_section() never raises (falls back to the original section)
+        async def populate_one(entry: Tuple[int, Dict]):
+            _, section = entry
+            return await self.populate_single_section(section, grade_level, teacher_comments)
+
+        batcher = SectionBatcher(populate_one, PopulatorConfig.SECTION_WORKERS)
+
+        yield {
+            'type': 'progress',
+            'message': f'Finding videos for {total_sections} section(s)...',
+            'progress': 0,
+        }
+
+        populated: List[Optional[Dict]] = [None] * total_sections
+        done_count = 0
+
+        async for (idx, section), enriched in batcher.run(enumerate(sections)):
+            populated[idx] = enriched
+            done_count += 1
+
+            pct = int(done_count / total_sections * 100)
+            yield {
+                'type': 'progress',
+                'message': f'Found videos: {section.get("title", "Untitled")} ({done_count}/{total_sections})',
+                'progress': pct,
+            }
+            yield {
+                'type': 'section_videos',
+                'section_id': section.get('id', f'section-{idx}'),
+                'section': enriched,
+                'progress': pct,
+            }
+
+        yield {'type': 'done', 'sections': populated}
+
     # PHASE 3 METHODS
     async def generate_worksheets(
     self,
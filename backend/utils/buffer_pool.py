@@ -0,0 +1,110 @@
+"""
+Fixed-size reusable byte buffers for streamed downloads
+Caps how much memory concurrent downloads can hold instead of allocating a body per response
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+
+class BufferPool:
+    """
+    At most `max_buffers` bytearrays of `buffer_size` bytes, rented and returned.
+
+    Buffers are allocated on first use and then recycled, so an idle pool costs
+    nothing and a busy one never grows past max_buffers * buffer_size. rent()
+    blocks the calling thread while every buffer is out; rent_async() waits
+    without blocking the event loop. Safe to share across threads and loops.
+    """
+
+    def __init__(self, buffer_size: int, max_buffers: int):
+        """
+        Create an empty pool.
+
+        Args:
+            buffer_size: Bytes per buffer (the largest download that fits)
+            max_buffers: Buffers that can be rented at once
+        """
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+
+        self._free: "queue.SimpleQueue[bytearray]" = queue.SimpleQueue()
+        self._slots = threading.BoundedSemaphore(max_buffers)
+
+    @contextmanager
+    def rent(self) -> Iterator[bytearray]:
+        """Borrow a buffer for the duration of the with-block."""
+        self._slots.acquire()
+        try:
+            buffer = self._take()
+            try:
+                yield buffer
+            finally:
+                self._free.put(buffer)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def rent_async(self, poll_seconds: float = 0.005) -> AsyncIterator[bytearray]:
+        """Async rent(): polls for a free slot so a cancelled waiter never strands a buffer."""
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(poll_seconds)
+        try:
+            buffer = self._take()
+            try:
+                yield buffer
+            finally:
+                self._free.put(buffer)
+        finally:
+            self._slots.release()
+
+    def _take(self) -> bytearray:
+        """A recycled buffer, or a new one while the pool is still filling up."""
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return bytearray(self.buffer_size)
+
+
+def fill_buffer(buffer: bytearray, chunks: Iterable[bytes]) -> int:
+    """
+    Copy streamed chunks into `buffer`.
+
+    Args:
+        buffer: Destination (from BufferPool.rent())
+        chunks: Response body chunks
+
+    Returns:
+        int: Bytes written
+
+    Raises:
+        ValueError: If the body doesn't fit in the buffer
+    """
+    size = 0
+    for chunk in chunks:
+        size = _append_chunk(buffer, size, chunk)
+    return size
+
+
+async def fill_buffer_async(buffer: bytearray, chunks: AsyncIterable[bytes]) -> int:
+    """fill_buffer() for an async chunk stream."""
+    size = 0
+    async for chunk in chunks:
+        size = _append_chunk(buffer, size, chunk)
+    return size
+
+
+def _append_chunk(buffer: bytearray, size: int, chunk: bytes) -> int:
+    """Write one chunk at `size`; returns the new size."""
+    end = size + len(chunk)
+    if end > len(buffer):
+        raise ValueError(f"Download exceeds the {len(buffer)}-byte buffer")
+    buffer[size:end] = chunk
+    return end
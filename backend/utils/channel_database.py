@@ -4,6 +4,7 @@ Maintains whitelists and blacklists of educational channels with target age rang
 """
 
 import logging
+from functools import lru_cache
 from typing import Tuple, Optional
 
 # Initialize logger
@@ -59,10 +60,13 @@ BLACKLIST_CHANNELS = {
 # PUBLIC API
 # ============================================================================
 
+@lru_cache(maxsize=4096)
 def get_channel_tier(channel_name: str) -> int:
     """
     Determine which tier a channel belongs to.
     
+    Memoized: the same channels come up again and again across sections.
+    
     Args:
         channel_name: YouTube channel name
     
@@ -82,23 +86,23 @@ def get_channel_tier(channel_name: str) -> int:
     # Check blacklist first
     for blacklisted in BLACKLIST_CHANNELS:
         if blacklisted in channel_lower:
-            logger.debug(f"Channel '{channel_name}' is blacklisted")
+            logger.debug("Channel '%s' is blacklisted", channel_name)
             return -1
     
     # Check tier 1
     for tier1_channel in TIER_1_CHANNELS.keys():
         if tier1_channel in channel_lower:
-            logger.debug(f"Channel '{channel_name}' is tier 1 (kid-focused)")
+            logger.debug("Channel '%s' is tier 1 (kid-focused)", channel_name)
             return 1
     
     # Check tier 2
     for tier2_channel in TIER_2_CHANNELS.keys():
         if tier2_channel in channel_lower:
-            logger.debug(f"Channel '{channel_name}' is tier 2 (general educational)")
+            logger.debug("Channel '%s' is tier 2 (general educational)", channel_name)
             return 2
     
     # Unknown channel
-    logger.debug(f"Channel '{channel_name}' is unknown (tier 0)")
+    logger.debug("Channel '%s' is unknown (tier 0)", channel_name)
     return 0
 
 
@@ -142,13 +146,13 @@ def calculate_channel_demographic_score(channel_name: str, grade_level: int) ->
         for channel_key, (min_grade, max_grade) in TIER_1_CHANNELS.items():
             if channel_key in channel_lower:
                 if min_grade <= grade_level <= max_grade:
-                    logger.debug(f"Perfect demographic match for '{channel_name}' at grade {grade_level}")
+                    logger.debug("Perfect demographic match for '%s' at grade %s", channel_name, grade_level)
                     return 4.0  # Perfect match
                 elif abs(grade_level - min_grade) <= 2 or abs(grade_level - max_grade) <= 2:
-                    logger.debug(f"Close demographic match for '{channel_name}' at grade {grade_level}")
+                    logger.debug("Close demographic match for '%s' at grade %s", channel_name, grade_level)
                     return 3.0  # Close match
                 else:
-                    logger.debug(f"Tier 1 but not ideal age range for '{channel_name}' at grade {grade_level}")
+                    logger.debug("Tier 1 but not ideal age range for '%s' at grade %s", channel_name, grade_level)
                     return 2.0  # Tier 1 but not ideal age range
     
     # Tier 2: Check age range match
@@ -157,14 +161,14 @@ def calculate_channel_demographic_score(channel_name: str, grade_level: int) ->
         for channel_key, (min_grade, max_grade) in TIER_2_CHANNELS.items():
             if channel_key in channel_lower:
                 if min_grade <= grade_level <= max_grade:
-                    logger.debug(f"General educational in range for '{channel_name}' at grade {grade_level}")
+                    logger.debug("General educational in range for '%s' at grade %s", channel_name, grade_level)
                     return 2.0  # General educational, in range
                 else:
-                    logger.debug(f"General educational outside range for '{channel_name}' at grade {grade_level}")
+                    logger.debug("General educational outside range for '%s' at grade %s", channel_name, grade_level)
                     return 1.0  # General educational, outside range
     
     # Unknown channel
-    logger.debug(f"Neutral score for unknown channel '{channel_name}'")
+    logger.debug("Neutral score for unknown channel '%s'", channel_name)
     return 0.5  # Neutral score for unknown channels
 
 
@@ -3,31 +3,152 @@ Content extraction for worksheets and activities
 Handles GPT-4 Vision analysis of worksheet images and web scraping for activities
 """
 
+import asyncio
+import base64
+import hashlib
 import logging
-import requests
-from bs4 import BeautifulSoup
-import openai
-import json
-from typing import Dict, Optional, List
+import httpx
+from io import BytesIO
+from PIL import Image
+from selectolax.lexbor import LexborHTMLParser
+from openai import AsyncOpenAI
+import orjson
+from typing import Callable, Dict, Optional, List
 
-from config import OPENAI_API_KEY
+from config import OPENAI_API_KEY, HandsOnConfig
+from utils.buffer_pool import BufferPool, fill_buffer_async
+from utils.disk_cache import DiskCache
+from utils.rate_limiter import TokenBucket
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI
-openai.api_key = OPENAI_API_KEY
+CRAWL_USER_AGENT = 'Mozilla/5.0 (Educational Resource Bot)'
+
+# Bump when the activity extraction prompt/shape changes to invalidate cached extractions
+ACTIVITY_EXTRACTION_CACHE_VERSION = 1
+
+# Bump when the worksheet analysis prompt/shape changes to invalidate cached analyses
+WORKSHEET_ANALYSIS_CACHE_VERSION = 1
+
+# Vision model used for worksheet image analysis (part of the analysis cache key)
+WORKSHEET_VISION_MODEL = "gpt-4o"
+
+# Worksheet image bodies are streamed into these instead of read whole per response
+_IMAGE_BUFFER_POOL = BufferPool(
+    buffer_size=HandsOnConfig.IMAGE_BUFFER_BYTES,
+    max_buffers=HandsOnConfig.IMAGE_BUFFER_POOL_SIZE
+)
+
+# Chunk size for streamed image downloads
+_IMAGE_CHUNK_BYTES = 64 * 1024
+
+# Shared by every vision call in the process so concurrent batches stay under the limits
+_VISION_RATE_LIMITER = TokenBucket(
+    requests_per_minute=HandsOnConfig.VISION_RPM_LIMIT,
+    tokens_per_minute=HandsOnConfig.VISION_TPM_LIMIT
+)
+
+# Rough input-token cost of one image at the configured detail level
+_VISION_IMAGE_TOKENS = 85 if HandsOnConfig.VISION_IMAGE_DETAIL == "low" else 765
+
+
+def _estimate_vision_request_tokens(request: Dict) -> int:
+    """
+    Estimate the tokens a vision request counts against the TPM limit.
+    
+    OpenAI counts prompt tokens plus max_tokens, so this is text length / 4,
+    a flat cost per image, and the completion cap.
+    """
+    text_chars = 0
+    images = 0
+    for message in request.get('messages', []):
+        content = message.get('content')
+        if isinstance(content, str):
+            text_chars += len(content)
+            continue
+        for part in content or []:
+            if part.get('type') == 'image_url':
+                images += 1
+            else:
+                text_chars += len(part.get('text', ''))
+    return text_chars // 4 + images * _VISION_IMAGE_TOKENS + request.get('max_tokens', 0)
+
+
+async def _create_vision_completion_async(request: Dict, llm_client: AsyncOpenAI):
+    """
+    Send a chat completion through the shared vision rate limiter.
+    
+    Waits for budget (without blocking the loop) before sending, then re-syncs
+    the limiter from the response's x-ratelimit-remaining-* headers.
+    
+    Args:
+        request: Keyword arguments for chat.completions.create()
+        llm_client: Client used for the call
+    
+    Returns:
+        ChatCompletion: Parsed response
+    """
+    await _VISION_RATE_LIMITER.consume_async(_estimate_vision_request_tokens(request))
+    raw_response = await llm_client.chat.completions.with_raw_response.create(**request)
+    _VISION_RATE_LIMITER.sync_from_headers(raw_response.headers)
+    return raw_response.parse()
+
+
+def _encode_image_data_url(image_bytes: bytes) -> str:
+    """Shrink raw image bytes to fit VISION_IMAGE_MAX_SIDE and encode them as a JPEG data URL."""
+    with Image.open(BytesIO(image_bytes)) as image:
+        image.thumbnail((HandsOnConfig.VISION_IMAGE_MAX_SIDE, HandsOnConfig.VISION_IMAGE_MAX_SIDE))
+        buffer = BytesIO()
+        image.convert('RGB').save(buffer, format='JPEG', quality=HandsOnConfig.VISION_IMAGE_JPEG_QUALITY)
+    
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f"data:image/jpeg;base64,{encoded}"
+
+
+async def _vision_image_part_async(image_url: str, http_client: httpx.AsyncClient) -> Dict:
+    """
+    Build the image_url content part for a worksheet image, downscaled when possible.
+    
+    The image is fetched on the event loop, then shrunk to fit
+    HandsOnConfig.VISION_IMAGE_MAX_SIDE (never enlarged) in a worker thread so
+    Pillow doesn't stall other requests. Falls back to the original URL (which
+    OpenAI then fetches itself) if the image can't be fetched or decoded here.
+    """
+    try:
+        async with _IMAGE_BUFFER_POOL.rent_async() as buffer:
+            async with http_client.stream('GET', image_url) as response:
+                response.raise_for_status()
+                size = await fill_buffer_async(buffer, response.aiter_bytes(_IMAGE_CHUNK_BYTES))
+            url = await asyncio.to_thread(_encode_image_data_url, memoryview(buffer)[:size])
+    except (httpx.HTTPError, OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning(f"Could not downscale worksheet image, sending original URL: {e}")
+        url = image_url
+    
+    return {
+        "type": "image_url",
+        "image_url": {"url": url, "detail": HandsOnConfig.VISION_IMAGE_DETAIL}
+    }
 
 
 class ContentExtractor:
     """Extracts and analyzes content from educational resource URLs."""
     
-    def __init__(self, openai_api_key: str = None):
+    def __init__(
+        self,
+        openai_api_key: str = None,
+        activity_cache: Optional[DiskCache] = None,
+        worksheet_cache: Optional[DiskCache] = None
+    ):
         """
         Initialize the content extractor.
         
         Args:
             openai_api_key: OpenAI API key (defaults to config value)
+            activity_cache: Optional persistent cache of page -> extracted
+                activities, keyed by URL and page-content hash
+            worksheet_cache: Optional persistent cache of image URL -> worksheet
+                analysis, so re-searched images skip the vision call
         
         Raises:
             ValueError: If API key not provided
@@ -39,15 +160,23 @@ class ContentExtractor:
                 "or pass to constructor."
             )
         
-        openai.api_key = self.api_key
+        self.activity_cache = activity_cache
+        self.worksheet_cache = worksheet_cache
         logger.info("Initialized ContentExtractor")
     
-    def analyze_worksheet_image(self, image_result: Dict) -> Optional[Dict]:
+    async def analyze_worksheet_image_async(
+        self,
+        image_result: Dict,
+        http_client: httpx.AsyncClient,
+        llm_client: AsyncOpenAI
+    ) -> Optional[Dict]:
         """
         Analyze a worksheet image using GPT-4 Vision to extract educational value.
         
         Args:
             image_result: Dict containing image_url, source_url, title
+            http_client: Client used to fetch the image for downscaling
+            llm_client: Client used for the vision call
         
         Returns:
             dict: Worksheet analysis with format:
@@ -64,15 +193,6 @@ class ContentExtractor:
                     'resource_type': 'worksheet_image'
                 }
             None: If analysis fails
-        
-        Example:
-            >>> extractor = ContentExtractor()
-            >>> result = extractor.analyze_worksheet_image({
-            ...     'image_url': 'https://example.com/worksheet.jpg',
-            ...     'title': 'Math Worksheet'
-            ... })
-            >>> result['resource_type']
-            'worksheet_image'
         """
         try:
             image_url = image_result.get('image_url', '')
@@ -80,91 +200,403 @@ class ContentExtractor:
                 logger.warning("No image URL provided")
                 return None
             
-            logger.info(f"Analyzing worksheet image: {image_result.get('title', 'Unknown')[:50]}")
+            cached = self._get_cached_worksheet_analysis(image_result)
+            if cached is not None:
+                logger.info(f"Using cached worksheet analysis: {cached.get('worksheet_title', 'Unknown')}")
+                return cached
             
-            # Use GPT-4 Vision to analyze the worksheet image
-            prompt = self._get_worksheet_analysis_prompt(image_result)
+            logger.info(f"Analyzing worksheet image: {image_result.get('title', 'Unknown')[:50]}")
             
-            response = openai.chat.completions.create(
-                model="gpt-4o",  # GPT-4o has vision capabilities
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {"type": "image_url", "image_url": {"url": image_url}}
-                        ]
-                    }
-                ],
-                max_tokens=1000,
-                temperature=0.3
+            image_part = await _vision_image_part_async(image_url, http_client)
+            response = await _create_vision_completion_async(
+                self._get_worksheet_analysis_request(image_result, image_part),
+                llm_client
             )
-            
-            # Parse JSON response
-            response_text = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text.replace("```json", "").replace("```", "").strip()
-            elif response_text.startswith("```"):
-                response_text = response_text.replace("```", "").strip()
-            
-            data = json.loads(response_text)
-            
-            # Add metadata
-            data['image_url'] = image_url
-            data['source_url'] = image_result.get('source_url', '')
-            data['resource_type'] = 'worksheet_image'
-            
-            logger.info(f"Successfully analyzed worksheet: {data.get('worksheet_title', 'Unknown')}")
-            return data
+            return self._parse_worksheet_analysis(response, image_result)
         
         except Exception as e:
             logger.error(f"Error analyzing worksheet image: {e}")
             return None
     
-    def crawl_and_extract_activity(self, url: str, title: str = "") -> Optional[Dict]:
+    async def analyze_worksheet_images_batch_async(
+        self,
+        image_results: List[Dict],
+        http_client: httpx.AsyncClient,
+        llm_client: AsyncOpenAI
+    ) -> List[Optional[Dict]]:
         """
-        Crawl a single webpage and extract activity information.
+        Analyze several worksheet images with a single GPT-4 Vision request.
+        
+        All images share one instruction prompt and come back as one JSON list
+        indexed by position, so N images cost one round-trip instead of N; the
+        images are fetched concurrently on the event loop. If the batched call
+        fails or its response can't be parsed, each image is analyzed on its own
+        with analyze_worksheet_image_async(). Images already in `worksheet_cache`
+        are answered from it and left out of the request.
         
         Args:
-            url: URL to webpage
-            title: Page title (optional)
+            image_results: Dicts containing image_url, source_url, title
+                (at most HandsOnConfig.VISION_BATCH_SIZE of them)
+            http_client: Client used to fetch the images for downscaling
+            llm_client: Client used for the vision call
+        
+        Returns:
+            list: Worksheet analysis (same format as analyze_worksheet_image_async())
+                or None per input image, in input order
+        """
+        results: List[Optional[Dict]] = [None] * len(image_results)
+        batch = self._uncached_worksheet_images(image_results, results)
+        if not batch:
+            return results
+        
+        if len(batch) == 1:
+            index, image_result = batch[0]
+            results[index] = await self.analyze_worksheet_image_async(image_result, http_client, llm_client)
+            return results
+        
+        logger.info(f"Analyzing {len(batch)} worksheet images in one request")
+        images = [img for _, img in batch]
+        
+        try:
+            image_parts = await asyncio.gather(
+                *(_vision_image_part_async(img['image_url'], http_client) for img in images)
+            )
+            response = await _create_vision_completion_async(
+                self._get_batched_worksheet_analysis_request(images, image_parts),
+                llm_client
+            )
+            analyses = self._parse_batched_worksheet_analysis(response, images)
+        
+        except Exception as e:
+            logger.warning(f"Batched worksheet analysis failed, analyzing images one by one: {e}")
+            analyses = await asyncio.gather(
+                *(self.analyze_worksheet_image_async(img, http_client, llm_client) for img in images)
+            )
+        
+        self._store_worksheet_analyses(batch, analyses, results)
+        return results
+    
+    async def analyze_worksheets_async(
+        self,
+        image_results: List[Dict],
+        max_concurrency: int,
+        batch_size: int,
+        stagger_seconds: float = 0.0
+    ) -> List[Optional[Dict]]:
+        """
+        Analyze many worksheet images as concurrent batched vision requests on
+        one event loop.
+        
+        Images are split into batches of `batch_size` (one request each) with
+        at most `max_concurrency` batches in flight. Batch K starts
+        K * `stagger_seconds` after the first, so one batch's image downloads
+        overlap another's LLM wait instead of every batch moving in lockstep.
+        
+        Args:
+            image_results: Image search results (image_url, source_url, title)
+            max_concurrency: Max batches in flight at once
+            batch_size: Images per vision request
+            stagger_seconds: Delay between consecutive batch starts
+        
+        Returns:
+            list: Worksheet analysis or None per input image, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        batches = [image_results[i:i + batch_size] for i in range(0, len(image_results), batch_size)]
+        
+        async with httpx.AsyncClient(
+            timeout=10,
+            follow_redirects=True,
+            headers={'User-Agent': CRAWL_USER_AGENT}
+        ) as http_client, AsyncOpenAI(api_key=self.api_key) as llm_client:
+            
+            async def analyze_batch(position: int, batch: List[Dict]) -> List[Optional[Dict]]:
+                if position and stagger_seconds:
+                    await asyncio.sleep(position * stagger_seconds)
+                async with semaphore:
+                    return await self.analyze_worksheet_images_batch_async(batch, http_client, llm_client)
+            
+            batch_results = await asyncio.gather(
+                *(analyze_batch(position, batch) for position, batch in enumerate(batches)),
+                return_exceptions=True
+            )
+        
+        results: List[Optional[Dict]] = []
+        for batch, analyses in zip(batches, batch_results):
+            if isinstance(analyses, BaseException):
+                logger.error(f"Error analyzing worksheet images: {analyses!r}")
+                analyses = [None] * len(batch)
+            results.extend(analyses)
+        
+        return results
+    
+    def _uncached_worksheet_images(self, image_results: List[Dict], results: List[Optional[Dict]]) -> List:
+        """
+        Fill `results` from the worksheet cache and return the (index, image_result)
+        pairs that still need a vision call (images without a URL are skipped).
+        """
+        batch = [(i, img) for i, img in enumerate(image_results) if img.get('image_url')]
+        if not batch:
+            logger.warning("No image URLs provided")
+            return []
+        
+        # Answer previously analyzed images from the cache
+        misses = []
+        for index, image_result in batch:
+            cached = self._get_cached_worksheet_analysis(image_result)
+            if cached is not None:
+                results[index] = cached
+            else:
+                misses.append((index, image_result))
+        if len(misses) < len(batch):
+            logger.info(f"Using {len(batch) - len(misses)} cached worksheet analyses")
+        return misses
+    
+    def _store_worksheet_analyses(
+        self,
+        batch: List,
+        analyses: List[Optional[Dict]],
+        results: List[Optional[Dict]]
+    ) -> None:
+        """Place a batch's analyses into `results` and cache the successful ones."""
+        for (index, image_result), analysis in zip(batch, analyses):
+            results[index] = analysis
+            if analysis:
+                self._set_cached_worksheet_analysis(image_result['image_url'], analysis)
+    
+    async def crawl_activities_async(
+        self,
+        pages: List[Dict],
+        max_concurrency: int,
+        timeout_seconds: float,
+        batch_size: int = 4,
+        enough_activities: Optional[int] = None,
+        is_usable_activity: Optional[Callable[[Dict], bool]] = None
+    ) -> List:
+        """
+        Crawl many activity pages concurrently and extract their activities in
+        batched LLM calls.
+        
+        Two phases on one event loop:
+        1. Fetch every page with a shared httpx.AsyncClient (at most
+           `max_concurrency` in flight, `timeout_seconds` each).
+        2. Send the fetched pages to the LLM `batch_size` at a time, one request
+           per batch, with all batches in flight concurrently. A batch whose
+           response can't be used is retried page-by-page.
+        
+        Pages whose (URL, content hash) is already in `activity_cache` skip
+        extraction entirely; fresh extractions are written back to it.
+        
+        If `enough_activities` is set, extraction stops as soon as that many
+        usable activities (per `is_usable_activity`, default: any) have come
+        back, and the batches still in flight are cancelled.
+        
+        Args:
+            pages: Search results, each with 'url' and 'title'
+            max_concurrency: Max page fetches in flight at once
+            timeout_seconds: Timeout per page fetch and per extraction call
+            batch_size: Pages per extraction request
+            enough_activities: Stop early once this many usable activities exist
+            is_usable_activity: Cheap check deciding which activities count
         
         Returns:
-            dict: Extracted activity data with format:
+            list: One entry per page, in input order — the extracted activity
+                data, None, or the exception raised for that page (pages whose
+                batch was cancelled by an early stop come back as None).
+                Extracted data has the format:
                 {
                     'activities_found': List[Dict],
                     'source_url': str,
                     'source_title': str
                 }
-            None: If extraction fails
-        
-        Example:
-            >>> extractor = ContentExtractor()
-            >>> result = extractor.crawl_and_extract_activity(
-            ...     'https://example.com/activity',
-            ...     'Science Activity'
-            ... )
-            >>> 'activities_found' in result
-            True
         """
-        logger.info(f"Crawling activity page: {title or url}")
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        # Fetch webpage content
-        page_content = self._fetch_webpage_content(url)
-        if not page_content:
+        async with httpx.AsyncClient(
+            timeout=10,
+            follow_redirects=True,
+            headers={'User-Agent': CRAWL_USER_AGENT}
+        ) as http_client, AsyncOpenAI(api_key=self.api_key) as llm_client:
+            
+            async def fetch_one(page: Dict) -> Optional[str]:
+                async with semaphore:
+                    logger.info(f"Crawling activity page: {page.get('title') or page.get('url', '')}")
+                    return await asyncio.wait_for(
+                        self._fetch_webpage_content_async(page.get('url', ''), http_client),
+                        timeout=timeout_seconds
+                    )
+            
+            # Phase 1: fetch
+            results: List = list(await asyncio.gather(
+                *(fetch_one(page) for page in pages),
+                return_exceptions=True
+            ))
+            
+            usable_count = 0
+            fetched = []  # (index, url, title, page_content) still needing extraction
+            for i, (page, content) in enumerate(zip(pages, results)):
+                if isinstance(content, BaseException) or not content:
+                    continue
+                
+                url, title = page.get('url', ''), page.get('title', '')
+                cached = self._get_cached_activity_extraction(url, content)
+                if cached is not None:
+                    logger.info(f"Using cached activity extraction for {url}")
+                    results[i] = {'activities_found': cached, 'source_url': url, 'source_title': title}
+                    usable_count += self._count_usable_activities(results[i], is_usable_activity)
+                    continue
+                
+                fetched.append((i, url, title, content))
+                results[i] = None
+            
+            # Phase 2: batched extraction
+            batches = [fetched[i:i + batch_size] for i in range(0, len(fetched), batch_size)]
+            
+            async def extract_batch(batch: List) -> List[Optional[Dict]]:
+                return await asyncio.wait_for(
+                    self._extract_activities_batched_async(batch, llm_client),
+                    timeout=timeout_seconds
+                )
+            
+            pending = {asyncio.ensure_future(extract_batch(batch)): batch for batch in batches}
+            # From here only `pending` holds page contents, so each batch's pages
+            # can be freed as soon as that batch is handled
+            del fetched, batches
+            if enough_activities and usable_count >= enough_activities:
+                pending = self._cancel_pending_extractions(pending, usable_count)
+            
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    batch = pending.pop(task)
+                    error = task.exception()
+                    for position, (index, url, _, page_content) in enumerate(batch):
+                        page_result = error if error else task.result()[position]
+                        results[index] = page_result
+                        if isinstance(page_result, dict):
+                            self._set_cached_activity_extraction(url, page_content, page_result)
+                            usable_count += self._count_usable_activities(page_result, is_usable_activity)
+                
+                if enough_activities and usable_count >= enough_activities:
+                    pending = self._cancel_pending_extractions(pending, usable_count)
+            
+            return results
+    
+    @staticmethod
+    def _count_usable_activities(
+        page_result: Dict,
+        is_usable_activity: Optional[Callable[[Dict], bool]]
+    ) -> int:
+        """Count a page's activities that pass `is_usable_activity` (all, if None)."""
+        return sum(
+            1 for activity in page_result.get('activities_found', [])
+            if is_usable_activity is None or is_usable_activity(activity)
+        )
+    
+    @staticmethod
+    def _cancel_pending_extractions(pending: Dict, usable_count: int) -> Dict:
+        """Cancel in-flight extraction batches after an early stop; returns an empty pending map."""
+        if pending:
+            logger.info(
+                f"Have {usable_count} usable activities, "
+                f"cancelling {len(pending)} remaining extraction batch(es)"
+            )
+            for task in pending:
+                task.cancel()
+        return {}
+    
+    def _activity_cache_key(self, url: str, page_content: str) -> str:
+        """Cache key for a page's extraction: prompt version + URL + content hash."""
+        content_hash = hashlib.sha256(page_content.encode('utf-8')).hexdigest()
+        return f"activity:v{ACTIVITY_EXTRACTION_CACHE_VERSION}:{url}:{content_hash}"
+    
+    def _get_cached_activity_extraction(self, url: str, page_content: str) -> Optional[List[Dict]]:
+        """Previously extracted activities for this exact page content, if cached."""
+        if self.activity_cache is None:
+            return None
+        return self.activity_cache.get(self._activity_cache_key(url, page_content))
+    
+    def _set_cached_activity_extraction(self, url: str, page_content: str, page_result: Dict) -> None:
+        """Persist a page's extracted activities (pages with none aren't cached)."""
+        if self.activity_cache is None or not page_result.get('activities_found'):
+            return
+        self.activity_cache.set(
+            self._activity_cache_key(url, page_content),
+            page_result['activities_found']
+        )
+    
+    def _worksheet_cache_key(self, image_url: str) -> str:
+        """Cache key for an image's analysis: prompt version + model/detail + URL hash."""
+        url_hash = hashlib.sha256(image_url.encode('utf-8')).hexdigest()
+        return (
+            f"worksheet:v{WORKSHEET_ANALYSIS_CACHE_VERSION}:"
+            f"{WORKSHEET_VISION_MODEL}:{HandsOnConfig.VISION_IMAGE_DETAIL}:{url_hash}"
+        )
+    
+    def _get_cached_worksheet_analysis(self, image_result: Dict) -> Optional[Dict]:
+        """Previously stored analysis of this image URL, re-attributed to this search result."""
+        if self.worksheet_cache is None:
+            return None
+        cached = self.worksheet_cache.get(self._worksheet_cache_key(image_result['image_url']))
+        if cached is None:
             return None
+        # The same image can turn up on a different page
+        cached['source_url'] = image_result.get('source_url', '')
+        return cached
+    
+    def _set_cached_worksheet_analysis(self, image_url: str, analysis: Dict) -> None:
+        """Persist a successful worksheet analysis (failures aren't cached)."""
+        if self.worksheet_cache is None:
+            return
+        self.worksheet_cache.set(self._worksheet_cache_key(image_url), analysis)
+    
+    async def _extract_activities_batched_async(
+        self,
+        batch: List,
+        llm_client: AsyncOpenAI
+    ) -> List[Optional[Dict]]:
+        """
+        Extract activities from several fetched pages with a single LLM request.
+        
+        Falls back to one request per page if the batched response can't be
+        parsed, so one bad page doesn't lose the whole batch.
+        
+        Args:
+            batch: List of (index, url, title, page_content) tuples
+            llm_client: Shared async OpenAI client
+        
+        Returns:
+            list: Extracted activity data (see crawl_activities_async()) or None
+                per page, in batch order
+        """
+        if len(batch) > 1:
+            try:
+                logger.debug(f"Extracting activities from {len(batch)} pages in one request")
+                response = await llm_client.chat.completions.create(
+                    **self._get_batched_activity_extraction_request(batch)
+                )
+                return self._parse_batched_activity_extraction(response, batch)
+            
+            except Exception as e:
+                logger.warning(f"Batched activity extraction failed, retrying per page: {e}")
         
-        # Extract activity ideas from this page
-        return self._extract_activity_from_page(url, page_content, title)
+        return list(await asyncio.gather(*(
+            self._extract_activity_from_page_async(url, page_content, title, llm_client)
+            for _, url, title, page_content in batch
+        )))
     
-    def _fetch_webpage_content(self, url: str) -> Optional[str]:
+    async def _fetch_webpage_content_async(
+        self,
+        url: str,
+        http_client: httpx.AsyncClient
+    ) -> Optional[str]:
         """
         Fetch and extract text from a webpage URL.
         
         Args:
             url: URL to webpage
+            http_client: Shared async HTTP client
         
         Returns:
             str: Extracted text content
@@ -173,19 +605,10 @@ class ContentExtractor:
         try:
             logger.debug(f"Fetching content from: {url}")
             
-            response = requests.get(url, timeout=10, headers={
-                'User-Agent': 'Mozilla/5.0 (Educational Resource Bot)'
-            })
+            response = await http_client.get(url)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header", "aside"]):
-                script.decompose()
-            
-            # Get text
-            text = soup.get_text(separator='\n', strip=True)
+            text = self._html_to_text(response.content)
             
             logger.debug(f"Extracted {len(text)} characters from {url}")
             return text
@@ -194,7 +617,33 @@ class ContentExtractor:
             logger.error(f"Error fetching {url}: {e}")
             return None
     
-    def _extract_activity_from_page(self, url: str, page_content: str, title: str) -> Optional[Dict]:
+    @staticmethod
+    def _html_to_text(html: bytes) -> str:
+        """
+        Strip page chrome (scripts, nav, footers, ...) and return visible text.
+        
+        Args:
+            html: Raw HTML body
+        
+        Returns:
+            str: Newline-separated page text
+        """
+        tree = LexborHTMLParser(html)
+        
+        # Remove script and style elements
+        tree.strip_tags(["script", "style", "nav", "footer", "header", "aside"])
+        
+        # Whitespace-only text nodes come back as empty lines — drop them
+        text = tree.root.text(separator='\n', strip=True) if tree.root else ""
+        return '\n'.join(line for line in text.split('\n') if line)
+    
+    async def _extract_activity_from_page_async(
+        self,
+        url: str,
+        page_content: str,
+        title: str,
+        llm_client: AsyncOpenAI
+    ) -> Optional[Dict]:
         """
         Extract activity information from a webpage using LLM.
         
@@ -202,16 +651,41 @@ class ContentExtractor:
             url: Source URL
             page_content: Extracted text from page
             title: Page title
+            llm_client: Shared async OpenAI client
         
         Returns:
-            dict: Extracted activity data
+            dict: Extracted activity data (see crawl_activities_async())
             None: If extraction fails
         """
         try:
-            # Limit content to avoid token limits
-            content_preview = page_content[:4000]
+            logger.debug(f"Extracting activities from {url}")
             
-            prompt = f"""Extract activity information from this educational webpage.
+            response = await llm_client.chat.completions.create(
+                **self._get_activity_extraction_request(url, page_content, title)
+            )
+            
+            return self._parse_activity_extraction(response, url, title)
+        
+        except Exception as e:
+            logger.error(f"Error extracting activities from page: {e}")
+            return None
+    
+    def _get_activity_extraction_request(self, url: str, page_content: str, title: str) -> Dict:
+        """
+        Build chat-completion parameters for extracting activities from a page.
+        
+        Args:
+            url: Source URL
+            page_content: Extracted text from page
+            title: Page title
+        
+        Returns:
+            dict: Keyword arguments for chat.completions.create()
+        """
+        # Limit content to avoid token limits
+        content_preview = page_content[:4000]
+        
+        prompt = f"""Extract activity information from this educational webpage.
 
 URL: {url}
 Title: {title}
@@ -237,42 +711,318 @@ Extract and return JSON:
 
 Return ONLY valid JSON with all activities found on this page.
 """
-            
-            logger.debug(f"Extracting activities from {url}")
-            
-            response = openai.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at extracting educational activity information from webpages."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=1500
+        
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert at extracting educational activity information from webpages."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 1500
+        }
+    
+    def _parse_activity_extraction(self, response, url: str, title: str) -> Dict:
+        """
+        Parse an activity-extraction completion into the crawl result format.
+        
+        Args:
+            response: Chat completion response
+            url: Source URL
+            title: Page title
+        
+        Returns:
+            dict: Extracted activity data with source metadata
+        
+        Raises:
+            json.JSONDecodeError: If the response is not valid JSON
+        """
+        response_text = response.choices[0].message.content.strip()
+        
+        # Remove markdown
+        if response_text.startswith("```json"):
+            response_text = response_text.replace("```json", "").replace("```", "").strip()
+        elif response_text.startswith("```"):
+            response_text = response_text.replace("```", "").strip()
+        
+        data = orjson.loads(response_text)
+        data['source_url'] = url
+        data['source_title'] = title
+        
+        num_activities = len(data.get('activities_found', []))
+        logger.info(f"Extracted {num_activities} activities from {url}")
+        
+        return data
+    
+    def _get_batched_activity_extraction_request(self, batch: List) -> Dict:
+        """
+        Build chat-completion parameters for extracting activities from several
+        pages in one request.
+        
+        Args:
+            batch: List of (index, url, title, page_content) tuples
+        
+        Returns:
+            dict: Keyword arguments for chat.completions.create()
+        """
+        page_blocks = []
+        for page_index, (_, url, title, page_content) in enumerate(batch):
+            page_blocks.append(
+                f"=== PAGE {page_index} ===\n"
+                f"URL: {url}\n"
+                f"Title: {title}\n\n"
+                f"Content:\n{page_content[:4000]}"
             )
+        pages_text = "\n\n".join(page_blocks)
+        
+        prompt = f"""Extract activity information from each of these {len(batch)} educational webpages.
+
+{pages_text}
+
+Extract and return JSON with one entry per page, using that page's number as page_index:
+{{
+    "pages": [
+        {{
+            "page_index": 0,
+            "activities_found": [
+                {{
+                    "name": "Activity name",
+                    "type": "discussion/hands-on/project/game/etc",
+                    "description": "What students do",
+                    "materials": ["list", "of", "materials"],
+                    "steps": ["step 1", "step 2", ...],
+                    "duration": "estimated time",
+                    "grade_level": "target grade",
+                    "learning_objectives": ["what students learn"]
+                }}
+            ]
+        }}
+    ]
+}}
+
+Only include activities actually described on that page. Return ONLY valid JSON.
+"""
+        
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert at extracting educational activity information from webpages."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 1500 * len(batch),
+            "response_format": {"type": "json_object"}
+        }
+    
+    def _parse_batched_activity_extraction(self, response, batch: List) -> List[Dict]:
+        """
+        Fan a batched extraction response back out to per-page results.
+        
+        Args:
+            response: Chat completion response
+            batch: The (index, url, title, page_content) tuples that were sent
+        
+        Returns:
+            list: One crawl result dict per page, in batch order (pages the
+                model skipped get an empty activities_found)
+        
+        Raises:
+            json.JSONDecodeError: If the response is not valid JSON
+            ValueError: If the response has no 'pages' list
+        """
+        data = orjson.loads(response.choices[0].message.content)
+        entries = data.get('pages')
+        if not isinstance(entries, list):
+            raise ValueError("Batched extraction response missing 'pages' list")
+        
+        activities_by_page = {}
+        for entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get('page_index'), int):
+                activities_by_page[entry['page_index']] = entry.get('activities_found') or []
+        
+        results = []
+        for page_index, (_, url, title, _) in enumerate(batch):
+            activities = activities_by_page.get(page_index, [])
+            logger.info(f"Extracted {len(activities)} activities from {url}")
+            results.append({
+                'activities_found': activities,
+                'source_url': url,
+                'source_title': title
+            })
+        
+        return results
+    
+    def _get_worksheet_analysis_request(self, image_result: Dict, image_part: Dict) -> Dict:
+        """
+        Build chat-completion parameters for analyzing one worksheet image.
+        
+        Args:
+            image_result: Image metadata dict (image_url, source_url, title)
+            image_part: The image's content part (see _vision_image_part_async())
+        
+        Returns:
+            dict: Keyword arguments for chat.completions.create()
+        """
+        return {
+            "model": WORKSHEET_VISION_MODEL,  # GPT-4o has vision capabilities
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": self._get_worksheet_analysis_prompt(image_result)},
+                        image_part
+                    ]
+                }
+            ],
+            "max_tokens": 1000,
+            "temperature": 0.3
+        }
+    
+    def _parse_worksheet_analysis(self, response, image_result: Dict) -> Dict:
+        """
+        Parse a single-image analysis response, add metadata and cache it.
+        
+        Args:
+            response: Chat completion response
+            image_result: The image metadata dict that was sent
+        
+        Returns:
+            dict: Worksheet analysis (see analyze_worksheet_image_async())
+        
+        Raises:
+            json.JSONDecodeError: If the response is not valid JSON
+        """
+        response_text = response.choices[0].message.content.strip()
+        
+        # Remove markdown code blocks if present
+        if response_text.startswith("```json"):
+            response_text = response_text.replace("```json", "").replace("```", "").strip()
+        elif response_text.startswith("```"):
+            response_text = response_text.replace("```", "").strip()
+        
+        data = orjson.loads(response_text)
+        
+        # Add metadata
+        data['image_url'] = image_result['image_url']
+        data['source_url'] = image_result.get('source_url', '')
+        data['resource_type'] = 'worksheet_image'
+        self._set_cached_worksheet_analysis(data['image_url'], data)
+        
+        logger.info(f"Successfully analyzed worksheet: {data.get('worksheet_title', 'Unknown')}")
+        return data
+    
+    def _get_batched_worksheet_analysis_request(
+        self,
+        image_results: List[Dict],
+        image_parts: List[Dict]
+    ) -> Dict:
+        """
+        Build chat-completion parameters for analyzing several worksheet images
+        in one vision request.
+        
+        Args:
+            image_results: Image metadata dicts (each with an image_url)
+            image_parts: Image content parts, one per image (see _vision_image_part_async())
+        
+        Returns:
+            dict: Keyword arguments for chat.completions.create()
+        """
+        prompt = f"""Analyze each of these {len(image_results)} worksheet images and extract educational details.
+Each image is preceded by its index, title and source.
+
+Return JSON with one entry per image, using that image's index:
+{{
+    "worksheets": [
+        {{
+            "index": 0,
+            "worksheet_title": "descriptive title of the worksheet",
+            "grade_level": "estimated grade level (e.g., 'grade 3-4', 'elementary')",
+            "topics_covered": ["topic1", "topic2", "topic3"],
+            "visual_quality": 0-10,
+            "educational_value": 0-10,
+            "is_age_appropriate": true/false,
+            "has_images_or_art": true/false,
+            "description": "brief description of what the worksheet teaches"
+        }}
+    ]
+}}
+
+Scoring guidelines:
+- visual_quality: clarity, layout, professional appearance
+- educational_value: pedagogical merit, learning potential
+- is_age_appropriate: suitable for elementary students
+
+Evaluate each image independently. Return ONLY valid JSON.
+"""
+        content = [{"type": "text", "text": prompt}]
+        for index, (image_result, image_part) in enumerate(zip(image_results, image_parts)):
+            content.append({
+                "type": "text",
+                "text": (
+                    f"=== IMAGE {index} ===\n"
+                    f"Image Title: {image_result.get('title', 'Unknown')}\n"
+                    f"Source: {image_result.get('source_url', 'Unknown')}"
+                )
+            })
+            content.append(image_part)
+        
+        return {
+            "model": WORKSHEET_VISION_MODEL,  # GPT-4o has vision capabilities
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": 600 * len(image_results),
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}
+        }
+    
+    def _parse_batched_worksheet_analysis(self, response, image_results: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Fan a batched worksheet analysis response back out to per-image results.
+        
+        Args:
+            response: Chat completion response
+            image_results: The image metadata dicts that were sent, in order
+        
+        Returns:
+            list: Worksheet analysis or None (image skipped by the model) per
+                image, in input order
+        
+        Raises:
+            json.JSONDecodeError: If the response is not valid JSON
+            ValueError: If the response has no 'worksheets' list
+        """
+        data = orjson.loads(response.choices[0].message.content)
+        entries = data.get('worksheets')
+        if not isinstance(entries, list):
+            raise ValueError("Batched worksheet analysis response missing 'worksheets' list")
+        
+        analyses_by_index = {}
+        for entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get('index'), int):
+                analyses_by_index[entry.pop('index')] = entry
+        
+        results = []
+        for index, image_result in enumerate(image_results):
+            data = analyses_by_index.get(index)
+            if data is None:
+                logger.warning(f"No analysis returned for worksheet image {index}")
+                results.append(None)
+                continue
             
-            response_text = response.choices[0].message.content.strip()
-            
-            # Remove markdown
-            if response_text.startswith("```json"):
-                response_text = response_text.replace("```json", "").replace("```", "").strip()
-            elif response_text.startswith("```"):
-                response_text = response_text.replace("```", "").strip()
-            
-            data = json.loads(response_text)
-            data['source_url'] = url
-            data['source_title'] = title
-            
-            num_activities = len(data.get('activities_found', []))
-            logger.info(f"Extracted {num_activities} activities from {url}")
+            # Add metadata
+            data['image_url'] = image_result['image_url']
+            data['source_url'] = image_result.get('source_url', '')
+            data['resource_type'] = 'worksheet_image'
             
-            return data
+            logger.info(f"Successfully analyzed worksheet: {data.get('worksheet_title', 'Unknown')}")
+            results.append(data)
         
-        except Exception as e:
-            logger.error(f"Error extracting activities from page: {e}")
-            return None
+        return results
     
     def _get_worksheet_analysis_prompt(self, image_result: Dict) -> str:
         """
@@ -0,0 +1,202 @@
+"""
+Persistent key/value cache backed by a local SQLite file
+Used to skip repeat LLM work across runs (e.g. activity extraction per crawled page)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Expired rows are deleted when the cache opens and then at most this often (on writes)
+_PURGE_INTERVAL_SECONDS = 3600
+
+
+class DiskCache:
+    """
+    JSON-serializable values stored in one SQLite table with optional per-entry expiry.
+
+    Safe to share across threads (one connection guarded by a lock) and across
+    worker processes (WAL mode). Expired rows are purged when the cache opens and
+    every _PURGE_INTERVAL_SECONDS after that, so the file doesn't grow without
+    bound. Any SQLite error is logged and treated as a cache miss, so a broken
+    cache never breaks the pipeline using it.
+    """
+
+    def __init__(self, path: str, default_ttl_seconds: Optional[float] = None):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path: SQLite file path; parent directories are created if needed
+            default_ttl_seconds: Expiry applied by set() when none is given
+                (None = never expires)
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        self.path = path
+        self.default_ttl_seconds = default_ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._next_purge = 0.0
+        with self._lock:
+            self._purge_expired()
+        logger.info(f"Opened disk cache: {path}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+            default: Returned on a miss or an expired entry
+
+        Returns:
+            The cached value, or `default`
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+
+                if row is None:
+                    return default
+
+                value, expires_at = row
+                if expires_at is not None and expires_at < time.time():
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    return default
+
+            return json.loads(value)
+
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Disk cache read failed for {key!r}: {e}")
+            return default
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value, replacing any existing entry for the key.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl_seconds: Expiry for this entry (defaults to default_ttl_seconds)
+        """
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        try:
+            payload = json.dumps(value)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, payload, expires_at)
+                )
+                self._purge_expired()
+
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache write failed for {key!r}: {e}")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Look up several keys in one pass (one query per 500 keys).
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            dict: key -> cached value, for the keys that hit (misses and
+                expired entries are simply absent)
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        now = time.time()
+
+        try:
+            with self._lock:
+                rows: List[Tuple[str, str, Optional[float]]] = []
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    rows.extend(self._conn.execute(
+                        f"SELECT key, value, expires_at FROM cache WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall())
+
+            for key, value, expires_at in rows:
+                if expires_at is not None and expires_at < now:
+                    continue  # deleted by the next purge
+                try:
+                    found[key] = json.loads(value)
+                except ValueError as e:
+                    logger.warning(f"Disk cache read failed for {key!r}: {e}")
+
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache read failed for {len(keys)} keys: {e}")
+
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store several values in one transaction.
+
+        Args:
+            items: key -> JSON-serializable value
+            ttl_seconds: Expiry for these entries (defaults to default_ttl_seconds)
+        """
+        if not items:
+            return
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        try:
+            rows = [(key, json.dumps(value), expires_at) for key, value in items.items()]
+            with self._lock:
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                        rows
+                    )
+                self._purge_expired()
+
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache write failed for {len(items)} keys: {e}")
+
+    def _purge_expired(self) -> None:
+        """Delete expired rows if _PURGE_INTERVAL_SECONDS have passed (caller holds the lock)."""
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + _PURGE_INTERVAL_SECONDS
+
+        try:
+            deleted = self._conn.execute(
+                "DELETE FROM cache WHERE expires_at < ?", (now,)
+            ).rowcount
+            if deleted:
+                logger.info(f"Purged {deleted} expired entries from disk cache: {self.path}")
+
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache purge failed: {e}")
+
+    def clear(self) -> None:
+        """Remove every entry (e.g. to invalidate after an upstream data change)."""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache")
+            logger.info(f"Cleared disk cache: {self.path}")
+
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache clear failed: {e}")
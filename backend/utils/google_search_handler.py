@@ -3,6 +3,7 @@ Google Custom Search API handler for finding worksheets and activities
 """
 
 import logging
+import threading
 from typing import List, Dict
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
@@ -36,9 +37,20 @@ class GoogleSearchHandler:
                 "environment variables or pass them to constructor."
             )
         
-        self.service = build("customsearch", "v1", developerKey=self.api_key)
+        # googleapiclient services wrap a non-thread-safe httplib2 transport, so a
+        # shared handler keeps one service per thread rather than one per instance.
+        self._local = threading.local()
         logger.info("Initialized Google Custom Search handler")
     
+    @property
+    def service(self):
+        """Custom Search service for the calling thread (built on first use)."""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build("customsearch", "v1", developerKey=self.api_key)
+            self._local.service = service
+        return service
+    
     def search_worksheets(self, query: str, num_results: int = 10) -> List[Dict]:
         """
         Search for worksheet IMAGES (visual worksheets, printables).
@@ -56,6 +68,10 @@ class GoogleSearchHandler:
                     'image_url': str,
                     'source_url': str,
                     'thumbnail_url': str,
+                    'display_link': str,
+                    'mime': str,
+                    'width': int,
+                    'height': int,
                     'type': 'image'
                 }, ...]
         
@@ -190,12 +206,17 @@ class GoogleSearchHandler:
             return results
         
         for item in api_response['items']:
+            image = item.get('image', {})
             result = {
                 'title': item.get('title', ''),
                 'snippet': item.get('snippet', ''),
                 'image_url': item.get('link', ''),  # Direct link to image
-                'source_url': item.get('image', {}).get('contextLink', ''),  # Page where image appears
-                'thumbnail_url': item.get('image', {}).get('thumbnailLink', ''),
+                'source_url': image.get('contextLink', ''),  # Page where image appears
+                'thumbnail_url': image.get('thumbnailLink', ''),
+                'display_link': item.get('displayLink', ''),  # Host of the source page
+                'mime': item.get('mime', ''),
+                'width': image.get('width', 0),
+                'height': image.get('height', 0),
                 'type': 'image'
             }
             results.append(result)
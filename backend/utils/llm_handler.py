@@ -5,8 +5,11 @@ Consolidates all LLM interactions across all three phases
 
 import json
 import logging
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+
+import orjson
 from openai import (
+    AsyncOpenAI,
     OpenAI,
     APIConnectionError,
     APIStatusError,
@@ -19,8 +22,9 @@ from config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
+# Initialize OpenAI clients (the async one serves acall_openai on the app's event loop)
 client = OpenAI(api_key=OPENAI_API_KEY)
+async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
 
 class OpenAIServiceError(Exception):
@@ -36,7 +40,9 @@ def call_openai(
     temperature: float = OPENAI_TEMPERATURE,
     max_tokens: Optional[int] = None,
     json_mode: bool = True,
-    images: Optional[List[str]] = None
+    images: Optional[List[str]] = None,
+    prompt_cache_key: Optional[str] = None,
+    model: Optional[str] = None
 ) -> Dict:
     """
     Call OpenAI API and return parsed JSON response.
@@ -50,6 +56,10 @@ def call_openai(
         temperature: Sampling temperature (0.0 to 2.0)
         max_tokens: Maximum tokens in response (None for model default)
         json_mode: Force JSON output format (default True)
+        images: Optional list of image data URLs for vision requests
+        prompt_cache_key: Optional key grouping requests that share a long static
+            prompt prefix, so OpenAI routes them to the same prompt cache
+        model: Chat model to use (default: OPENAI_MODEL)
     
     Returns:
         dict: Parsed JSON response from the LLM
@@ -65,72 +75,84 @@ def call_openai(
         ... )
         >>> print(response['course_title'])
     """
+    params = _build_chat_params(
+        prompt, system_message, temperature, max_tokens, json_mode, images, prompt_cache_key, model
+    )
+    response_text = None
+    
     try:
-        # Build API call parameters
-        # If images are provided, use multi-modal content for vision
-        if images:
-            user_content = [{"type": "text", "text": prompt}]
-            for img_data_url in images:
-                user_content.append({
-                    "type": "image_url",
-                    "image_url": {"url": img_data_url, "detail": "high"}
-                })
-            user_message = {"role": "user", "content": user_content}
-        else:
-            user_message = {"role": "user", "content": prompt}
-
-        params = {
-            "model": OPENAI_MODEL,
-            "messages": [
-                {"role": "system", "content": system_message},
-                user_message
-            ],
-            "temperature": temperature,
-        }
-        
-        # Add optional parameters
-        if max_tokens:
-            params["max_tokens"] = max_tokens
-        
-        if json_mode:
-            params["response_format"] = {"type": "json_object"}
-        
         # Call OpenAI API
-        logger.info(f"Calling OpenAI API with model: {OPENAI_MODEL}")
+        logger.info(f"Calling OpenAI API with model: {params['model']}")
         try:
             response = client.chat.completions.create(**params)
-        except RateLimitError as e:
-            logger.error(f"OpenAI quota/rate limit exceeded: {e}")
-            raise OpenAIServiceError(
-                "The AI service is temporarily unavailable (quota exceeded). "
-                "Please try again later."
-            ) from e
-        except AuthenticationError as e:
-            logger.error(f"OpenAI authentication failed: {e}")
-            raise OpenAIServiceError(
-                "The AI service is misconfigured. Please contact support."
-            ) from e
-        except APIConnectionError as e:
-            logger.error(f"OpenAI API connection error: {e}")
-            raise OpenAIServiceError(
-                "Could not reach the AI service. Please try again in a moment."
-            ) from e
-        except APIStatusError as e:
-            logger.error(f"OpenAI API error ({e.status_code}): {e}")
-            raise OpenAIServiceError(
-                "The AI service returned an error. Please try again."
-            ) from e
+        except (APIStatusError, APIConnectionError) as e:
+            _raise_service_error(e)
 
         # Extract response text
         response_text = response.choices[0].message.content
-        
-        # Parse JSON if in JSON mode
-        if json_mode:
-            parsed_response = json.loads(response_text)
-            logger.info("Successfully parsed JSON response from OpenAI")
-            return parsed_response
-        else:
-            return {"response": response_text}
+        return _parse_chat_response(response_text, json_mode)
+    
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse JSON response from OpenAI: {e}")
+        logger.error(f"Raw response (first 500 chars): {response_text[:500]}")
+        raise
+    
+    except Exception as e:
+        logger.error(f"Error calling OpenAI API: {e}")
+        raise
+
+
+async def acall_openai(
+    prompt: str,
+    system_message: str = "You are a helpful assistant.",
+    temperature: float = OPENAI_TEMPERATURE,
+    max_tokens: Optional[int] = None,
+    json_mode: bool = True,
+    images: Optional[List[str]] = None,
+    llm_client: Optional[AsyncOpenAI] = None,
+    on_text: Optional[Callable[[str], None]] = None,
+    prompt_cache_key: Optional[str] = None,
+    model: Optional[str] = None
+) -> Dict:
+    """
+    Async counterpart of call_openai(): same request, errors and return value,
+    but the event loop keeps running while the model works, so many calls can
+    be awaited together (bounded by the caller, e.g. with a Semaphore).
+    
+    Args:
+        prompt, system_message, temperature, max_tokens, json_mode, images, prompt_cache_key, model:
+            As for call_openai()
+        llm_client: AsyncOpenAI client to use (default: the shared async client).
+            Pass one created inside asyncio.run() when calling from a short-lived
+            event loop, since a client's connections belong to the loop that opened them.
+        on_text: If given, the completion is streamed and each text delta is passed
+            to it as it arrives. An exception raised by on_text closes the stream
+            (stopping generation) and propagates to the caller.
+    
+    Returns:
+        dict: Parsed JSON response from the LLM
+    
+    Raises:
+        json.JSONDecodeError: If response is not valid JSON
+        OpenAIServiceError: If the OpenAI API itself fails
+    """
+    params = _build_chat_params(
+        prompt, system_message, temperature, max_tokens, json_mode, images, prompt_cache_key, model
+    )
+    response_text = None
+    
+    try:
+        logger.info(f"Calling OpenAI API (async) with model: {params['model']}")
+        try:
+            if on_text is None:
+                response = await (llm_client or async_client).chat.completions.create(**params)
+                response_text = response.choices[0].message.content
+            else:
+                response_text = await _stream_chat_text(llm_client or async_client, params, on_text)
+        except (APIStatusError, APIConnectionError) as e:
+            _raise_service_error(e)
+
+        return _parse_chat_response(response_text, json_mode)
     
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON response from OpenAI: {e}")
@@ -142,6 +164,124 @@ def call_openai(
         raise
 
 
+def _build_chat_params(
+    prompt: str,
+    system_message: str,
+    temperature: float,
+    max_tokens: Optional[int],
+    json_mode: bool,
+    images: Optional[List[str]],
+    prompt_cache_key: Optional[str] = None,
+    model: Optional[str] = None
+) -> Dict:
+    """Chat completion parameters shared by call_openai() and acall_openai()."""
+    # If images are provided, use multi-modal content for vision
+    if images:
+        user_content = [{"type": "text", "text": prompt}]
+        for img_data_url in images:
+            user_content.append({
+                "type": "image_url",
+                "image_url": {"url": img_data_url, "detail": "high"}
+            })
+        user_message = {"role": "user", "content": user_content}
+    else:
+        user_message = {"role": "user", "content": prompt}
+
+    params = {
+        "model": model or OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": system_message},
+            user_message
+        ],
+        "temperature": temperature,
+    }
+    
+    # Add optional parameters
+    if max_tokens:
+        params["max_tokens"] = max_tokens
+    
+    if json_mode:
+        params["response_format"] = {"type": "json_object"}
+    
+    # Routes requests that share a long static prefix to the same prompt cache
+    if prompt_cache_key:
+        params["prompt_cache_key"] = prompt_cache_key
+    
+    return params
+
+
+async def _stream_chat_text(
+    llm_client: AsyncOpenAI,
+    params: Dict,
+    on_text: Callable[[str], None]
+) -> str:
+    """Stream a chat completion, handing each text delta to on_text; returns the full text."""
+    parts = []
+    stream = await llm_client.chat.completions.create(**params, stream=True)
+    async with stream:  # closed (generation stopped) if on_text raises
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                on_text(delta)
+    return "".join(parts)
+
+
+def _raise_service_error(e: Exception) -> None:
+    """Log an OpenAI API failure and re-raise it as a user-safe OpenAIServiceError."""
+    if isinstance(e, RateLimitError):
+        logger.error(f"OpenAI quota/rate limit exceeded: {e}")
+        raise OpenAIServiceError(
+            "The AI service is temporarily unavailable (quota exceeded). "
+            "Please try again later."
+        ) from e
+    if isinstance(e, AuthenticationError):
+        logger.error(f"OpenAI authentication failed: {e}")
+        raise OpenAIServiceError(
+            "The AI service is misconfigured. Please contact support."
+        ) from e
+    if isinstance(e, APIConnectionError):
+        logger.error(f"OpenAI API connection error: {e}")
+        raise OpenAIServiceError(
+            "Could not reach the AI service. Please try again in a moment."
+        ) from e
+    logger.error(f"OpenAI API error ({e.status_code}): {e}")
+    raise OpenAIServiceError(
+        "The AI service returned an error. Please try again."
+    ) from e
+
+
+def _parse_chat_response(response_text: str, json_mode: bool) -> Dict:
+    """Parse a completion's text the way call_openai() returns it."""
+    # Parse JSON if in JSON mode
+    if json_mode:
+        parsed_response = orjson.loads(response_text)  # raises a json.JSONDecodeError subclass
+        logger.info("Successfully parsed JSON response from OpenAI")
+        return parsed_response
+    else:
+        return {"response": response_text}
+
+
+def embed_text(text: str, model: str) -> List[float]:
+    """
+    Embed a piece of text with the OpenAI embeddings API.
+    
+    Args:
+        text: Text to embed
+        model: Embedding model (e.g. "text-embedding-3-small")
+    
+    Returns:
+        list: The embedding vector
+    
+    Raises:
+        Exception: If the OpenAI API call fails
+    """
+    response = client.embeddings.create(model=model, input=text)
+    return response.data[0].embedding
+
+
 def validate_json_response(
     data: Dict,
     required_fields: list,
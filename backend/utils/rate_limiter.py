@@ -0,0 +1,160 @@
+"""
+Client-side token bucket for OpenAI requests/tokens-per-minute limits
+Shapes traffic before a call is sent instead of waiting out 429 back-offs
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Mapping, Optional
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Paired request and token budgets that refill continuously up to a per-minute cap.
+
+    consume() blocks the calling thread until both budgets can cover the call,
+    then spends them; consume_async() does the same from a coroutine. Safe to
+    share across threads and event loops (one lock guards the state); waiting
+    happens outside the lock so other callers aren't held up.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        """
+        Create a full bucket.
+
+        Args:
+            requests_per_minute: Request budget (RPM limit to stay under)
+            tokens_per_minute: Token budget (TPM limit to stay under)
+        """
+        self.requests_per_minute = float(requests_per_minute)
+        self.tokens_per_minute = float(tokens_per_minute)
+
+        self._available_requests = self.requests_per_minute
+        self._available_tokens = self.tokens_per_minute
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, tokens: int) -> float:
+        """
+        Wait until one request and `tokens` tokens are available, then spend them.
+
+        A call estimated above the whole per-minute token budget is capped at it,
+        so it waits for a full bucket rather than forever.
+
+        Args:
+            tokens: Estimated tokens for the call (prompt + max completion)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        tokens = min(float(tokens), self.tokens_per_minute)
+        waited = 0.0
+
+        while True:
+            delay = self._try_acquire(tokens)
+            if not delay:
+                break
+            time.sleep(delay)
+            waited += delay
+
+        if waited:
+            logger.debug(f"Rate limiter held a call for {waited:.2f}s")
+        return waited
+
+    async def consume_async(self, tokens: int) -> float:
+        """
+        Like consume(), but waits with asyncio.sleep() so the event loop keeps running.
+
+        Args:
+            tokens: Estimated tokens for the call (prompt + max completion)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        tokens = min(float(tokens), self.tokens_per_minute)
+        waited = 0.0
+
+        while True:
+            delay = self._try_acquire(tokens)
+            if not delay:
+                break
+            await asyncio.sleep(delay)
+            waited += delay
+
+        if waited:
+            logger.debug(f"Rate limiter held a call for {waited:.2f}s")
+        return waited
+
+    def sync_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        Lower the local budgets to what the API reports as remaining.
+
+        Other processes sharing the API key spend the same limits, so the
+        server's x-ratelimit-remaining-* headers are the better estimate. Only
+        ever lowers the budgets; refill does the rest.
+
+        Args:
+            headers: Response headers of an OpenAI call (missing/garbled values ignored)
+        """
+        if not headers:
+            return
+
+        remaining_requests = _header_number(headers, 'x-ratelimit-remaining-requests')
+        remaining_tokens = _header_number(headers, 'x-ratelimit-remaining-tokens')
+
+        with self._lock:
+            self._refill()
+            if remaining_requests is not None:
+                self._available_requests = min(self._available_requests, remaining_requests)
+            if remaining_tokens is not None:
+                self._available_tokens = min(self._available_tokens, remaining_tokens)
+
+    def _try_acquire(self, tokens: float) -> float:
+        """
+        Spend one request and `tokens` tokens if both are available.
+
+        Returns:
+            float: 0 if spent, else seconds until both budgets should have refilled enough
+        """
+        with self._lock:
+            self._refill()
+            if self._available_requests >= 1 and self._available_tokens >= tokens:
+                self._available_requests -= 1
+                self._available_tokens -= tokens
+                return 0.0
+            return max(
+                (1 - self._available_requests) * 60.0 / self.requests_per_minute,
+                (tokens - self._available_tokens) * 60.0 / self.tokens_per_minute,
+                0.01
+            )
+
+    def _refill(self) -> None:
+        """Top up both budgets for the time since the last refill (caller holds the lock)."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        self._available_requests = min(
+            self.requests_per_minute,
+            self._available_requests + elapsed * self.requests_per_minute / 60.0
+        )
+        self._available_tokens = min(
+            self.tokens_per_minute,
+            self._available_tokens + elapsed * self.tokens_per_minute / 60.0
+        )
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    """Numeric value of a rate-limit header, or None if absent/unparseable."""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
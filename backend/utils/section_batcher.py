@@ -0,0 +1,84 @@
+"""
+Continuous batching for independent per-section async work (LLM calls, searches)
+Keeps a fixed number of items in flight and hands back each result as soon as it lands
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+
+class SectionBatcher:
+    """
+    Runs `worker` over a stream of items with at most `max_inflight` in flight.
+
+    A fixed pool of worker tasks pulls items from a queue, so a slot freed by a
+    short item is refilled right away instead of waiting on the slowest one.
+    Results come back in completion order.
+    """
+
+    def __init__(self, worker: Callable[[Any], Awaitable[Any]], max_inflight: int):
+        """
+        Create an idle batcher.
+
+        Args:
+            worker: Coroutine function called once per item
+            max_inflight: Maximum items being worked on at once
+        """
+        self.worker = worker
+        self.max_inflight = max(1, max_inflight)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._results: Optional[asyncio.Queue] = None
+
+    async def run(self, items: Iterable[Any]) -> AsyncIterator[Tuple[Any, Any]]:
+        """
+        Work through `items`, yielding as each finishes.
+
+        Stops once every item has been yielded. Leaving the loop early
+        (or an item failing) cancels the work still in flight.
+
+        Args:
+            items: Items to pass to the worker
+
+        Yields:
+            tuple: (item, worker result), in completion order
+
+        Raises:
+            Exception: Whatever the worker raised for an item
+        """
+        self._queue = asyncio.Queue()
+        self._results = asyncio.Queue()
+        pending = 0
+        for item in items:
+            self._queue.put_nowait(item)
+            pending += 1
+
+        workers = [asyncio.create_task(self._work()) for _ in range(self.max_inflight)]
+        try:
+            while pending:
+                item, result, error = await self._results.get()
+                pending -= 1
+                if error is not None:
+                    raise error
+                yield item, result
+        finally:
+            # Consumer went away or an item failed: don't leave work running for nobody
+            for task in workers:
+                task.cancel()
+            self._queue = self._results = None
+
+    async def _work(self) -> None:
+        """One slot: take the next item, run it, report, repeat."""
+        while True:
+            item = await self._queue.get()
+            try:
+                result = await self.worker(item)
+            except Exception as e:
+                logger.debug("Batched item failed: %s", e)
+                self._results.put_nowait((item, None, e))
+            else:
+                self._results.put_nowait((item, result, None))
@@ -0,0 +1,305 @@
+"""
+Persistent semantic (embedding-similarity) cache backed by a local SQLite file
+Returns a stored value when a new query's embedding is close enough to a cached one
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Rows added to the embedding buffer each time it fills up
+_GROW_ROWS = 512
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache over unit-normalized embeddings.
+
+    All live entries are held in memory as one float32 matrix (preallocated and
+    grown in chunks of _GROW_ROWS rows), so a lookup is a single matrix-vector
+    product; SQLite keeps them across restarts. Entries expire after
+    `ttl_seconds`: lookups skip them from that moment, and they're deleted on the
+    next add() or reopen. Once `max_entries` is exceeded the least recently hit
+    ones are evicted. Any SQLite error is logged and treated as a miss, so a
+    broken cache never breaks the pipeline using it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float,
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = 5000
+    ):
+        """
+        Open (or create) the cache file and load its live entries.
+
+        Args:
+            path: SQLite file path; parent directories are created if needed
+            threshold: Minimum cosine similarity for a hit (e.g. 0.92)
+            ttl_seconds: Entry lifetime (None = never expires)
+            max_entries: Entries kept before least-recently-hit eviction
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        self.path = path
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self._ids: List[int] = []
+        self._values: List[Any] = []
+        self._last_hit: List[float] = []
+        self._buffer: Optional[np.ndarray] = None   # Embeddings; rows past len(_ids) are spare capacity
+        self._created = np.empty(0)                 # created_at per buffer row
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY, embedding BLOB NOT NULL, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_hit REAL NOT NULL)"
+        )
+        self._load()
+        logger.info(f"Opened semantic cache: {path} ({len(self._ids)} entries)")
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[Any]:
+        """
+        Find the cached value for the most similar stored embedding.
+
+        Args:
+            embedding: Query embedding
+
+        Returns:
+            The cached value if its similarity is >= threshold, else None
+        """
+        return self.lookup_many([embedding])[0]
+
+    def lookup_many(self, embeddings: Sequence[Sequence[float]]) -> List[Optional[Any]]:
+        """
+        lookup() for several queries at once: one matrix-matrix product scores
+        every query against every stored entry.
+
+        Args:
+            embeddings: Query embeddings (all the same size)
+
+        Returns:
+            list: Cached value or None per query, in input order
+        """
+        if not embeddings:
+            return []
+        queries = np.vstack([self._normalize(embedding) for embedding in embeddings])
+
+        with self._lock:
+            if self._matrix is None or queries.shape[1] != self._matrix.shape[1]:
+                return [None] * len(embeddings)
+
+            similarities = self._matrix @ queries.T  # entries x queries
+            live = self._live_mask()
+            if live is not None:
+                similarities[~live] = -np.inf
+            best = np.argmax(similarities, axis=0)
+            best_similarities = similarities[best, np.arange(len(embeddings))]
+
+            results: List[Optional[Any]] = [None] * len(embeddings)
+            hit_rows = set()
+            for query_index in np.flatnonzero(best_similarities >= self.threshold).tolist():
+                row = int(best[query_index])
+                results[query_index] = self._values[row]
+                hit_rows.add(row)
+                logger.debug("Semantic cache hit (similarity %.3f)", best_similarities[query_index])
+
+            if hit_rows:
+                self._touch(hit_rows)
+
+            return results
+
+    def nearest(self, embedding: Sequence[float], k: int, min_similarity: float) -> List[Any]:
+        """
+        The values of up to k stored embeddings most similar to a query.
+
+        Unlike lookup(), this is meant for related rather than equivalent
+        queries, so it takes its own (usually lower) similarity floor.
+
+        Args:
+            embedding: Query embedding
+            k: Maximum number of values to return
+            min_similarity: Minimum cosine similarity for a value to be included
+
+        Returns:
+            list: Cached values, most similar first (empty if none qualify)
+        """
+        query = self._normalize(embedding)
+
+        with self._lock:
+            if self._matrix is None or query.shape[0] != self._matrix.shape[1] or k <= 0:
+                return []
+
+            similarities = self._matrix @ query
+            live = self._live_mask()
+            if live is not None:
+                similarities[~live] = -np.inf
+            if k < len(similarities):
+                candidates = np.argpartition(-similarities, k - 1)[:k]
+            else:
+                candidates = np.arange(len(similarities))
+            candidates = candidates[np.argsort(-similarities[candidates], kind='stable')]
+            rows = [int(row) for row in candidates if similarities[row] >= min_similarity]
+
+            if rows:
+                self._touch(rows)
+                logger.debug(f"Semantic cache: {len(rows)} neighbour(s) >= {min_similarity:.2f}")
+
+            return [self._values[row] for row in rows]
+
+    def add(self, embedding: Sequence[float], value: Any) -> None:
+        """
+        Store a value under an embedding.
+
+        Args:
+            embedding: Embedding of the query that produced `value`
+            value: JSON-serializable value
+        """
+        vector = self._normalize(embedding)
+        now = time.time()
+
+        try:
+            payload = json.dumps(value)
+            with self._lock:
+                if self._matrix is not None and vector.shape[0] != self._matrix.shape[1]:
+                    logger.warning("Semantic cache embedding size changed; ignoring new entry")
+                    return
+
+                cursor = self._conn.execute(
+                    "INSERT INTO entries (embedding, value, created_at, last_hit) VALUES (?, ?, ?, ?)",
+                    (vector.tobytes(), payload, now, now)
+                )
+                self._ensure_capacity(vector.shape[0])
+                row = len(self._ids)
+                self._buffer[row] = vector
+                self._created[row] = now
+                self._ids.append(cursor.lastrowid)
+                self._values.append(value)
+                self._last_hit.append(now)
+
+                live = self._live_mask()
+                if live is not None and not live.all():
+                    self._remove_rows(set(np.flatnonzero(~live).tolist()))
+                if len(self._ids) > self.max_entries:
+                    self._evict(len(self._ids) - self.max_entries)
+
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Semantic cache write failed: {e}")
+
+    @property
+    def _matrix(self) -> Optional[np.ndarray]:
+        """The stored embeddings, one row per entry (None when empty)."""
+        return self._buffer[:len(self._ids)] if self._ids else None
+
+    def _live_mask(self) -> Optional[np.ndarray]:
+        """False for entries past their TTL; None when nothing can expire (caller holds the lock)."""
+        if self.ttl_seconds is None or not self._ids:
+            return None
+        return self._created[:len(self._ids)] >= time.time() - self.ttl_seconds
+
+    def _ensure_capacity(self, dimensions: int) -> None:
+        """Make room for one more row, growing the buffer by _GROW_ROWS when full."""
+        size = len(self._ids)
+        if self._buffer is not None and size < self._buffer.shape[0]:
+            return
+
+        buffer = np.empty((size + _GROW_ROWS, dimensions), dtype=np.float32)
+        created = np.empty(size + _GROW_ROWS)
+        if size:
+            buffer[:size] = self._buffer[:size]
+            created[:size] = self._created[:size]
+        self._buffer, self._created = buffer, created
+
+    def _touch(self, rows) -> None:
+        """Mark entries as just hit, for eviction order (caller holds the lock)."""
+        now = time.time()
+        for row in rows:
+            self._last_hit[row] = now
+        try:
+            self._conn.executemany(
+                "UPDATE entries SET last_hit = ? WHERE id = ?",
+                [(now, self._ids[row]) for row in rows]
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic cache touch failed: {e}")
+
+    def _load(self) -> None:
+        """Drop expired rows and load the rest into memory."""
+        try:
+            if self.ttl_seconds is not None:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+            rows = self._conn.execute(
+                "SELECT id, embedding, value, created_at, last_hit FROM entries ORDER BY id"
+            ).fetchall()
+
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic cache load failed: {e}")
+            return
+
+        vectors, created = [], []
+        for row_id, blob, value, created_at, last_hit in rows:
+            try:
+                self._values.append(json.loads(value))
+            except ValueError:
+                continue
+            self._ids.append(row_id)
+            self._last_hit.append(last_hit)
+            created.append(created_at)
+            vectors.append(np.frombuffer(blob, dtype=np.float32))
+
+        if vectors and len({v.shape[0] for v in vectors}) == 1:
+            self._buffer = np.vstack(vectors)
+            self._created = np.array(created, dtype=np.float64)
+        elif vectors:
+            logger.warning("Semantic cache has mixed embedding sizes; starting empty")
+            self._ids, self._values, self._last_hit = [], [], []
+
+        if len(self._ids) > self.max_entries:
+            self._evict(len(self._ids) - self.max_entries)
+
+    def _evict(self, count: int) -> None:
+        """Remove the `count` least recently hit entries (caller holds the lock)."""
+        self._remove_rows(set(np.argsort(self._last_hit, kind='stable')[:count].tolist()))
+
+    def _remove_rows(self, victims: set) -> None:
+        """Delete entries by row and compact the buffer in place (caller holds the lock)."""
+        try:
+            self._conn.executemany(
+                "DELETE FROM entries WHERE id = ?",
+                [(self._ids[i],) for i in victims]
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic cache eviction failed: {e}")
+
+        keep = [i for i in range(len(self._ids)) if i not in victims]
+        self._ids = [self._ids[i] for i in keep]
+        self._values = [self._values[i] for i in keep]
+        self._last_hit = [self._last_hit[i] for i in keep]
+        if keep:
+            self._buffer[:len(keep)] = self._buffer[keep]
+            self._created[:len(keep)] = self._created[keep]
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        """float32 unit vector, so dot product = cosine similarity."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -3,10 +3,15 @@ YouTube video transcript retrieval and analysis
 """
 
 import logging
+import os
+from functools import lru_cache
 from typing import List, Dict, Optional
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
 
+from config import CacheConfig
+from utils.disk_cache import DiskCache
+
 # Initialize logger
 logger = logging.getLogger(__name__)
 
@@ -28,13 +33,22 @@ def get_transcript(video_id: str) -> Optional[List[Dict]]:
         >>> transcript[0]['text']
         'Hello and welcome to this video'
     """
+    # Cached per video, including "no transcript" (that answer rarely changes)
+    cache = _get_transcript_cache()
+    cached = cache.get(video_id)
+    if cached is not None:
+        logger.debug("Transcript cache hit for video: %s", video_id)
+        return cached['transcript']
+    
     try:
         transcript = YouTubeTranscriptApi.get_transcript(video_id)
         logger.info(f"Successfully retrieved transcript for video: {video_id}")
+        cache.set(video_id, {'transcript': transcript})
         return transcript
     
     except (TranscriptsDisabled, NoTranscriptFound):
         logger.warning(f"No transcript available for video: {video_id}")
+        cache.set(video_id, {'transcript': None})
         return None
     
     except Exception as e:
@@ -42,6 +56,20 @@ def get_transcript(video_id: str) -> Optional[List[Dict]]:
         return None
 
 
+def clear_transcript_cache() -> None:
+    """Drop every cached transcript (they're re-fetched on next use)."""
+    _get_transcript_cache().clear()
+
+
+@lru_cache(maxsize=1)
+def _get_transcript_cache() -> DiskCache:
+    """Lazily open the process-wide transcript cache."""
+    return DiskCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.TRANSCRIPT_CACHE_FILE),
+        default_ttl_seconds=CacheConfig.TRANSCRIPT_CACHE_TTL_SECONDS
+    )
+
+
 def extract_transcript_text(transcript: List[Dict]) -> str:
     """
     Extract full text from transcript entries.
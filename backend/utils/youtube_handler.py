@@ -3,18 +3,38 @@ YouTube API handler for video search and metadata retrieval
 """
 
 import logging
+import os
+import threading
 import isodate
+from functools import lru_cache
 from typing import List, Dict, Optional
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-from config import YOUTUBE_API_KEY, PopulatorConfig
+from config import YOUTUBE_API_KEY, CacheConfig, PopulatorConfig
+from utils.disk_cache import DiskCache
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Initialize YouTube API client
-youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+# videos.list accepts at most this many comma-separated ids per request
+_VIDEOS_LIST_MAX_IDS = 50
+
+# Video fields that change over time; cached apart from the rest with a short TTL
+_STATISTICS_FIELDS = ('viewCount', 'likeCount', 'likeRatio')
+
+# YouTube API clients, one per thread: the underlying httplib2 connection isn't
+# thread-safe, and Phase 2 runs sections on a thread pool
+_thread_local = threading.local()
+
+
+def _youtube_client():
+    """This thread's YouTube API client (built on first use)."""
+    client = getattr(_thread_local, 'youtube', None)
+    if client is None:
+        client = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+        _thread_local.youtube = client
+    return client
 
 
 def search_videos(
@@ -39,7 +59,7 @@ def search_videos(
     try:
         logger.info(f"Searching YouTube for: '{query}' (max_results={max_results})")
         
-        search_response = youtube.search().list(
+        search_response = _youtube_client().search().list(
             q=query,
             part='id',
             type='video',
@@ -88,21 +108,80 @@ def get_video_details(video_ids: List[str]) -> List[Dict]:
         logger.warning("No video IDs provided to get_video_details")
         return []
     
+    # Videos seen in earlier sections/courses come straight from the disk caches:
+    # the fixed details for days, their statistics only for a few hours
+    details_cache = _get_video_details_cache()
+    stats_cache = _get_video_stats_cache()
+    cached_details = details_cache.get_many(video_ids)
+    cached_stats = stats_cache.get_many(list(cached_details))
+    cached = {
+        video_id: {**details, **cached_stats[video_id]}
+        for video_id, details in cached_details.items() if video_id in cached_stats
+    }
+    uncached_ids = [video_id for video_id in dict.fromkeys(video_ids) if video_id not in cached]
+    logger.info(
+        f"Fetching details for {len(video_ids)} videos "
+        f"({len(video_ids) - len(uncached_ids)} cached, {len(uncached_ids)} from the API)"
+    )
+    
+    # One request per 50 ids; a failed chunk only loses its own videos
+    fetched = {}
+    for start in range(0, len(uncached_ids), _VIDEOS_LIST_MAX_IDS):
+        for video in _fetch_video_details_chunk(uncached_ids[start:start + _VIDEOS_LIST_MAX_IDS]):
+            fetched[video['videoId']] = video
+    details_cache.set_many({
+        video_id: {key: value for key, value in video.items() if key not in _STATISTICS_FIELDS}
+        for video_id, video in fetched.items()
+    })
+    stats_cache.set_many({
+        video_id: {key: video[key] for key in _STATISTICS_FIELDS}
+        for video_id, video in fetched.items()
+    })
+    
+    # Requested order; ids the API didn't return are dropped, as before
+    videos = []
+    for video_id in video_ids:
+        video = cached.pop(video_id, None) or fetched.pop(video_id, None)
+        if video is not None:
+            videos.append(video)
+    
+    logger.info(f"Successfully retrieved details for {len(videos)} videos")
+    return videos
+
+
+def clear_video_details_cache() -> None:
+    """Drop every cached video details and statistics entry (they're re-fetched on next use)."""
+    _get_video_details_cache().clear()
+    _get_video_stats_cache().clear()
+
+
+@lru_cache(maxsize=1)
+def _get_video_details_cache() -> DiskCache:
+    """Lazily open the process-wide video details cache."""
+    return DiskCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.VIDEO_DETAILS_CACHE_FILE),
+        default_ttl_seconds=CacheConfig.VIDEO_DETAILS_CACHE_TTL_SECONDS
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_video_stats_cache() -> DiskCache:
+    """Lazily open the process-wide video statistics cache."""
+    return DiskCache(
+        os.path.join(CacheConfig.CACHE_DIR, CacheConfig.VIDEO_STATS_CACHE_FILE),
+        default_ttl_seconds=CacheConfig.VIDEO_STATS_CACHE_TTL_SECONDS
+    )
+
+
+def _fetch_video_details_chunk(video_ids: List[str]) -> List[Dict]:
+    """One videos.list request for up to _VIDEOS_LIST_MAX_IDS ids ([] on failure)."""
     try:
-        logger.info(f"Fetching details for {len(video_ids)} videos")
-        
-        videos_response = youtube.videos().list(
+        videos_response = _youtube_client().videos().list(
             part='snippet,contentDetails,statistics',
             id=','.join(video_ids)
         ).execute()
         
-        videos = []
-        for item in videos_response.get('items', []):
-            video_data = _parse_video_data(item)
-            videos.append(video_data)
-        
-        logger.info(f"Successfully retrieved details for {len(videos)} videos")
-        return videos
+        return [_parse_video_data(item) for item in videos_response.get('items', [])]
     
     except HttpError as e:
         logger.error(f"YouTube API HTTP Error: {e}")